@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark + equivalence check for src/scrapers/paddle_normalizer.py over the
+whole current catalog.
+
+Every `name` and `model` in the `rackets` table goes through each form of
+the shared `name_forms` memo (merge, dedup and radar) and through the frozen
+per-module oracles kept in scripts/paddle_normalizer_legacy.py. Any
+byte difference is printed and the script exits 1. Timings are reported per
+form (oracle / cold memo / warm memo) and for the whole discover sequence:
+every routine over every name, as merge → dedup → radar run it.
+
+Usage (from the repo root, with SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY):
+  python3 scripts/bench_paddle_normalizer.py
+  python3 scripts/bench_paddle_normalizer.py --names-file names.txt   # one name per line, offline
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scripts.paddle_normalizer_legacy import (  # noqa: E402
+    legacy_clean_pala_name_for_search,
+    legacy_normalize_for_comparison,
+    legacy_normalize_name_base,
+    legacy_normalize_paddle_name,
+    legacy_normalize_text,
+)
+from src.scrapers import paddle_normalizer  # noqa: E402
+from src.scrapers.deduplicate_rackets import normalize_name_base  # noqa: E402
+from src.scrapers.radar_metrics_scraper import clean_pala_name_for_search, normalize_text  # noqa: E402
+
+
+def load_catalog_names():
+    from src.scrapers import db
+
+    rows = db.paginate(db.get_client(), "rackets", "name, model")
+    return [value for row in rows for value in (row.get("name"), row.get("model")) if value]
+
+
+def timed(fn, names):
+    start = time.perf_counter()
+    out = [fn(n) for n in names]
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names-file", help="read names from this file instead of Supabase")
+    args = parser.parse_args()
+
+    if args.names_file:
+        with open(args.names_file, encoding="utf-8") as f:
+            names = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        names = load_catalog_names()
+    print(f"{len(names)} nombres ({len(set(names))} distintos)\n")
+
+    failed = False
+    routines = [
+        ("normalize_paddle_name", paddle_normalizer.normalize_paddle_name, legacy_normalize_paddle_name),
+        ("normalize_for_comparison", paddle_normalizer.normalize_for_comparison, legacy_normalize_for_comparison),
+        ("normalize_name_base", normalize_name_base, legacy_normalize_name_base),
+        ("normalize_text", normalize_text, legacy_normalize_text),
+        ("clean_pala_name_for_search", clean_pala_name_for_search, legacy_clean_pala_name_for_search),
+    ]
+    for label, new, old in routines:
+        paddle_normalizer._name_forms.cache_clear()
+        expected, t_old = timed(old, names)
+        got, t_cold = timed(new, names)
+        _, t_warm = timed(new, names)
+        diffs = [(n, e, g) for n, e, g in zip(names, expected, got) if e != g]
+        print(f"{label}")
+        print(f"  legacy      {t_old * 1000:8.1f} ms")
+        print(f"  compiled    {t_cold * 1000:8.1f} ms  (memo frío, todas las formas, x{t_old / t_cold:.1f})")
+        print(f"  memoized    {t_warm * 1000:8.1f} ms  (memo caliente, x{t_old / t_warm:.1f})")
+        print(f"  diferencias {len(diffs)}\n")
+        for raw, e, g in diffs[:20]:
+            print(f"    {raw!r}: legacy={e!r} compiled={g!r}")
+        failed = failed or bool(diffs)
+
+    paddle_normalizer._name_forms.cache_clear()
+    t_legacy = sum(timed(old, names)[1] for _, _, old in routines)
+    t_shared = sum(timed(new, names)[1] for _, new, _ in routines)
+    print(f"pipeline completo: legacy {t_legacy * 1000:.1f} ms → memo compartido {t_shared * 1000:.1f} ms "
+          f"(x{t_legacy / t_shared:.1f})")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
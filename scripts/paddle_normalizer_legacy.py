@@ -0,0 +1,114 @@
+"""
+The name normalizers as they were before paddle_normalizer was precompiled
+and memoized, verbatim: paddle_normalizer, deduplicate_rackets and
+radar_metrics_scraper each had their own. Normalized names are stored and
+compared against the catalog already in Supabase, so the new code must
+match these byte for byte. Used as the oracle by
+tests/scrapers/test_paddle_normalizer.py and scripts/bench_paddle_normalizer.py.
+"""
+
+import re
+import unicodedata
+
+LEGACY_NOISE_TOKENS = [
+    "pala de padel", "pala padel", "pala de pádel", "pala pádel",
+    "pala", "padel", "pádel", "racket", "raqueta",
+]
+LEGACY_FILLER_WORDS = {"de", "del", "la", "el", "los", "las", "para", "y"}
+
+
+def legacy_normalize_paddle_name(raw_name):
+    if not raw_name or not isinstance(raw_name, str):
+        return ""
+    name = raw_name.strip().lower()
+    for noise in sorted(LEGACY_NOISE_TOKENS, key=len, reverse=True):
+        name = re.sub(rf'\s*\({re.escape(noise)}\)\s*', ' ', name).strip()
+    for noise in sorted(LEGACY_NOISE_TOKENS, key=len, reverse=True):
+        if name.startswith(noise):
+            name = name[len(noise):].strip()
+        if name.endswith(noise):
+            name = name[: -len(noise)].strip()
+    tokens = name.split()
+    while tokens and tokens[0] in LEGACY_FILLER_WORDS:
+        tokens.pop(0)
+    while tokens and tokens[-1] in LEGACY_FILLER_WORDS:
+        tokens.pop()
+    name = " ".join(tokens)
+    name = re.sub(r"\s+", " ", name).strip()
+    return name
+
+
+def legacy_normalize_for_comparison(raw_name):
+    name = legacy_normalize_paddle_name(raw_name)
+    name = re.sub(r"\b202\d\b", "", name)
+    _PLAYER_NAMES = [
+        "jon sanz", "paquito", "navarro", "lebron", "galan", "tapia",
+        "coello", "chingotto", "stupa", "di nenno", "sanyo", "bela",
+        "belasteguin", "momo", "alex ruiz", "tello", "yanguas", "garrido",
+        "ari sanchez", "paulita", "josemaria", "triay", "salazar",
+        "bea gonzalez", "martita", "ortega",
+    ]
+    for player in _PLAYER_NAMES:
+        name = name.replace(player, "")
+    name = re.sub(r"\.0\b", "", name)
+    name = re.sub(r"(?<=\w)-(?=\w)", "", name)
+    name = re.sub(r"[^\w\s]", "", name)
+    name = re.sub(r"\s+", " ", name).strip()
+    return name
+
+
+def legacy_slugify_paddle(brand, model):
+    text = f"{brand}-{model}".lower()
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("utf-8")
+    text = re.sub(r"[^\w\s-]", "", text)
+    text = re.sub(r"[-\s]+", "-", text).strip("-")
+    return text
+
+
+_LEGACY_COUNTRY_MAP = {
+    "españa": "spain", "espana": "spain", "italia": "italy", "mexico": "mexico", "méxico": "mexico",
+    "holanda": "netherlands", "alemania": "germany", "francia": "france",
+    "belgica": "belgium", "bélgica": "belgium", "inglaterra": "england", "eeuu": "usa",
+}
+_LEGACY_COUNTRY_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in _LEGACY_COUNTRY_MAP) + r')\b',
+    re.IGNORECASE,
+)
+
+
+def _legacy_strip_accents(s):
+    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+
+
+def legacy_normalize_name_base(s):
+    if not s:
+        return ""
+    s = s.lower().strip()
+    s = _legacy_strip_accents(s)
+    s = re.sub(r"\s*\([^)]*\)\s*", " ", s)
+    s = re.sub(r"\bpala\b", "", s)
+    s = re.sub(r"(?<=\w)-(?=\w)", "", s)
+    s = re.sub(r"\s+by\s+[a-z]+(?:\s+[a-z]+)*", "", s)
+    s = re.sub(r"\b(alum|aluminio)\b", "", s)
+    s = _LEGACY_COUNTRY_RE.sub(lambda m: _LEGACY_COUNTRY_MAP[_legacy_strip_accents(m.group(0).lower())], s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def legacy_normalize_text(text):
+    if not text:
+        return ''
+    return (text.lower().strip().replace('á', 'a').replace('é', 'e').replace('í', 'i')
+            .replace('ó', 'o').replace('ú', 'u').replace('ñ', 'n').replace('  ', ' '))
+
+
+def legacy_clean_pala_name_for_search(name):
+    if not name:
+        return ''
+    cleaned = re.sub(r'^(beach\s+tennis|pickleball)\s+', '', name, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\b[a-z0-9]{7,}\b', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\b\d{5,}\b', '', cleaned)
+    cleaned = re.sub(r'[\(\)\[\]]', ' ', cleaned)
+    cleaned = re.sub(r'\b(pala|palas|padel)\b', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    return cleaned
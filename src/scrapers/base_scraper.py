@@ -1,16 +1,30 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Optional, List, Callable, TypeVar
+from functools import lru_cache
+from typing import (
+    Any, AsyncIterator, Awaitable, Dict, Iterable, Mapping, NamedTuple, Optional, List, Callable, Set, Tuple, TypeVar,
+)
+from urllib.parse import urlparse
+import importlib.util
+import json
+import os
 import re
 import random
-import urllib.request
+import threading
 import urllib.error
 import ssl
 import time
 import asyncio
 
 import certifi
+import httpx
+
+from .http_cache import (
+    CACHE_ENABLED, CacheEntry, JsonFileCache, NotModified, SpecEntry, spec_cache, validator_cache,
+)
+from .rate_limit import host_limiter
 
 # ============================================================================
 # Fetch outcome contract
@@ -45,12 +59,36 @@ class FetchResult:
 
 
 # ============================================================================
-# Sync retry helper (scrapers run urllib calls in a thread executor)
+# Retry helpers (sync for thread callers, async for the scrapers)
 # ============================================================================
 
 T = TypeVar("T")
 
 _RETRYABLE_HTTP_CODES = {429, 403, 500, 502, 503, 504}
+_THROTTLE_HTTP_CODES = {429, 403}  # Cloudflare answers an over-eager client with either
+
+
+def _next_retry_wait(
+    e: "urllib.error.URLError", attempt: int, *, label: str, max_retries: int, base_delay: float, max_wait: float,
+) -> Optional[float]:
+    """
+    Seconds to wait before retrying after `e`, or None if the caller must
+    re-raise it. Raises ScraperGone on a 404. Shared by both retry helpers
+    so the sync and async paths can't drift apart.
+    """
+    if isinstance(e, urllib.error.HTTPError):
+        if e.code == 404:
+            raise ScraperGone(f"404 for {label}") from e
+        if e.code in _RETRYABLE_HTTP_CODES and attempt < max_retries - 1:
+            wait = _retry_wait(e, attempt, base_delay, max_wait)
+            print(f"    ⚠️  [{label}] HTTP {e.code}, retry {attempt + 1}/{max_retries} in {wait:.1f}s")
+            return wait
+        return None
+    if attempt < max_retries - 1:
+        wait = min(base_delay * (2 ** attempt) + random.uniform(0, 1.5), max_wait)
+        print(f"    ⚠️  [{label}] network error, retry {attempt + 1}/{max_retries} in {wait:.1f}s: {e.reason}")
+        return wait
+    return None
 
 
 def sync_fetch_with_retry(
@@ -62,7 +100,7 @@ def sync_fetch_with_retry(
     max_wait: float = 30.0,
 ) -> T:
     """
-    Runs `fetch_once()` (a single urllib call), retrying on 429/403/5xx and
+    Runs `fetch_once()` (a single HTTP call), retrying on 429/403/5xx and
     network errors with exponential backoff + jitter. Respects the
     `Retry-After` header when the store sends one, but never sleeps longer
     than `max_wait` — a store/CF that throttles us for a minute must not eat
@@ -76,39 +114,63 @@ def sync_fetch_with_retry(
     for attempt in range(max_retries):
         try:
             return fetch_once()
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                raise ScraperGone(f"404 for {label}") from e
-            if e.code in _RETRYABLE_HTTP_CODES and attempt < max_retries - 1:
-                wait = _retry_wait(e, attempt, base_delay, max_wait)
-                print(f"    ⚠️  [{label}] HTTP {e.code}, retry {attempt + 1}/{max_retries} in {wait:.1f}s")
-                time.sleep(wait)
-                last_exc = e
-                continue
+        except urllib.error.URLError as e:  # HTTPError is a subclass
+            wait = _next_retry_wait(
+                e, attempt, label=label, max_retries=max_retries, base_delay=base_delay, max_wait=max_wait,
+            )
             last_exc = e
-            raise
-        except urllib.error.URLError as e:
-            if attempt < max_retries - 1:
-                wait = min(base_delay * (2 ** attempt) + random.uniform(0, 1.5), max_wait)
-                print(f"    ⚠️  [{label}] network error, retry {attempt + 1}/{max_retries} in {wait:.1f}s: {e.reason}")
-                time.sleep(wait)
-                last_exc = e
-                continue
-            last_exc = e
-            raise
+            if wait is None:
+                raise
+            time.sleep(wait)
     if last_exc:
         raise last_exc
     raise RuntimeError(f"sync_fetch_with_retry exhausted retries with no exception for {label}")
 
 
-def _retry_wait(e: "urllib.error.HTTPError", attempt: int, base_delay: float, max_wait: float = 30.0) -> float:
-    retry_after = e.headers.get("Retry-After") if e.headers else None
-    if retry_after:
+async def async_fetch_with_retry(
+    fetch_once: Callable[[], Awaitable[T]],
+    *,
+    label: str = "",
+    max_retries: int = 4,
+    base_delay: float = 3.0,
+    max_wait: float = 30.0,
+) -> T:
+    """
+    `sync_fetch_with_retry` for coroutines: same retry policy, same
+    ScraperGone / re-raise contract, but backoff waits are `asyncio.sleep`
+    so hundreds of throttled requests can wait on one thread.
+    """
+    last_exc: Optional[Exception] = None
+    for attempt in range(max_retries):
         try:
-            wait = float(retry_after)
-        except ValueError:
-            wait = base_delay * (2 ** attempt)
-    else:
+            return await fetch_once()
+        except urllib.error.URLError as e:  # HTTPError is a subclass
+            wait = _next_retry_wait(
+                e, attempt, label=label, max_retries=max_retries, base_delay=base_delay, max_wait=max_wait,
+            )
+            last_exc = e
+            if wait is None:
+                raise
+            await asyncio.sleep(wait)
+    if last_exc:
+        raise last_exc
+    raise RuntimeError(f"async_fetch_with_retry exhausted retries with no exception for {label}")
+
+
+def _retry_after_s(e: "urllib.error.HTTPError") -> Optional[float]:
+    """`Retry-After` in seconds, or None if absent or not a number (HTTP-date)."""
+    retry_after = e.headers.get("Retry-After") if e.headers else None
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        return None
+
+
+def _retry_wait(e: "urllib.error.HTTPError", attempt: int, base_delay: float, max_wait: float = 30.0) -> float:
+    wait = _retry_after_s(e)
+    if wait is None:
         wait = base_delay * (2 ** attempt)
     wait = min(wait, max_wait)
     return wait + random.uniform(0, wait * 0.3)
@@ -157,6 +219,159 @@ def ssl_ctx() -> ssl.SSLContext:
     return ssl.create_default_context(cafile=certifi.where())
 
 
+# ============================================================================
+# Shared HTTP connection pool
+# ============================================================================
+#
+# Every fetch used to open a fresh `urllib.request.urlopen` with a brand new
+# SSL context — a full TCP + TLS handshake per product against the same
+# three hosts. HostPool keeps keep-alive connections per store host, built
+# on a single SSL context, and is shared by every scraper in the process.
+# Concurrency against the store doesn't go up: the pool only reuses
+# sockets, callers still decide how many requests are in flight.
+#
+# Errors are raised as urllib's HTTPError/URLError on purpose, so
+# `sync_fetch_with_retry` and every scraper's except-clauses keep working
+# unchanged on top of the pool.
+
+MAX_CONNECTIONS_PER_HOST = 4
+KEEPALIVE_EXPIRY_S = 30.0
+
+# HTTP/2 is opt-in (SCRAPER_HTTP2=1) and needs the `h2` package: it changes
+# the TLS/ALPN fingerprint Cloudflare sees, so it isn't the default.
+HTTP2_ENABLED = os.getenv("SCRAPER_HTTP2") == "1" and importlib.util.find_spec("h2") is not None
+
+# Connection-specific headers are illegal in HTTP/2 (h2 rejects the request).
+_HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "upgrade", "transfer-encoding"}
+
+
+@lru_cache(maxsize=1)
+def shared_ssl_ctx() -> ssl.SSLContext:
+    """The one verifying SSL context every pooled connection is built on."""
+    return ssl_ctx()
+
+
+@dataclass
+class HttpResponse:
+    """A fully-read response. `url` is the final URL after redirects."""
+
+    status: int
+    url: str
+    headers: Mapping[str, str]
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+class HostPool:
+    """
+    Keep-alive connection pool for one store host. `request` is the sync
+    (thread-safe) path; `arequest` the asyncio one, on its own client bound
+    to the running event loop.
+    """
+
+    def __init__(self, host: str, *, max_connections: int = MAX_CONNECTIONS_PER_HOST):
+        self.host = host
+        self.http2 = HTTP2_ENABLED
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY_S,
+        )
+        self._client = httpx.Client(
+            verify=shared_ssl_ctx(), http2=self.http2, follow_redirects=True, limits=self._limits,
+        )
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # An AsyncClient's connections belong to the loop that opened them;
+        # each `asyncio.run` (one per CLI command) gets a fresh client.
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = httpx.AsyncClient(
+                verify=shared_ssl_ctx(), http2=self.http2, follow_redirects=True, limits=self._limits,
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    def _request_headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = dict(headers or {})
+        if self.http2:
+            headers = {k: v for k, v in headers.items() if k.lower() not in _HOP_BY_HOP_HEADERS}
+        return headers
+
+    def request(self, url: str, *, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> HttpResponse:
+        """
+        GET `url` over a pooled connection (redirects followed, body
+        decoded). Raises urllib.error.HTTPError on status >= 400 and
+        urllib.error.URLError on network failure.
+        """
+        try:
+            resp = self._client.get(url, headers=self._request_headers(headers), timeout=timeout)
+        except httpx.TransportError as e:
+            raise urllib.error.URLError(f"{type(e).__name__}: {e}") from e
+        return _to_http_response(url, resp)
+
+    async def arequest(self, url: str, *, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> HttpResponse:
+        """Async `request`: same redirects/decoding and same urllib error types."""
+        try:
+            resp = await self._async_client().get(url, headers=self._request_headers(headers), timeout=timeout)
+        except httpx.TransportError as e:
+            raise urllib.error.URLError(f"{type(e).__name__}: {e}") from e
+        return _to_http_response(url, resp)
+
+    def close(self) -> None:
+        self._client.close()
+
+    async def aclose(self) -> None:
+        self._client.close()
+        if self._aclient is not None and self._aclient_loop is asyncio.get_running_loop():
+            await self._aclient.aclose()
+        self._aclient = None
+
+
+def _to_http_response(url: str, resp: "httpx.Response") -> HttpResponse:
+    if resp.status_code >= 400:
+        raise urllib.error.HTTPError(url, resp.status_code, resp.reason_phrase, resp.headers, None)
+    return HttpResponse(status=resp.status_code, url=str(resp.url), headers=resp.headers, body=resp.content)
+
+
+_POOLS: Dict[str, HostPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def host_pool(url: str) -> HostPool:
+    """The process-wide pool for `url`'s host, created on first use."""
+    host = urlparse(url).netloc
+    with _POOLS_LOCK:
+        pool = _POOLS.get(host)
+        if pool is None:
+            pool = _POOLS[host] = HostPool(host)
+        return pool
+
+
+def _pop_host_pools(hosts: Optional[Set[str]]) -> List[HostPool]:
+    with _POOLS_LOCK:
+        return [_POOLS.pop(host) for host in list(_POOLS) if hosts is None or host in hosts]
+
+
+def close_host_pools(hosts: Optional[Set[str]] = None) -> None:
+    """Close the pools for `hosts` (all of them if None). They reopen lazily."""
+    for pool in _pop_host_pools(hosts):
+        pool.close()
+
+
+async def aclose_host_pools(hosts: Optional[Set[str]] = None) -> None:
+    """`close_host_pools` from inside the event loop (also closes async clients)."""
+    for pool in _pop_host_pools(hosts):
+        await pool.aclose()
+
+
 # ============================================================================
 # Shared Utility Functions
 # ============================================================================
@@ -307,21 +522,401 @@ class Product:
             "description": self.description
         }
 
+# ============================================================================
+# Listing prices (refresh --mode listing)
+# ============================================================================
+
+class ListingPrice(NamedTuple):
+    """One product card of a category listing. `price` None = no usable price on the card."""
+
+    url: str
+    price: Optional[float]
+    original_price: Optional[float] = None
+
+
+def listing_results(
+    urls: Iterable[str], listing: Iterable[ListingPrice], key: Callable[[str], str],
+) -> Dict[str, FetchResult]:
+    """
+    OK results for the `urls` whose listing card gives an unambiguous
+    price, matched on `key(url)` (e.g. the product handle). Cards without a
+    price, and products listed twice with different prices, are left out
+    so the caller deep-fetches them — a listing never yields NO_PRICE/GONE.
+    """
+    cards: Dict[str, Optional[ListingPrice]] = {}
+    for card in listing:
+        k = key(card.url)
+        if k in cards and cards[k] is not None and cards[k][1:] != card[1:]:
+            cards[k] = None
+        elif k not in cards:
+            cards[k] = card
+
+    results: Dict[str, FetchResult] = {}
+    for url in urls:
+        card = cards.get(key(url))
+        if card is None or not card.price or card.price <= 0:
+            continue
+        original = card.original_price if card.original_price and card.original_price > card.price else None
+        product = Product(url=url, name="", price=card.price, brand="", image="", specs={}, original_price=original)
+        results[url] = FetchResult(FetchOutcome.OK, product=product)
+    return results
+
+
+# ============================================================================
+# Price-only scrapes (refresh)
+# ============================================================================
+
+def shopify_variant_prices(product_data: dict) -> Tuple[Optional[float], Optional[float]]:
+    """(price, compare_at_price) of a Shopify product object's first variant; None when absent or unparseable."""
+    variants = product_data.get('variants') if isinstance(product_data.get('variants'), list) else []
+    first_variant = variants[0] if variants and isinstance(variants[0], dict) else {}
+
+    price: Optional[float] = None
+    try:
+        raw_price = first_variant.get('price')
+        if raw_price is not None:
+            price = float(raw_price)
+    except (ValueError, TypeError):
+        pass
+
+    original_price: Optional[float] = None
+    try:
+        op = first_variant.get('compare_at_price')
+        if op:
+            original_price = float(op)
+    except (ValueError, TypeError, AttributeError):
+        pass
+    return price, original_price
+
+
+def shopify_price_result(product_data: dict, url: str) -> FetchResult:
+    """
+    `scrape_price` result from one Shopify product object: the same outcome
+    the full scrape would give (invalid payload, missing title and junior
+    rackets FAIL; no price is NO_PRICE), without specs, images or body_html.
+    """
+    if not product_data or not isinstance(product_data, dict):
+        return FetchResult(FetchOutcome.FAILED, error="empty or invalid API response")
+    name = product_data.get('title')
+    if not name:
+        return FetchResult(FetchOutcome.FAILED, error="product JSON missing title")
+    if is_junior_racket(name):
+        return FetchResult(FetchOutcome.FAILED, error="junior racket, excluded from catalog")
+
+    price, original_price = shopify_variant_prices(product_data)
+    product = Product(url=url, name=name, price=price or 0.0, brand=product_data.get('vendor') or 'Unknown',
+                      image="", specs={}, original_price=original_price)
+    if price is None or price <= 0:
+        return FetchResult(FetchOutcome.NO_PRICE, product=product)
+    return FetchResult(FetchOutcome.OK, product=product)
+
+
+# ============================================================================
+# Category pagination
+# ============================================================================
+#
+# Every store's category scan walked pages 1..N awaiting each one before
+# asking for the next, and only learned it was done from an empty page.
+# `ordered_pages` keeps that contract — same pages, in page order, stopping
+# at the first empty/failed one — but keeps up to CATEGORY_PAGE_CONCURRENCY
+# pages in flight. Every request still goes through the host limiter.
+#
+#   - If page 1 tells how many pages there are (`page_count`: pager markup),
+#     pages 2..count go out at once. Past the count it probes a single page,
+#     so a correct count costs exactly what the sequential walk did; if that
+#     page is not empty the count was short (Magento's pager only lists a
+#     frame of pages) and the walk carries on as below.
+#   - Otherwise it fetches a window of pages ahead of the consumer; at most
+#     concurrency-1 requests past the last page are wasted (and cancelled
+#     if they haven't been sent yet).
+
+CATEGORY_PAGE_CONCURRENCY = MAX_CONNECTIONS_PER_HOST
+
+
+async def ordered_pages(
+    fetch: Callable[[int], Awaitable[Optional[T]]],
+    *,
+    is_empty: Callable[[T], bool],
+    max_pages: int,
+    page_count: Optional[Callable[[T], Optional[int]]] = None,
+    concurrency: int = CATEGORY_PAGE_CONCURRENCY,
+) -> AsyncIterator[Tuple[int, T]]:
+    """
+    Yield (page_num, page) for pages 1, 2, ... in order, until `fetch`
+    returns None (failed — it reports the error itself) or an `is_empty`
+    page, or `max_pages` is reached.
+    """
+    first = await fetch(1)
+    if first is None or is_empty(first):
+        return
+    yield 1, first
+
+    counted = min(page_count(first) or 0, max_pages) if page_count else 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded(n: int) -> Optional[T]:
+        async with sem:
+            return await fetch(n)
+
+    pending: Dict[int, "asyncio.Task"] = {}
+    scheduled = 1
+    try:
+        for n in range(2, max_pages + 1):
+            if n <= counted:
+                horizon = counted
+            elif n == counted + 1:
+                horizon = n  # probe right past the count before trusting it was short
+            else:
+                horizon = min(n + concurrency - 1, max_pages)
+            while scheduled < horizon:
+                scheduled += 1
+                pending[scheduled] = asyncio.ensure_future(bounded(scheduled))
+            page = await pending.pop(n)
+            if page is None or is_empty(page):
+                return
+            yield n, page
+    finally:
+        for task in pending.values():
+            task.cancel()
+
+
+def max_page_number(html: str, pattern: "re.Pattern[str]") -> Optional[int]:
+    """Highest page number linked from a pager (`pattern` captures the number), or None."""
+    numbers = [int(n) for n in pattern.findall(html) if n.isdigit()]
+    return max(numbers) if numbers else None
+
+
+@dataclass
+class CategoryScan:
+    """
+    A category scan: every product URL in listing order, plus the results
+    the listing itself already answers completely (same FetchResult that
+    `fetch_product` would return), keyed by URL. Discover only fetches the
+    new URLs missing from `products`.
+    """
+
+    urls: List[str]
+    products: Dict[str, FetchResult] = field(default_factory=dict)
+
+
+@dataclass
+class _ProductFetch:
+    """Validator-cache state for the `fetch_product` call running in this task."""
+
+    entry: Optional[CacheEntry]
+    sent: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+_PRODUCT_FETCH: ContextVar[Optional[_ProductFetch]] = ContextVar("_PRODUCT_FETCH", default=None)
+
+
 class BaseScraper(ABC):
     """
     Base class for all scrapers.
-    Removed Playwright dependency as current scrapers use HTTP/urllib.
+    Removed Playwright dependency as current scrapers use plain HTTP, over
+    the shared keep-alive pool (`_http_get`).
     """
     def __init__(self):
         self.user_agent = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+        self._hosts: Set[str] = set()
+        # Peticiones HTTP reales (reintentos incluidos) y cuántas volvieron
+        # 429/403 — sync_catalog las vuelca en report.StoreRunStats.
+        self.requests = 0
+        self.throttled = 0
+        # fetch_product contra la caché de validadores: cuántas consultas y
+        # cuántas acabaron en 304.
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self._caches: Set[JsonFileCache] = set()
+        # Specs de la página HTML completa (fallback de Shopify): el refresh
+        # solo necesita el precio y lo apaga; lo ya cacheado se sigue usando.
+        self.enrich_specs = True
+        self.page_spec_requests = 0
+
+    def _pool(self, url: str) -> HostPool:
+        pool = host_pool(url)
+        self._hosts.add(pool.host)
+        return pool
+
+    def _http_get(self, url: str, *, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> HttpResponse:
+        """
+        One pooled GET (sync — wrap it in `sync_fetch_with_retry`). Raises
+        urllib's HTTPError/URLError like `urlopen` did.
+        """
+        return self._pool(url).request(url, headers=headers, timeout=timeout)
+
+    async def _ahttp_get(self, url: str, *, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> HttpResponse:
+        """
+        One pooled GET on the event loop (wrap it in `async_fetch_with_retry`),
+        paced by the host's shared rate limiter and reported back to it.
+        """
+        limiter = host_limiter(url)
+        async with limiter.slot():
+            self.requests += 1
+            try:
+                resp = await self._pool(url).arequest(url, headers=headers, timeout=timeout)
+            except urllib.error.HTTPError as e:
+                if e.code in _THROTTLE_HTTP_CODES:
+                    self.throttled += 1
+                    limiter.on_throttle(_retry_after_s(e))
+                raise
+        limiter.on_success()
+        return resp
+
+    async def _fetch(
+        self,
+        url: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+        label: str = "",
+        max_retries: int = 4,
+        base_delay: float = 3.0,
+        check: Optional[Callable[[HttpResponse], None]] = None,
+        conditional: bool = False,
+    ) -> HttpResponse:
+        """
+        Pooled GET with `async_fetch_with_retry` around it — the fetch path
+        every store scraper goes through. `check` runs on each response
+        inside the retry loop (e.g. to raise ScraperGone on a redirect).
+
+        `conditional` marks the request a product's data comes from: under
+        `fetch_product` the first such request carries the cached validators
+        and raises NotModified on a 304.
+        """
+        pending = _PRODUCT_FETCH.get() if conditional else None
+        if pending is not None and pending.sent:
+            pending = None  # solo la petición principal del producto
+        if pending is not None:
+            pending.sent = True
+            if pending.entry is not None:
+                headers = {**(headers or {}), **pending.entry.conditional_headers()}
+
+        async def _once() -> HttpResponse:
+            resp = await self._ahttp_get(url, headers=headers, timeout=timeout)
+            if pending is not None:
+                if resp.status == 304:
+                    raise NotModified(url)
+                pending.etag = resp.headers.get("ETag")
+                pending.last_modified = resp.headers.get("Last-Modified")
+            if check is not None:
+                check(resp)
+            return resp
+
+        return await async_fetch_with_retry(_once, label=label or url, max_retries=max_retries, base_delay=base_delay)
+
+    async def fetch_product(self, url: str) -> FetchResult:
+        """
+        `scrape_product` behind the on-disk validator cache (http_cache.py).
+        A 304 to the product's main request returns the cached OK result
+        without re-parsing; a fresh OK result refreshes the cache entry.
+        """
+        return await self._fetch_cached(url, self.scrape_product, price_only=False)
+
+    async def fetch_price(self, url: str) -> FetchResult:
+        """
+        `scrape_price` behind the same validator cache. Any entry can answer
+        a 304 here; the entries it writes are marked price-only so that
+        `fetch_product` never serves them as a full product.
+        """
+        return await self._fetch_cached(url, self.scrape_price, price_only=True)
+
+    async def _fetch_cached(
+        self, url: str, scrape: Callable[[str], Awaitable[FetchResult]], *, price_only: bool,
+    ) -> FetchResult:
+        if not CACHE_ENABLED:
+            return await scrape(url)
+
+        cache = validator_cache(url)
+        self._caches.add(cache)
+        entry = cache.get(url)
+        if entry is not None and entry.price_only and not price_only:
+            entry = None  # sin specs/imágenes: no vale como producto completo
+        pending = _ProductFetch(entry)
+        self.cache_lookups += 1
+        token = _PRODUCT_FETCH.set(pending)
+        try:
+            result = await scrape(url)
+        except NotModified:
+            self.cache_hits += 1
+            return FetchResult(FetchOutcome.OK, product=Product(**entry.product))
+        finally:
+            _PRODUCT_FETCH.reset(token)
+
+        if result.outcome is FetchOutcome.OK and result.product is not None:
+            if pending.etag or pending.last_modified:
+                cache.put(url, CacheEntry(pending.etag, pending.last_modified, result.product.to_dict(), price_only))
+            else:
+                cache.discard(url)
+        elif result.outcome in (FetchOutcome.NO_PRICE, FetchOutcome.GONE):
+            cache.discard(url)
+        return result
+
+    async def _page_specs(
+        self,
+        url: str,
+        handle: str,
+        updated_at: Optional[str],
+        parse: Callable[[str], Dict[str, str]],
+        *,
+        headers: Dict[str, str],
+        label: str,
+    ) -> Dict[str, str]:
+        """
+        Specs from the full product page at `url`, for when the JSON's
+        body_html lacks them. Read once per product version: the result is
+        kept in the spec cache under `handle` + the JSON's `updated_at`.
+        With `enrich_specs` off only the cache answers — no request.
+        A failed request returns {} and is not cached.
+        """
+        cache = spec_cache(url) if CACHE_ENABLED else None
+        if cache is not None:
+            self._caches.add(cache)
+            cached = cache.fresh(handle, updated_at)
+            if cached is not None:
+                return cached
+        if not self.enrich_specs:
+            return {}
+
+        self.page_spec_requests += 1
+        try:
+            resp = await self._fetch(url, headers=headers, timeout=15, label=label, max_retries=2)
+            specs = parse(resp.text())
+        except Exception as e:
+            print(f"[{label}] HTML fallback error: {e}")
+            return {}
+        if cache is not None and updated_at:
+            cache.put(handle, SpecEntry(updated_at, specs))
+        return specs
+
+    async def scan_category(self, url: str) -> CategoryScan:
+        """
+        `scrape_category` plus whatever complete products the listing carries.
+        Default: URLs only — the store's listing has no full product data.
+        """
+        return CategoryScan(await self.scrape_category(url))
+
+    async def prefetch_listing(self, category_url: str, urls: List[str]) -> Dict[str, FetchResult]:
+        """
+        Results for as many of `urls` as the store's category listing can
+        answer in bulk, keyed by the given URL. URLs left out get the
+        per-product `fetch_product`. Default: none (no bulk source).
+        """
+        return {}
 
     async def init(self):
         """No-op for compatibility."""
         pass
 
     async def close(self):
-        """No-op for compatibility."""
-        pass
+        """Release the keep-alive connections this scraper opened and persist its caches."""
+        await aclose_host_pools(self._hosts)
+        self._hosts.clear()
+        for cache in self._caches:
+            cache.save()
+        self._caches.clear()
 
     @abstractmethod
     async def scrape_product(self, url: str) -> FetchResult:
@@ -330,3 +925,12 @@ class BaseScraper(ABC):
     @abstractmethod
     async def scrape_category(self, url: str) -> List[str]:
         pass
+
+    async def scrape_price(self, url: str) -> FetchResult:
+        """
+        Same FetchResult contract as `scrape_product`, but only price,
+        original price and outcome are guaranteed — what the refresh
+        feeds to `pricing.decide_price_update`. Stores override it to skip
+        spec/description/gallery parsing. Default: the full scrape.
+        """
+        return await self.scrape_product(url)
@@ -0,0 +1,97 @@
+"""
+catalog_snapshot.py — Foto del catálogo compartida por todas las etapas de
+un `discover`.
+
+Un solo `discover` leía la tabla `rackets` entera cinco veces: RacketManager
+(get_all_rackets_for_manager), mark_discontinued, finalize_comparison_flags,
+el dedupe (fetch_all_rackets) y la sincronización de radar
+(fetch_rackets_needing_metrics). Cada etapa además veía el catálogo en un
+momento distinto.
+
+Ahora se carga UNA vez con la unión de columnas que necesitan todas
+(SNAPSHOT_COLUMNS) y se pasa a cada etapa:
+  - `select(columns, where=...)` devuelve copias proyectadas, como haría
+    una lectura real — una etapa no puede tocar la foto sin escribir antes;
+  - cada etapa, tras escribir en Supabase, refleja lo escrito con
+    `apply(rows)` (upserts e inserts con su `id`) o `remove(ids)`, así la
+    siguiente etapa ve el catálogo como quedó.
+
+Solo vive lo que dura el run; no sustituye a Supabase como fuente de verdad.
+"""
+
+import copy
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from supabase import Client
+
+from . import db
+from .pricing import STORES
+
+RADAR_COLUMNS = ("radar_potencia", "radar_control", "radar_manejabilidad", "radar_punto_dulce", "radar_salida_bola")
+
+SNAPSHOT_COLUMNS = (
+    ("id", "slug", "name", "brand", "model", "description", "images", "specs",
+     "on_offer", "comparison_only", "discontinued",
+     "characteristics_shape", "characteristics_balance", "characteristics_hardness")
+    + tuple(
+        f"{s}_{field}" for s in STORES
+        for field in ("actual_price", "original_price", "discount_percentage", "link", "last_seen")
+    )
+    + RADAR_COLUMNS
+)
+
+
+def _columns(columns: str) -> List[str]:
+    return [c.strip() for c in columns.split(",") if c.strip()]
+
+
+class CatalogSnapshot:
+    """The `rackets` rows of one run, kept in id order and patched as stages write."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            self._rows[row["id"]] = dict(row)
+
+    @classmethod
+    def load(cls, client: Client) -> "CatalogSnapshot":
+        return cls(db.paginate(client, "rackets", ", ".join(SNAPSHOT_COLUMNS)))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def select(self, columns: str, where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """
+        Deep copies of the rows (optionally filtered), projected to `columns`
+        — a comma-separated list, as in `db.paginate`. Asking for a column the
+        snapshot doesn't carry is a bug in SNAPSHOT_COLUMNS, not a NULL.
+        """
+        cols = _columns(columns)
+        missing = [c for c in cols if c not in SNAPSHOT_COLUMNS]
+        if missing:
+            raise KeyError(f"columns not in the catalog snapshot: {', '.join(missing)}")
+        return [
+            {c: copy.deepcopy(row.get(c)) for c in cols}
+            for row in self._rows.values()
+            if where is None or where(row)
+        ]
+
+    def apply(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Mirror written rows: existing ids are patched column by column, new ids appended."""
+        for row in rows:
+            if row.get("id") is None:
+                continue
+            current = self._rows.setdefault(row["id"], {})
+            current.update(copy.deepcopy({k: v for k, v in row.items() if k in SNAPSHOT_COLUMNS}))
+
+    def carry_names(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach the known `name` to partial rows (NOT NULL — see db._carry_required_not_null_columns)."""
+        return [
+            {**r, "name": self._rows[r["id"]].get("name")}
+            if "name" not in r and r.get("id") in self._rows else r
+            for r in rows
+        ]
+
+    def remove(self, ids: Iterable[int]) -> None:
+        for rid in ids:
+            self._rows.pop(rid, None)
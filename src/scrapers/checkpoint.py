@@ -0,0 +1,111 @@
+"""
+checkpoint.py — Checkpoint local del job `refresh` para poder reanudarlo.
+
+Si un `refresh --store` muere a mitad (timeout de CI, crash), lo ya
+volcado a Supabase está a salvo (refresh_writer.py), pero el siguiente run
+volvía a pedir TODAS las URLs. El writer guarda aquí, en cada flush:
+
+  - los ids ya resueltos (OK / NO_PRICE / GONE) con su outcome,
+  - las decisiones pendientes — los GONE retenidos para el check de
+    gone_cap, que aún no se han escrito,
+  - lo que cada fila sumó a las métricas (outcome, cobertura antes/después,
+    cambio de precio), FAILED incluidas, y los contadores del run
+    (peticiones, caché...). Al reanudar, `resumed_stats` rehace los
+    contadores por fila solo con las filas que se saltan — las que se
+    vuelven a pedir se cuentan una vez, en este run — para que los
+    guardrails cubran el run completo sin contar nada dos veces.
+
+`refresh --resume` carga el checkpoint si es más reciente que
+`--fresh-hours` y salta esos ids; además salta las filas cuyo
+`{store}_price_checked_at` cae dentro de esa misma ventana. Un FAILED nunca
+cuenta como resuelto. El checkpoint se borra al terminar el run.
+"""
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from .base_scraper import FetchOutcome
+from .http_cache import CACHE_DIR
+from .report import ROW_COUNTERS, StoreRunStats
+
+
+def parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """
+    Timestamp de Supabase/PostgREST → datetime aware. Tolera 'Z' y
+    fracciones de segundo de cualquier longitud, que `fromisoformat` de
+    Python 3.10 rechaza. None si no se puede interpretar.
+    """
+    if not value:
+        return None
+    value = value.replace("Z", "+00:00")
+    value = re.sub(r"\.(\d+)", lambda m: "." + m.group(1)[:6].ljust(6, "0"), value, count=1)
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class RefreshCheckpoint:
+    store: str
+    started_at: str
+    processed: Dict[str, str] = field(default_factory=dict)  # racket id → FetchOutcome.value
+    deferred_gone: List[Dict[str, Any]] = field(default_factory=list)
+    newly_gone: int = 0
+    stats: Dict[str, Any] = field(default_factory=dict)
+    # racket id → [outcome, priced_before, priced_after, price_changed], every row fed to the writer
+    tallies: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @staticmethod
+    def path_for(store: str) -> str:
+        return os.path.join(CACHE_DIR, f"refresh-{store}.json")
+
+    @classmethod
+    def load(cls, store: str, max_age_hours: float) -> Optional["RefreshCheckpoint"]:
+        """The store's checkpoint, or None if missing, unreadable or older than `max_age_hours`."""
+        try:
+            with open(cls.path_for(store), encoding="utf-8") as f:
+                cp = cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            print(f"  ⚠️  Checkpoint ilegible para {store}, se ignora: {e}")
+            return None
+        started = parse_iso(cp.started_at)
+        if started is None or datetime.now(timezone.utc) - started > timedelta(hours=max_age_hours):
+            return None
+        return cp
+
+    def resumed_stats(self, skipped_ids: Iterable[str]) -> StoreRunStats:
+        """
+        Stats to resume with: the run-level counters as saved (fields this
+        version doesn't know are dropped), and the per-row ones rebuilt from
+        the tallies of the rows this run skips.
+        """
+        known = {f.name for f in fields(StoreRunStats)}
+        carried = {k: v for k, v in self.stats.items() if k in known and k not in ROW_COUNTERS and k != "store"}
+        stats = StoreRunStats(store=self.store, **carried)
+        for rid in skipped_ids:
+            tally = self.tallies.get(rid)
+            if tally is not None:
+                stats.record_row(FetchOutcome(tally[0]), *tally[1:])
+        return stats
+
+    def save(self) -> None:
+        path = self.path_for(self.store)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.path_for(self.store))
+        except FileNotFoundError:
+            pass
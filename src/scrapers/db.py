@@ -12,16 +12,27 @@ sync_catalog.py:
   2. Batched writes. `mark_discontinued_rackets` did one HTTP request per
      racket just to bump `last_seen` (~1700 requests on a full catalog).
      `batch_upsert` turns that into a handful of chunked upserts.
+
+Full-table reads are keyset-paginated on `id` and fetched concurrently (see
+`paginate`): a discover run reads `rackets` several times, and each read
+used to be one sequential round-trip per 1000 rows.
 """
 
+import math
 import os
-from typing import Any, Dict, Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from supabase import Client, create_client
 
+if TYPE_CHECKING:
+    from .catalog_snapshot import CatalogSnapshot
+
 PAGE_SIZE = 1000
 UPSERT_BATCH_SIZE = 200
+ID_FILTER_CHUNK = 500  # ids per `id=in.(...)` filter — keeps the request URL short
+PAGINATE_WORKERS = 4  # páginas en vuelo a la vez por lectura completa
 REQUIRED_ENV_VARS = ("SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY")
 
 
@@ -47,25 +58,96 @@ def get_client() -> Client:
     return create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_ROLE_KEY"])
 
 
-def paginate(client: Client, table: str, columns: str) -> List[Dict[str, Any]]:
-    """Fetch every row of `table`, selecting `columns`, in PAGE_SIZE chunks."""
+def _query(client: Client, table: str, columns: str, where: Optional[Callable[[Any], Any]], **select_kwargs):
+    query = client.table(table).select(columns, **select_kwargs)
+    return where(query) if where is not None else query
+
+
+def _count_and_bounds(
+    client: Client, table: str, where: Optional[Callable[[Any], Any]], key: str, pool: ThreadPoolExecutor,
+) -> Tuple[int, Any, Any]:
+    """Exact row count plus the min and max `key` of the filtered rows, as two concurrent requests."""
+    first = pool.submit(lambda: _query(client, table, key, where, count="exact").order(key).limit(1).execute())
+    last = pool.submit(lambda: _query(client, table, key, where).order(key, desc=True).limit(1).execute())
+    first, last = first.result(), last.result()
+    if not first.data:
+        return 0, None, None
+    count = first.count if first.count is not None else PAGE_SIZE
+    return count, first.data[0][key], last.data[0][key]
+
+
+def _fetch_key_range(
+    client: Client, table: str, columns: str, where: Optional[Callable[[Any], Any]], key: str, lo: Any, hi: Any,
+) -> List[Dict[str, Any]]:
+    """Rows with lo <= key <= hi, by keyset pages of PAGE_SIZE (`key > last seen`), in key order."""
     rows: List[Dict[str, Any]] = []
-    page = 0
+    after = None
     while True:
-        start = page * PAGE_SIZE
-        end = start + PAGE_SIZE - 1
-        result = client.table(table).select(columns).range(start, end).execute()
-        chunk = result.data or []
+        query = _query(client, table, columns, where)
+        query = query.gte(key, lo) if after is None else query.gt(key, after)
+        chunk = query.lte(key, hi).order(key).limit(PAGE_SIZE).execute().data or []
         rows.extend(chunk)
-        if len(chunk) < PAGE_SIZE:
-            break
-        page += 1
+        if len(chunk) < PAGE_SIZE or chunk[-1][key] == hi:
+            return rows
+        after = chunk[-1][key]
+
+
+def paginate(
+    client: Client,
+    table: str,
+    columns: str,
+    *,
+    where: Optional[Callable[[Any], Any]] = None,
+    key: str = "id",
+    workers: int = PAGINATE_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every row of `table`, selecting `columns`, ordered by `key`.
+    `where` adds filters to each request (e.g. `lambda q: q.eq("store", s)`);
+    it must not add its own ordering.
+
+    An exact count and the min/max key come first (one round-trip, two
+    requests in parallel). For an integer key the [min, max] span is then
+    cut into ~count/PAGE_SIZE ranges fetched concurrently, `workers` at a
+    time, each one by keyset (`key > last seen`) rather than by offset: a
+    row inserted or deleted mid-read can't shift another one into the
+    previous page or out of the next, so no row is read twice or skipped.
+    Non-integer keys (uuid) keep the keyset walk, sequentially.
+    """
+    projected = [c.strip() for c in columns.split(",")]
+    extra_key = "*" not in projected and key not in projected
+    if extra_key:
+        columns = f"{columns}, {key}"
+
+    with ThreadPoolExecutor(max_workers=max(workers, 2)) as pool:
+        count, lo, hi = _count_and_bounds(client, table, where, key, pool)
+        if not count:
+            return []
+        if isinstance(lo, int) and isinstance(hi, int):
+            n_ranges = max(1, min(math.ceil(count / PAGE_SIZE), hi - lo + 1))
+            width = math.ceil((hi - lo + 1) / n_ranges)
+            bounds = [(start, min(start + width - 1, hi)) for start in range(lo, hi + 1, width)]
+        else:
+            bounds = [(lo, hi)]
+        parts = pool.map(lambda b: _fetch_key_range(client, table, columns, where, key, *b), bounds)
+        rows = [row for part in parts for row in part]
+
+    if extra_key:
+        for row in rows:
+            row.pop(key, None)
     return rows
 
 
+def read_rackets(client: Client, columns: str, snapshot: Optional["CatalogSnapshot"] = None) -> List[Dict[str, Any]]:
+    """Full `rackets` read: from the run's catalog snapshot when there is one, else paginated."""
+    if snapshot is not None:
+        return snapshot.select(columns)
+    return paginate(client, "rackets", columns)
+
+
 def _fetch_names(client: Client, ids: List[int]) -> Dict[int, str]:
     names: Dict[int, str] = {}
-    chunk_size = 500
+    chunk_size = ID_FILTER_CHUNK
     for i in range(0, len(ids), chunk_size):
         chunk = ids[i : i + chunk_size]
         result = client.table("rackets").select("id, name").in_("id", chunk).execute()
@@ -94,26 +176,83 @@ def _carry_required_not_null_columns(client: Client, rows: List[Dict[str, Any]])
     ]
 
 
-def batch_upsert(client: Client, table: str, rows: List[Dict[str, Any]], *, batch_size: int = UPSERT_BATCH_SIZE) -> int:
+def batch_upsert(
+    client: Client,
+    table: str,
+    rows: List[Dict[str, Any]],
+    *,
+    batch_size: int = UPSERT_BATCH_SIZE,
+    snapshot: Optional["CatalogSnapshot"] = None,
+) -> int:
     """
     Upsert `rows` in chunks. Every row MUST carry the primary key `id` and
     the SAME set of columns as the other rows in its chunk — Postgres fills
     any column missing from a given row's JSON with NULL, so mixing rows
     with different column sets in one chunk would silently null out
     columns some rows never intended to touch.
+
+    With the run's catalog `snapshot`, `name` is carried from memory instead
+    of re-read, and the written rows are mirrored into the snapshot.
     """
     if not rows:
         return 0
     if table == "rackets":
+        if snapshot is not None:
+            rows = snapshot.carry_names(rows)
         rows = _carry_required_not_null_columns(client, rows)
     written = 0
     for i in range(0, len(rows), batch_size):
         chunk = rows[i : i + batch_size]
         client.table(table).upsert(chunk, on_conflict="id").execute()
         written += len(chunk)
+    if snapshot is not None:
+        snapshot.apply(rows)
     return written
 
 
+def batch_upsert_grouped(
+    client: Client, table: str, rows: List[Dict[str, Any]], *, snapshot: Optional["CatalogSnapshot"] = None,
+) -> int:
+    """
+    `batch_upsert` for rows with heterogeneous column sets: rows are grouped
+    by their exact set of columns (see batch_upsert on why they can't mix)
+    and each group is upserted in chunks. Row order within a group is kept.
+    """
+    groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    return sum(batch_upsert(client, table, group, snapshot=snapshot) for group in groups.values())
+
+
+def batch_insert(client: Client, table: str, rows: List[Dict[str, Any]], *, batch_size: int = UPSERT_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Insert brand-new rows in chunks and return what Postgres stored (with
+    the generated `id`s), in input order. Rows are grouped by column set
+    first, like batch_upsert_grouped: a column missing from one row of a
+    multi-row insert would be written as NULL instead of taking its default.
+    """
+    groups: Dict[frozenset, List[int]] = {}
+    for i, row in enumerate(rows):
+        groups.setdefault(frozenset(row), []).append(i)
+    inserted: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+    for positions in groups.values():
+        for i in range(0, len(positions), batch_size):
+            chunk = positions[i : i + batch_size]
+            result = client.table(table).insert([rows[p] for p in chunk]).execute()
+            # PostgREST returns the representation in the order it was sent.
+            for p, stored in zip(chunk, result.data or []):
+                inserted[p] = stored
+    return [r for r in inserted if r is not None]
+
+
+def batch_delete(client: Client, table: str, ids: Iterable[int]) -> int:
+    """Delete rows by primary key with one `id=in.(...)` request per ID_FILTER_CHUNK ids."""
+    ids = list(dict.fromkeys(ids))
+    for i in range(0, len(ids), ID_FILTER_CHUNK):
+        client.table(table).delete().in_("id", ids[i : i + ID_FILTER_CHUNK]).execute()
+    return len(ids)
+
+
 def get_slug_id_map(client: Client) -> Dict[str, int]:
     rows = paginate(client, "rackets", "id, slug")
     return {r["slug"]: r["id"] for r in rows if r.get("slug")}
@@ -121,7 +260,7 @@ def get_slug_id_map(client: Client) -> Dict[str, int]:
 
 def get_rackets_for_store(client: Client, store: str) -> List[Dict[str, Any]]:
     """Every racket that has a URL for `store`, with what's needed to decide a price update."""
-    cols = f"id, slug, {store}_link, {store}_actual_price, {store}_original_price"
+    cols = f"id, slug, on_offer, {store}_link, {store}_actual_price, {store}_original_price, {store}_price_checked_at"
     rows = paginate(client, "rackets", cols)
     return [r for r in rows if r.get(f"{store}_link")]
 
@@ -138,7 +277,29 @@ def record_price_history(client: Client, entries: List[Dict[str, Any]]) -> int:
     return written
 
 
-def finalize_comparison_flags(client: Client) -> int:
+def get_price_history_by_racket(client: Client, store: str, since_iso: str) -> Dict[int, List[float]]:
+    """`store`'s recorded prices per racket since `since_iso`, oldest first (refresh scheduler input)."""
+    rows = paginate(
+        client, "price_history", "racket_id, price, recorded_at",
+        where=lambda q: q.eq("store", store).gte("recorded_at", since_iso),
+    )
+    history: Dict[int, List[float]] = {}
+    for r in sorted(rows, key=lambda r: r.get("recorded_at") or ""):
+        if r.get("price") is not None:
+            history.setdefault(r["racket_id"], []).append(float(r["price"]))
+    return history
+
+
+def get_price_watch_counts(client: Client) -> Dict[int, int]:
+    """Active price alerts per racket — the scheduler's popularity signal."""
+    rows = paginate(client, "price_watch", "racket_id", where=lambda q: q.eq("active", True))
+    counts: Dict[int, int] = {}
+    for r in rows:
+        counts[r["racket_id"]] = counts.get(r["racket_id"], 0) + 1
+    return counts
+
+
+def finalize_comparison_flags(client: Client, snapshot: Optional["CatalogSnapshot"] = None) -> int:
     """
     Recompute `comparison_only`/`on_offer` for the whole catalog from
     currently-stored prices, in one pass after all three per-store refresh
@@ -154,7 +315,7 @@ def finalize_comparison_flags(client: Client) -> int:
         + ", "
         + ", ".join(f"{s}_discount_percentage" for s in STORES)
     )
-    rows = paginate(client, "rackets", cols)
+    rows = read_rackets(client, cols, snapshot)
 
     updates = []
     for row in rows:
@@ -165,16 +326,18 @@ def finalize_comparison_flags(client: Client) -> int:
         if comparison_only != row.get("comparison_only") or on_offer != row.get("on_offer"):
             updates.append({"id": row["id"], "comparison_only": comparison_only, "on_offer": on_offer})
 
-    return batch_upsert(client, "rackets", updates)
+    return batch_upsert(client, "rackets", updates, snapshot=snapshot)
 
 
-def update_last_seen(client: Client, store: str, racket_ids: Iterable[int], now_iso: str) -> int:
+def update_last_seen(
+    client: Client, store: str, racket_ids: Iterable[int], now_iso: str, snapshot: Optional["CatalogSnapshot"] = None,
+) -> int:
     """Batch-update `{store}_last_seen` for every racket id seen in this store's category scan."""
     rows = [{"id": rid, f"{store}_last_seen": now_iso} for rid in racket_ids]
-    return batch_upsert(client, "rackets", rows)
+    return batch_upsert(client, "rackets", rows, snapshot=snapshot)
 
 
-def mark_discontinued(client: Client, threshold_iso: str) -> List[int]:
+def mark_discontinued(client: Client, threshold_iso: str, snapshot: Optional["CatalogSnapshot"] = None) -> List[int]:
     """
     Mark discontinued every racket that has been scanned at least once but
     has no `last_seen` newer than `threshold_iso` in any of the three
@@ -185,7 +348,7 @@ def mark_discontinued(client: Client, threshold_iso: str) -> List[int]:
     from .pricing import STORES
 
     cols = "id, slug, discontinued, comparison_only, " + ", ".join(f"{s}_last_seen" for s in STORES)
-    rows = paginate(client, "rackets", cols)
+    rows = read_rackets(client, cols, snapshot)
 
     to_mark: List[int] = []
     for row in rows:
@@ -201,11 +364,11 @@ def mark_discontinued(client: Client, threshold_iso: str) -> List[int]:
             to_mark.append(row["id"])
 
     if to_mark:
-        batch_upsert(client, "rackets", [{"id": rid, "discontinued": True} for rid in to_mark])
+        batch_upsert(client, "rackets", [{"id": rid, "discontinued": True} for rid in to_mark], snapshot=snapshot)
     return to_mark
 
 
-def get_all_rackets_for_manager(client: Client) -> List[Dict[str, Any]]:
+def get_all_rackets_for_manager(client: Client, snapshot: Optional["CatalogSnapshot"] = None) -> List[Dict[str, Any]]:
     """Full catalog rows needed by RacketManager for cross-store fuzzy matching."""
     from .pricing import STORES
 
@@ -213,4 +376,4 @@ def get_all_rackets_for_manager(client: Client) -> List[Dict[str, Any]]:
         f"{s}_{field}" for s in STORES for field in ("actual_price", "original_price", "discount_percentage", "link")
     )
     cols = f"id, slug, brand, model, name, description, images, specs, {price_cols}"
-    return paginate(client, "rackets", cols)
+    return read_rackets(client, cols, snapshot)
@@ -1,31 +1,54 @@
 #!/usr/bin/env python3
 """
-deduplicate_rackets.py — One-shot deduplication of rackets table in Supabase.
-
-Merges duplicate rackets caused by "(pala)" suffix, "brand-brand-" slug bugs,
-and "carb-on" vs "carbon" spelling variations.
-
-For each duplicate group:
-  1. Pick canonical entry (prefer more prices, then cleaner slug)
+deduplicate_rackets.py — Deduplication engine for the rackets table in Supabase.
+
+Loads the catalog once and builds a single merge plan from every rule family:
+  - same_model: duplicates caused by "(pala)" suffix, "brand-brand-" slug bugs,
+    and "carb-on" vs "carbon" spelling variations, split by year bucket and
+    variant suffix (fdb, woman...).
+  - merge_player: player editions — model == base model + " " + player name.
+  - delete_comp: a comparison_only entry for a model that is also buyable
+    (same model once years are stripped). The comparison entry is just
+    deleted — nothing of it is merged into the buyable one.
+  - delete_junior: junior rackets, deleted outright.
+  - clean_names: strip "(pala)" store noise from names before planning.
+Rows claimed by a same_model group are not considered by the pair rules.
+The last two families used to live in scripts/dedup_rackets.py, which
+re-fetched the whole table on its own; it is now a thin CLI over this module.
+
+For each merge group in the plan (same_model, merge_player):
+  1. Pick canonical entry (same_model: more prices, then cleaner slug;
+     pair rules: the base model / the buyable entry)
   2. Transfer prices + images from duplicates to canonical
   3. Take radar metrics from the most trusted entry (most prices)
   4. Delete duplicate entries
+Steps 2-4 run server-side in one transaction (RPC merge_racket_duplicates,
+supabase/migrations/20261017120000_merge_racket_duplicates.sql), which also
+repoints price_history/price_watch; without it, they are done client-side.
 
 Usage:
   python -m src.scrapers.deduplicate_rackets --dry-run
   python -m src.scrapers.deduplicate_rackets
+  python -m src.scrapers.deduplicate_rackets --rules merge_player --dry-run
 """
 
 import re
 import os
 import sys
 import argparse
-import unicodedata
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, FrozenSet, Iterable, List, Optional
 
 from dotenv import load_dotenv
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 
+from . import db
+from .paddle_normalizer import name_forms
+
+if TYPE_CHECKING:
+    from .catalog_snapshot import CatalogSnapshot
+
 load_dotenv()
 
 
@@ -55,13 +78,43 @@ STORE_PRICE_COLS = [
     for store in STORES
     for col in [
         f"{store}_actual_price", f"{store}_original_price",
-        f"{store}_discount_percentage", f"{store}_link",
+        f"{store}_discount_percentage", f"{store}_link", f"{store}_last_seen",
     ]
 ]
 RADAR_COLS = ["radar_potencia", "radar_control", "radar_manejabilidad", "radar_punto_dulce", "radar_salida_bola"]
 
 # Player edition suffixes that mark distinct product variants — do NOT merge across these
 VARIANT_SUFFIXES = ["fdb", "woman", "w", "light", "lite", "junior", "jr"]
+_VARIANT_RES = [(suffix, re.compile(rf"\b{re.escape(suffix)}\b")) for suffix in VARIANT_SUFFIXES]
+_YEAR_2020S_RE = re.compile(r"\b(202\d)\b")
+
+# Rule families of the merge plan (see module docstring)
+RULE_SAME_MODEL = "same_model"
+RULE_PLAYER_EDITION = "merge_player"
+RULE_COMPARISON_ONLY = "delete_comp"
+RULE_JUNIOR = "delete_junior"
+RULE_CLEAN_NAMES = "clean_names"
+ALL_RULES: FrozenSet[str] = frozenset({
+    RULE_SAME_MODEL, RULE_PLAYER_EDITION, RULE_COMPARISON_ONLY, RULE_JUNIOR, RULE_CLEAN_NAMES,
+})
+
+# Words that disqualify a suffix from being a player name
+PRODUCT_KEYWORDS = {
+    "lite", "light", "team", "pro", "elite", "control", "ctrl", "force", "air",
+    "power", "silver", "gold", "black", "white", "blue", "red", "green", "orange",
+    "yellow", "grey", "gray", "soft", "hard", "speed", "tour", "carbon", "attack",
+    "comfort", "motion", "extreme", "crown", "mujer", "woman", "junior", "boy",
+    "girl", "man", "plus", "max", "ultra", "super", "mini", "nano", "flash",
+    "premium", "special", "limited", "edition", "edt", "series", "collection",
+    "gen", "generation", "version", "v2", "v3", "v4", "v5",
+    "2.0", "3.0", "4.0", "1.0", "2.5", "3.3", "3.4", "3.5",
+    "air", "fdb", "prf", "ltd",
+    "finish", "sand", "rough", "smooth", "texture", "mat", "gloss",
+    "round", "eva", "carbon", "fiber", "fibre", "composite",
+    "reedicion", "reedición", "reissue",
+}
+_ANY_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+_NAME_SPLIT_RE = re.compile(r"[\s.]+")
 
 _BRAND_ALIASES: dict = {
     "vibor-a": "vibor-a",
@@ -83,60 +136,25 @@ def normalize_brand(brand: str) -> str:
     return _BRAND_ALIASES.get(brand.lower().strip(), brand.lower().strip())
 
 
-# Country name translations: some stores name editions in Spanish, others in English.
-# Normalize all to canonical English so duplicates resolve to the same key.
-_COUNTRY_MAP: dict[str, str] = {
-    "españa": "spain", "espana": "spain",
-    "italia": "italy",
-    "mexico": "mexico", "méxico": "mexico",
-    "holanda": "netherlands",
-    "alemania": "germany",
-    "francia": "france",
-    "belgica": "belgium", "bélgica": "belgium",
-    "inglaterra": "england",
-    "eeuu": "usa",
-}
-_COUNTRY_RE = re.compile(
-    r'\b(' + '|'.join(re.escape(k) for k in _COUNTRY_MAP) + r')\b',
-    re.IGNORECASE,
-)
-
-
-def _strip_accents(s: str) -> str:
-    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-
-
 def normalize_name_base(s: str) -> str:
     """
     Normalize racket name WITHOUT stripping year.
     Used as grouping key — different years = different products.
+    Computed once per name by the shared paddle_normalizer.name_forms memo.
     """
-    if not s:
-        return ""
-    s = s.lower().strip()
-    s = _strip_accents(s)
-    s = re.sub(r"\s*\([^)]*\)\s*", " ", s)   # strip (pala), (padel), etc.
-    s = re.sub(r"\bpala\b", "", s)
-    s = re.sub(r"(?<=\w)-(?=\w)", "", s)       # carb-on → carbon
-    s = re.sub(r"\s+by\s+[a-z]+(?:\s+[a-z]+)*", "", s)  # strip "by agustin tapia" player attributions
-    # Strip material descriptors added inconsistently by stores
-    s = re.sub(r"\b(alum|aluminio)\b", "", s)
-    # Normalize country names: stores use local language (españa, italia...) or English (spain, italy...)
-    s = _COUNTRY_RE.sub(lambda m: _COUNTRY_MAP[_strip_accents(m.group(0).lower())], s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    return name_forms(s).dedup_base
 
 
 def extract_year(s: str) -> str | None:
-    m = re.search(r"\b(202\d)\b", s or "")
+    m = _YEAR_2020S_RE.search(s or "")
     return m.group(1) if m else None
 
 
 def get_variant_suffix(name: str) -> str:
     """Return variant suffix if present (fdb, woman, etc.), else empty string."""
     n = normalize_name_base(name)
-    for suffix in VARIANT_SUFFIXES:
-        if re.search(rf"\b{re.escape(suffix)}\b", n):
+    for suffix, pattern in _VARIANT_RES:
+        if pattern.search(n):
             return suffix
     return ""
 
@@ -163,23 +181,13 @@ def score_entry(row: dict) -> int:
     return score
 
 
-def fetch_all_rackets(client: Client) -> list:
-    rows = []
-    page_size = 1000
-    page = 0
-    while True:
-        cols = (
-            "id, slug, name, brand, model, images, specs, description, "
-            "on_offer, comparison_only, discontinued, "
-            + ", ".join(STORE_PRICE_COLS + RADAR_COLS)
-        )
-        result = client.table("rackets").select(cols).range(page * page_size, (page + 1) * page_size - 1).execute()
-        chunk = result.data or []
-        rows.extend(chunk)
-        if len(chunk) < page_size:
-            break
-        page += 1
-    return rows
+def fetch_all_rackets(client: Client, snapshot: Optional["CatalogSnapshot"] = None) -> list:
+    cols = (
+        "id, slug, name, brand, model, images, specs, description, "
+        "on_offer, comparison_only, discontinued, "
+        + ", ".join(STORE_PRICE_COLS + RADAR_COLS)
+    )
+    return db.read_rackets(client, cols, snapshot)
 
 
 def find_duplicate_groups(rows: list) -> list:
@@ -198,7 +206,7 @@ def find_duplicate_groups(rows: list) -> list:
         name_raw = r.get("model") or r.get("name", "") or ""
         base = normalize_name_base(name_raw)
         # Remove year from base for pre-grouping key
-        base_no_year = re.sub(r"\b202\d\b", "", base).strip()
+        base_no_year = _YEAR_2020S_RE.sub("", base).strip()
         variant = get_variant_suffix(name_raw)
         brand = normalize_brand(r.get("brand", ""))
         key = (brand, base_no_year, variant)
@@ -250,6 +258,158 @@ def find_duplicate_groups(rows: list) -> list:
     return final_groups
 
 
+def _plain_model(row: dict) -> str:
+    return name_forms(row["model"]).plain
+
+
+def _strip_years(s: str) -> str:
+    return _ANY_YEAR_RE.sub("", s).strip()
+
+
+def is_player_name(suffix: str) -> bool:
+    """True only if suffix looks like a real person's name: ≥2 words, no product keywords."""
+    suffix = suffix.strip().lstrip('- ').strip()
+    if not suffix:
+        return False
+    words = [w for w in _NAME_SPLIT_RE.split(suffix) if w]
+    # Must have at least 2 parts (first + last name, or initial + last)
+    if len(words) < 2:
+        return False
+    # None of the words should be product keywords
+    if any(w in PRODUCT_KEYWORDS for w in words):
+        return False
+    # All words should start with a letter (not digit)
+    return all(w[0].isalpha() for w in words)
+
+
+def _candidate_pairs(group: list, models: List[str]) -> dict:
+    """
+    {(i, j): (keep, drop, rule)} for every i < j in `group` matching a pair
+    rule, comparison-only first. `models` holds each row's plain model.
+
+    Candidates come from two hash indexes instead of an all-pairs scan:
+      - delete_comp: rows sharing the same year-less model.
+      - merge_player: for each model, every prefix ending at a space that is
+        itself another model of the brand ("longer == shorter + ' ' + suffix").
+    """
+    found = {}
+
+    by_base: dict = {}
+    for i, m in enumerate(models):
+        base = _strip_years(m)
+        if base:
+            by_base.setdefault(base, []).append(i)
+    for idxs in by_base.values():
+        for k, i in enumerate(idxs):
+            for j in idxs[k + 1:]:
+                a, b = group[i], group[j]
+                if a["comparison_only"] != b["comparison_only"]:
+                    comp = a if a["comparison_only"] else b
+                    buyable = b if a["comparison_only"] else a
+                    found[(i, j)] = (buyable, comp, RULE_COMPARISON_ONLY)
+
+    by_model: dict = {}
+    for i, m in enumerate(models):
+        by_model.setdefault(m, []).append(i)
+    for l, ml in enumerate(models):
+        cut = ml.find(" ")
+        while cut != -1:
+            for s in by_model.get(ml[:cut], ()):
+                key = (s, l) if s < l else (l, s)
+                if key not in found and is_player_name(ml[cut:].lstrip(" -").strip()):
+                    found[key] = (group[s], group[l], RULE_PLAYER_EDITION)
+            cut = ml.find(" ", cut + 1)
+
+    return found
+
+
+def find_edition_pairs(rows: list) -> list:
+    """
+    (keep, drop, rule) pairs for the player-edition and comparison-only rules,
+    per raw brand. A row joins at most one pair: the first one in row order
+    (i < j) that claims it. Callers pass rows ordered by brand, model.
+    """
+    by_brand: dict = {}
+    for r in rows:
+        by_brand.setdefault(r["brand"] or "", []).append(r)
+
+    pairs = []
+    seen_ids = set()
+    for group in by_brand.values():
+        models = [_plain_model(r) for r in group]
+        for (i, j), pair in sorted(_candidate_pairs(group, models).items()):
+            a, b = group[i], group[j]
+            if a["id"] in seen_ids or b["id"] in seen_ids:
+                continue
+            pairs.append(pair)
+            seen_ids.add(a["id"])
+            seen_ids.add(b["id"])
+    return pairs
+
+
+@dataclass
+class MergeGroup:
+    canonical: dict
+    duplicates: List[dict]
+    rule: str
+
+
+@dataclass
+class MergePlan:
+    junior: List[dict] = field(default_factory=list)
+    groups: List[MergeGroup] = field(default_factory=list)
+
+    @property
+    def planned_deletes(self) -> int:
+        return len(self.junior) + sum(len(g.duplicates) for g in self.groups)
+
+    @property
+    def merge_groups(self) -> List[MergeGroup]:
+        """Groups whose duplicates are merged into the canonical (everything but delete_comp)."""
+        return [g for g in self.groups if g.rule != RULE_COMPARISON_ONLY]
+
+    @property
+    def plain_deletes(self) -> List[int]:
+        """Ids deleted without merging anything: junior rackets and delete_comp entries."""
+        return [r["id"] for r in self.junior] + [
+            d["id"] for g in self.groups if g.rule == RULE_COMPARISON_ONLY for d in g.duplicates
+        ]
+
+
+def build_merge_plan(rows: list, rules: Iterable[str] = ALL_RULES) -> MergePlan:
+    """
+    One merge plan for the whole catalog: junior rackets to delete (with
+    delete_junior) plus every duplicate group from the enabled rule
+    families. Pure — no Supabase I/O.
+    """
+    rules = frozenset(rules)
+    plan = MergePlan()
+    adult_rows = []
+    for r in rows:
+        if RULE_JUNIOR in rules and is_junior_racket(r.get("name") or r.get("model") or ""):
+            plan.junior.append(r)
+        else:
+            adult_rows.append(r)
+
+    claimed = set()
+    if RULE_SAME_MODEL in rules:
+        for group in find_duplicate_groups(adult_rows):
+            group.sort(key=score_entry, reverse=True)
+            plan.groups.append(MergeGroup(group[0], group[1:], RULE_SAME_MODEL))
+            claimed.update(r["id"] for r in group)
+
+    if rules & {RULE_PLAYER_EDITION, RULE_COMPARISON_ONLY}:
+        remaining = sorted(
+            (r for r in adult_rows if r["id"] not in claimed),
+            key=lambda r: (r.get("brand") or "", r.get("model") or ""),
+        )
+        for keep, drop, rule in find_edition_pairs(remaining):
+            if rule in rules:
+                plan.groups.append(MergeGroup(keep, [drop], rule))
+
+    return plan
+
+
 def _strip_pala_noise(s: str) -> str:
     """Remove store noise: (pala) suffix, leading/trailing 'pala' word."""
     if not s:
@@ -260,146 +420,221 @@ def _strip_pala_noise(s: str) -> str:
     return s
 
 
-def _clean_pala_names(client: Client, rows: list, dry_run: bool) -> int:
-    """Strip stray (pala) noise from name/model fields. Returns count of rows fixed."""
-    fixed = 0
+def _clean_pala_names(rows: list) -> List[dict]:
+    """
+    Strip stray (pala) noise from name/model fields. Patches `rows` in place
+    (so the plan sees clean names without re-fetching the table) and returns
+    the updates to write, one per fixed row.
+    """
+    updates: List[dict] = []
     for r in rows:
         name_clean = _strip_pala_noise(r.get("name") or "")
         model_clean = _strip_pala_noise(r.get("model") or "")
-        updates: dict = {}
+        update: dict = {}
         if name_clean != (r.get("name") or ""):
-            updates["name"] = name_clean
+            update["name"] = name_clean
         if model_clean != (r.get("model") or ""):
-            updates["model"] = model_clean
-        if updates:
+            update["model"] = model_clean
+        if update:
             print(f"  clean id={r['id']} '{r.get('name')}' → '{name_clean}'")
-            if not dry_run:
-                client.table("rackets").update(updates).eq("id", r["id"]).execute()
-            fixed += 1
-    return fixed
+            r.update(update)
+            updates.append({"id": r["id"], **update})
+    return updates
+
+
+def _canonical_update(group: MergeGroup) -> dict:
+    """Columns to write on the canonical so it absorbs `group.duplicates`. Pure."""
+    canonical, duplicates = group.canonical, group.duplicates
+
+    print(f"[{canonical.get('brand')}] canonical id={canonical['id']} slug={canonical.get('slug')} ({group.rule})")
+
+    price_update: dict = {}
+    merged_images = list(canonical.get("images") or [])
+    merged_images_set = set(merged_images)
+
+    # Find entry with most prices for radar source (most reliable data)
+    all_entries = [canonical] + duplicates
+    radar_source = max(all_entries, key=lambda r: sum(1 for s in STORES if r.get(f"{s}_actual_price") is not None))
+
+    for dup in duplicates:
+        print(f"  merge <- id={dup['id']} slug={dup.get('slug')}")
+        for store in STORES:
+            price_col = f"{store}_actual_price"
+            if canonical.get(price_col) is None and dup.get(price_col) is not None:
+                for col in [f"{store}_actual_price", f"{store}_original_price",
+                            f"{store}_discount_percentage", f"{store}_link", f"{store}_last_seen"]:
+                    price_update[col] = dup.get(col)
+        for img in (dup.get("images") or []):
+            if img and img not in merged_images_set:
+                merged_images.append(img)
+                merged_images_set.add(img)
+
+    canonical_update: dict = {}
+    if price_update:
+        canonical_update.update(price_update)
+    if merged_images != (canonical.get("images") or []):
+        canonical_update["images"] = merged_images
+
+    # Sync radar from most-trusted entry if canonical differs or lacks values
+    if radar_source["id"] != canonical["id"]:
+        for col in RADAR_COLS:
+            src_val = radar_source.get(col)
+            can_val = canonical.get(col)
+            if src_val is not None and src_val != can_val:
+                canonical_update[col] = src_val
+                print(f"  radar {col}: {can_val} → {src_val} (from id={radar_source['id']})")
+
+    name_raw = canonical.get("name") or canonical.get("model") or ""
+    name_clean = re.sub(r"\s*\(pala\)\s*", " ", name_raw, flags=re.IGNORECASE).strip()
+    if name_clean != name_raw:
+        canonical_update["name"] = name_clean
+        canonical_update["model"] = name_clean
+
+    if canonical_update:
+        print(f"  updated canonical: {list(canonical_update.keys())}")
+    for dup in duplicates:
+        print(f"  deleted id={dup['id']} slug={dup.get('slug')}")
+    print()
+    return canonical_update
+
+
+def _write_updates(client: Client, updates: List[dict], rows_by_id: dict, snapshot: Optional["CatalogSnapshot"] = None) -> int:
+    """
+    Batched upsert of partial updates. Each row carries its current `name`
+    (NOT NULL — see db._carry_required_not_null_columns) from memory, so no
+    extra read is needed; rows are then grouped by column set.
+    """
+    rows = [{"name": rows_by_id[u["id"]].get("name"), **u} for u in updates]
+    return db.batch_upsert_grouped(client, "rackets", rows, snapshot=snapshot)
 
 
-def run(dry_run: bool, delete_cap: Optional[int] = 15) -> dict:
+# PostgREST code for "function not found in the schema cache".
+RPC_NOT_FOUND = "PGRST202"
+MERGE_RPC = "merge_racket_duplicates"
+
+
+def _merge_server_side(client: Client, groups: List[MergeGroup]) -> Optional[dict]:
+    """
+    Whole merge plan in one RPC call, applied atomically by Postgres. Returns
+    the RPC's {"merged", "deleted"} counts, or None if the function is not
+    deployed yet (caller falls back to the client-side merge).
     """
-    Deduplicate the catalog. `delete_cap` is a safety ceiling: if the plan
-    would delete more rows than that (junior rackets + duplicate merges
-    combined), nothing is deleted — the plan is printed for manual review
-    instead. This runs unattended every week; a store changing its HTML
-    template must not be able to trigger a mass deletion.
+    if not groups:
+        return {"merged": 0, "deleted": 0}
+    merges = [
+        {"canonical_id": g.canonical["id"], "duplicate_ids": [d["id"] for d in g.duplicates]}
+        for g in groups
+    ]
+    try:
+        return client.rpc(MERGE_RPC, {"merges": merges}).execute().data or {}
+    except APIError as e:
+        if e.code != RPC_NOT_FOUND:
+            raise
+        print(f"  ⚠️  RPC {MERGE_RPC} no disponible (¿migración sin aplicar?) — fusionando desde el cliente.")
+        return None
+
+
+def run(
+    dry_run: bool,
+    delete_cap: Optional[int] = 15,
+    rules: Iterable[str] = ALL_RULES,
+    snapshot: Optional["CatalogSnapshot"] = None,
+) -> dict:
+    """
+    Deduplicate the catalog with the enabled `rules` (default: all, as the
+    weekly discover runs it). `delete_cap` is a safety ceiling: if the plan
+    would delete more rows than that (junior rackets + comparison entries +
+    duplicate merges combined), nothing is deleted — the plan is printed for
+    manual review instead. This runs unattended every week; a store changing
+    its HTML template must not be able to trigger a mass deletion.
+
+    Writes are batched: name cleaning is one grouped upsert, junior rackets
+    and delete_comp entries one chunked `id=in.(...)` delete, and the merge
+    groups a single call to the merge_racket_duplicates RPC (one
+    transaction, price_history kept).
+    If the RPC is not deployed, the merged canonicals go out as a grouped
+    upsert followed by chunked deletes of the duplicates.
+
+    Inside `discover` the rows come from the run's catalog `snapshot`, and
+    every write here is mirrored back into it.
     """
     client = _get_client()
     print("Fetching rackets...")
-    rows = fetch_all_rackets(client)
+    rows = fetch_all_rackets(client, snapshot)
+    rows_by_id = {r["id"]: r for r in rows}
     print(f"Total: {len(rows)}")
 
-    # Strip (pala) noise from names before any other processing
-    print("\nCleaning (pala) noise from names...")
-    cleaned = _clean_pala_names(client, rows, dry_run)
-    if cleaned:
-        print(f"  Fixed: {cleaned} rackets")
-        # Re-fetch so subsequent steps work with clean names
-        if not dry_run:
-            rows = fetch_all_rackets(client)
-    else:
-        print("  No names needed cleaning.")
-
-    # Remove junior/kid rackets from DB and exclude from dedup
-    junior_rows = [r for r in rows if is_junior_racket(r.get("name") or r.get("model") or "")]
-    adult_rows = [r for r in rows if not is_junior_racket(r.get("name") or r.get("model") or "")]
-    rows = adult_rows
-
-    groups = find_duplicate_groups(rows)
-    for group in groups:
-        group.sort(key=score_entry, reverse=True)
-
-    total_planned_deletes = len(junior_rows) + sum(len(g) - 1 for g in groups)
-    print(f"Duplicate groups: {len(groups)} | junior rackets: {len(junior_rows)} | total a borrar: {total_planned_deletes}\n")
+    # Strip (pala) noise from names before any other processing. Rows are
+    # patched in memory, so the plan below already sees the clean names.
+    rules = frozenset(rules)
+    if RULE_CLEAN_NAMES in rules:
+        print("\nCleaning (pala) noise from names...")
+        clean_updates = _clean_pala_names(rows)
+        if clean_updates:
+            if not dry_run:
+                _write_updates(client, clean_updates, rows_by_id, snapshot)
+            print(f"  Fixed: {len(clean_updates)} rackets")
+        else:
+            print("  No names needed cleaning.")
+
+    plan = build_merge_plan(rows, rules)
+    junior_rows = plan.junior
+    by_rule = {rule: sum(1 for g in plan.groups if g.rule == rule)
+               for rule in sorted((RULE_SAME_MODEL, RULE_PLAYER_EDITION, RULE_COMPARISON_ONLY))}
+    total_planned_deletes = plan.planned_deletes
+    print(f"Duplicate groups: {len(plan.groups)} {by_rule} | junior rackets: {len(junior_rows)} | total a borrar: {total_planned_deletes}\n")
 
     if not dry_run and delete_cap is not None and total_planned_deletes > delete_cap:
         print(f"⚠️  ABORTADO: el plan borraría {total_planned_deletes} filas, por encima del techo de {delete_cap}.")
         print("Nada se ha borrado. Revisa con --dry-run y ejecuta manualmente si el plan es correcto.\n")
         for r in junior_rows:
             print(f"  [ABORTADO] borraría (junior) id={r['id']} name={r.get('name') or r.get('model')}")
-        for group in groups:
-            canonical, duplicates = group[0], group[1:]
-            for dup in duplicates:
-                print(f"  [ABORTADO] borraría id={dup['id']} slug={dup['slug']} (canonical id={canonical['id']} slug={canonical['slug']})")
+        for group in plan.groups:
+            canonical = group.canonical
+            for dup in group.duplicates:
+                print(f"  [ABORTADO] borraría id={dup['id']} slug={dup.get('slug')} ({group.rule}, canonical id={canonical['id']} slug={canonical.get('slug')})")
         return {"aborted": True, "planned_deletes": total_planned_deletes, "cap": delete_cap, "merged": 0, "deleted": 0}
 
     if junior_rows:
         print(f"Junior rackets to delete: {len(junior_rows)}")
         for r in junior_rows:
             print(f"  delete id={r['id']} name={r.get('name') or r.get('model')}")
-            if not dry_run:
-                client.table("rackets").delete().eq("id", r["id"]).execute()
-        print()
-
-    merged = 0
-    deleted = 0
-
-    for group in groups:
-        group.sort(key=score_entry, reverse=True)
-        canonical = group[0]
-        duplicates = group[1:]
-
-        print(f"[{canonical.get('brand')}] canonical id={canonical['id']} slug={canonical['slug']}")
-
-        price_update: dict = {}
-        merged_images = list(canonical.get("images") or [])
-        merged_images_set = set(merged_images)
-
-        # Find entry with most prices for radar source (most reliable data)
-        all_entries = [canonical] + duplicates
-        radar_source = max(all_entries, key=lambda r: sum(1 for s in STORES if r.get(f"{s}_actual_price") is not None))
-
-        for dup in duplicates:
-            print(f"  merge <- id={dup['id']} slug={dup['slug']}")
-            for store in STORES:
-                price_col = f"{store}_actual_price"
-                if canonical.get(price_col) is None and dup.get(price_col) is not None:
-                    for col in [f"{store}_actual_price", f"{store}_original_price",
-                                f"{store}_discount_percentage", f"{store}_link"]:
-                        price_update[col] = dup.get(col)
-            for img in (dup.get("images") or []):
-                if img and img not in merged_images_set:
-                    merged_images.append(img)
-                    merged_images_set.add(img)
-
-        canonical_update: dict = {}
-        if price_update:
-            canonical_update.update(price_update)
-        if merged_images != (canonical.get("images") or []):
-            canonical_update["images"] = merged_images
-
-        # Sync radar from most-trusted entry if canonical differs or lacks values
-        if radar_source["id"] != canonical["id"]:
-            for col in RADAR_COLS:
-                src_val = radar_source.get(col)
-                can_val = canonical.get(col)
-                if src_val is not None and src_val != can_val:
-                    canonical_update[col] = src_val
-                    print(f"  radar {col}: {can_val} → {src_val} (from id={radar_source['id']})")
-
-        name_raw = canonical.get("name") or canonical.get("model") or ""
-        name_clean = re.sub(r"\s*\(pala\)\s*", " ", name_raw, flags=re.IGNORECASE).strip()
-        if name_clean != name_raw:
-            canonical_update["name"] = name_clean
-            canonical_update["model"] = name_clean
-
-        if canonical_update:
-            if not dry_run:
-                client.table("rackets").update(canonical_update).eq("id", canonical["id"]).execute()
-            print(f"  updated canonical: {list(canonical_update.keys())}")
-            merged += 1
-
-        for dup in duplicates:
-            if not dry_run:
-                client.table("rackets").delete().eq("id", dup["id"]).execute()
-            print(f"  deleted id={dup['id']} slug={dup['slug']}")
-            deleted += 1
-
         print()
-
+    for group in plan.groups:
+        if group.rule == RULE_COMPARISON_ONLY:
+            dup = group.duplicates[0]
+            print(f"[{dup.get('brand')}] delete comparison_only id={dup['id']} slug={dup.get('slug')} "
+                  f"(buyable id={group.canonical['id']} slug={group.canonical.get('slug')})")
+
+    # Always computed: it is the dry-run preview and the fallback payload.
+    merge_groups = plan.merge_groups
+    plain_deletes = plan.plain_deletes
+    canonical_updates: List[dict] = []
+    duplicate_ids: List[int] = []
+    for group in merge_groups:
+        update = _canonical_update(group)
+        if update:
+            canonical_updates.append({"id": group.canonical["id"], **update})
+        duplicate_ids.extend(dup["id"] for dup in group.duplicates)
+
+    merged = len(canonical_updates)
+    deleted = len(duplicate_ids)
+    if not dry_run:
+        db.batch_delete(client, "rackets", plain_deletes)
+        result = _merge_server_side(client, merge_groups)
+        if result is None:
+            # Canonicals first: if the upsert fails, nothing has been deleted yet.
+            _write_updates(client, canonical_updates, rows_by_id, snapshot)
+            db.batch_delete(client, "rackets", duplicate_ids)
+        else:
+            merged = result.get("merged", merged)
+            deleted = result.get("deleted", deleted)
+            if snapshot is not None:
+                # The RPC applies the same merge rules as _canonical_update.
+                snapshot.apply(canonical_updates)
+        if snapshot is not None:
+            snapshot.remove(plain_deletes + duplicate_ids)
+    deleted += len(plain_deletes) - len(junior_rows)
     print(f"Done. Canonicals updated: {merged} | Duplicates deleted: {deleted}")
     if dry_run:
         print("(DRY-RUN — no changes written)")
@@ -412,6 +647,8 @@ if __name__ == "__main__":
     parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
     parser.add_argument("--delete-cap", type=int, default=15, help="Máximo de filas a borrar antes de abortar (default 15)")
     parser.add_argument("--no-cap", action="store_true", help="Desactiva el techo de borrado")
+    parser.add_argument("--rules", nargs="+", choices=sorted(ALL_RULES), default=sorted(ALL_RULES),
+                        help="Familias de reglas a aplicar (default: todas)")
     args = parser.parse_args()
-    result = run(dry_run=args.dry_run, delete_cap=None if args.no_cap else args.delete_cap)
+    result = run(dry_run=args.dry_run, delete_cap=None if args.no_cap else args.delete_cap, rules=args.rules)
     sys.exit(1 if result.get("aborted") else 0)
@@ -0,0 +1,150 @@
+"""
+http_cache.py — Caché en disco de validadores HTTP (ETag / Last-Modified).
+
+El refresh semanal vuelve a bajar y parsear CADA URL conocida aunque casi
+ningún precio haya cambiado. Aquí guardamos, por URL de producto, los
+validadores de la respuesta principal (el `.json` de Shopify o la página de
+PadelNuestro) junto con el `Product` ya extraído. En el siguiente run
+`BaseScraper.fetch_product` manda `If-None-Match` / `If-Modified-Since`; si
+la tienda contesta 304 se devuelve el `FetchResult(OK)` cacheado sin volver
+a parsear nada.
+
+Un fichero JSON por host en `SCRAPER_CACHE_DIR` (por defecto
+`.cache/scrapers`, que el workflow persiste con actions/cache entre runs).
+`SCRAPER_HTTP_CACHE=0` lo desactiva.
+
+Al lado, `{host}.specs.json` (SpecCache): las specs que los scrapers de
+Shopify sacan de la página HTML completa cuando el `body_html` del JSON no
+trae `Forma`. Se guardan por handle junto con el `updated_at` del producto,
+así esa segunda petición se hace una vez por versión del producto y no en
+cada run.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Generic, Optional, Type, TypeVar
+from urllib.parse import urlparse
+
+CACHE_DIR = os.environ.get("SCRAPER_CACHE_DIR", os.path.join(".cache", "scrapers"))
+CACHE_ENABLED = os.environ.get("SCRAPER_HTTP_CACHE", "1") != "0"
+
+
+class NotModified(Exception):
+    """Raised by the fetch path on a 304 to the conditional product request."""
+
+
+@dataclass
+class CacheEntry:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    product: dict  # Product.to_dict()
+    price_only: bool = False  # escrita por fetch_price: solo precio, sin specs/imágenes
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class SpecEntry:
+    updated_at: str         # `updated_at` del JSON de Shopify cuando se leyó la página
+    specs: Dict[str, str]   # lo que aportó la página HTML completa (puede ser {})
+
+
+E = TypeVar("E")
+
+
+class JsonFileCache(Generic[E]):
+    """key → entry for one host, loaded lazily and written on `save`."""
+
+    entry_type: Type[E]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[str, E]] = None
+        self._dirty = False
+
+    def _load(self) -> Dict[str, E]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    raw = json.load(f)
+                self._entries = {key: self.entry_type(**entry) for key, entry in raw.items()}
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError) as e:
+                # Una caché corrupta solo cuesta un run sin aciertos.
+                print(f"  ⚠️  Caché HTTP ilegible ({self.path}), se descarta: {e}")
+        return self._entries
+
+    def get(self, key: str) -> Optional[E]:
+        return self._load().get(key)
+
+    def put(self, key: str, entry: E) -> None:
+        self._load()[key] = entry
+        self._dirty = True
+
+    def discard(self, key: str) -> None:
+        if self._load().pop(key, None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty or self._entries is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({url: asdict(e) for url, e in self._entries.items()}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+class ValidatorCache(JsonFileCache[CacheEntry]):
+    """URL → CacheEntry for one host."""
+
+    entry_type = CacheEntry
+
+
+class SpecCache(JsonFileCache[SpecEntry]):
+    """Shopify handle → SpecEntry for one host."""
+
+    entry_type = SpecEntry
+
+    def fresh(self, handle: str, updated_at: Optional[str]) -> Optional[Dict[str, str]]:
+        """The cached page specs, if they were read from this same product version."""
+        entry = self.get(handle)
+        if entry is None or not updated_at or entry.updated_at != updated_at:
+            return None
+        return dict(entry.specs)
+
+
+_CACHES: Dict[str, ValidatorCache] = {}
+_SPEC_CACHES: Dict[str, SpecCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def validator_cache(url: str) -> ValidatorCache:
+    """The process-wide cache for `url`'s host, created on first use."""
+    host = urlparse(url).netloc
+    with _CACHES_LOCK:
+        cache = _CACHES.get(host)
+        if cache is None:
+            cache = _CACHES[host] = ValidatorCache(os.path.join(CACHE_DIR, f"{host}.json"))
+        return cache
+
+
+def spec_cache(url: str) -> SpecCache:
+    """The process-wide page-spec cache for `url`'s host, created on first use."""
+    host = urlparse(url).netloc
+    with _CACHES_LOCK:
+        cache = _SPEC_CACHES.get(host)
+        if cache is None:
+            cache = _SPEC_CACHES[host] = SpecCache(os.path.join(CACHE_DIR, f"{host}.specs.json"))
+        return cache
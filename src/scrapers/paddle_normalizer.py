@@ -10,10 +10,24 @@ Uso:
     normalize_paddle_name("pala Noxat10")   # → "noxat10"
     normalize_paddle_name("NOXAT10")        # → "noxat10"
     slugify_paddle("Head Delta Pro 2024")   # → "head-delta-pro-2024"
+
+Capa común de canonicalización: merge (racket_manager), dedup
+(deduplicate_rackets, scripts/dedup_rackets.py) y radar
+(radar_metrics_scraper) derivan cada uno su propia forma del MISMO nombre
+crudo, y `discover` los ejecuta en el mismo proceso. `name_forms(raw)`
+calcula todas esas formas una sola vez por nombre y las guarda en un memo
+LRU acotado; las funciones de cada módulo son envoltorios finos sobre él.
+
+Rendimiento: los patrones se compilan una vez al importar y los pasos que
+no pueden aplicar se saltan con un único `search`. La salida es byte a byte
+la de las versiones anteriores: ver tests/scrapers/test_paddle_normalizer.py
+y scripts/bench_paddle_normalizer.py.
 """
 
 import re
 import unicodedata
+from functools import lru_cache
+from typing import NamedTuple
 
 
 # ── Prefijos/sufijos de "ruido" que añaden las tiendas ───────────────────────
@@ -33,6 +47,104 @@ _NOISE_TOKENS = [
 # Palabras gramaticales de relleno que aparecen entre tokens reales
 _FILLER_WORDS = {"de", "del", "la", "el", "los", "las", "para", "y"}
 
+# Nombres de jugadores (ruido de marketing), solo para comparación.
+# El orden importa: se quitan en secuencia y "bela" va antes que "belasteguin".
+_PLAYER_NAMES = (
+    "jon sanz", "paquito", "navarro", "lebron", "galan", "tapia",
+    "coello", "chingotto", "stupa", "di nenno", "sanyo", "bela",
+    "belasteguin", "momo", "alex ruiz", "tello", "yanguas", "garrido",
+    "ari sanchez", "paulita", "josemaria", "triay", "salazar",
+    "bea gonzalez", "martita", "ortega",
+)
+
+# Más largos primero (sort estable: a igual longitud, el orden de arriba).
+_NOISE_BY_LENGTH = tuple(sorted(_NOISE_TOKENS, key=len, reverse=True))
+_PAREN_NOISE_RES = tuple(re.compile(rf"\s*\({re.escape(noise)}\)\s*") for noise in _NOISE_BY_LENGTH)
+# Detectores de una sola pasada: si no hay coincidencia, el paso secuencial
+# entero es un no-op y nos lo ahorramos (el 99% de los nombres).
+_ANY_PAREN_NOISE_RE = re.compile(r"\((?:%s)\)" % "|".join(map(re.escape, _NOISE_BY_LENGTH)))
+_ANY_PLAYER_RE = re.compile("|".join(map(re.escape, _PLAYER_NAMES)))
+
+_YEAR_RE = re.compile(r"\b202\d\b")
+# ".0" de versión + toda la puntuación restante en una pasada. Los guiones
+# internos ("carb-on" → "carbon") son puntuación, así que caen aquí también.
+_DECIMAL_OR_PUNCT_RE = re.compile(r"\.0\b|[^\w\s]")
+
+_SLUG_STRIP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SEP_RE = re.compile(r"[-\s]+")
+
+# ── Forma base del dedup (deduplicate_rackets.normalize_name_base) ──────────
+# Country name translations: some stores name editions in Spanish, others in English.
+# Normalize all to canonical English so duplicates resolve to the same key.
+_COUNTRY_MAP: dict[str, str] = {
+    "españa": "spain", "espana": "spain",
+    "italia": "italy",
+    "mexico": "mexico", "méxico": "mexico",
+    "holanda": "netherlands",
+    "alemania": "germany",
+    "francia": "france",
+    "belgica": "belgium", "bélgica": "belgium",
+    "inglaterra": "england",
+    "eeuu": "usa",
+}
+_COUNTRY_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in _COUNTRY_MAP) + r')\b',
+    re.IGNORECASE,
+)
+_DEDUP_PARENS_RE = re.compile(r"\s*\([^)]*\)\s*")        # strip (pala), (padel), etc.
+_DEDUP_PALA_RE = re.compile(r"\bpala\b")
+_INTERNAL_HYPHEN_RE = re.compile(r"(?<=\w)-(?=\w)")       # carb-on → carbon
+_DEDUP_BY_PLAYER_RE = re.compile(r"\s+by\s+[a-z]+(?:\s+[a-z]+)*")  # "by agustin tapia"
+_DEDUP_MATERIAL_RE = re.compile(r"\b(alum|aluminio)\b")
+
+# ── Formas del radar (radar_metrics_scraper) ────────────────────────────────
+_TEXT_ACCENTS = (("á", "a"), ("é", "e"), ("í", "i"), ("ó", "o"), ("ú", "u"), ("ñ", "n"), ("  ", " "))
+_SEARCH_SPORT_PREFIX_RE = re.compile(r"^(beach\s+tennis|pickleball)\s+", re.IGNORECASE)
+_SEARCH_SKU_RE = re.compile(r"\b[a-z0-9]{7,}\b", re.IGNORECASE)
+_SEARCH_LONG_NUMBER_RE = re.compile(r"\b\d{5,}\b")
+_SEARCH_BRACKETS_RE = re.compile(r"[\(\)\[\]]")
+_SEARCH_NOISE_RE = re.compile(r"\b(pala|palas|padel)\b", re.IGNORECASE)
+
+NORMALIZE_CACHE_SIZE = 16384
+
+
+class NameForms(NamedTuple):
+    """Every derived form of one raw racket name, computed once per process."""
+    stored: str      # normalize_paddle_name: almacenamiento y búsqueda
+    comparison: str  # normalize_for_comparison: fuzzy match del merge
+    dedup_base: str  # deduplicate_rackets.normalize_name_base: clave de grupo (con año)
+    text: str        # radar_metrics_scraper.normalize_text
+    search: str      # radar_metrics_scraper.clean_pala_name_for_search
+    plain: str       # scripts/dedup_rackets.norm: lower + strip
+
+
+_EMPTY_FORMS = NameForms("", "", "", "", "", "")
+
+
+def name_forms(raw_name: str) -> NameForms:
+    """
+    Todas las formas canónicas de `raw_name`, memoizadas por nombre crudo.
+
+    Entradas vacías o que no son str dan todas las formas vacías (y no
+    llegan al memo, que necesita claves hashables).
+    """
+    if not raw_name or not isinstance(raw_name, str):
+        return _EMPTY_FORMS
+    return _name_forms(raw_name)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _name_forms(raw_name: str) -> NameForms:
+    stored = _stored_form(raw_name)
+    return NameForms(
+        stored=stored,
+        comparison=_comparison_form(stored),
+        dedup_base=_dedup_base_form(raw_name),
+        text=_text_form(raw_name),
+        search=_search_form(raw_name),
+        plain=raw_name.lower().strip(),
+    )
+
 
 def normalize_paddle_name(raw_name: str) -> str:
     """
@@ -56,17 +168,36 @@ def normalize_paddle_name(raw_name: str) -> str:
         "Pala De Padel Bullpadel Hack 03" → "bullpadel hack 03"
         "HEAD Delta Pro Woman 2024"        → "head delta pro woman 2024"
     """
-    if not raw_name or not isinstance(raw_name, str):
-        return ""
+    return name_forms(raw_name).stored
+
+
+def normalize_for_comparison(raw_name: str) -> str:
+    """
+    Versión más agresiva para deduplicación/comparación fuzzy.
+
+    Sobre normalize_paddle_name añade:
+      - Elimina años (2020-2029)
+      - Elimina puntuación (excepto guiones internos)
+      - Elimina nombres de jugadores conocidos
+      - Normaliza versiones decimales ("1.0" → "1")
+
+    NO usar para almacenamiento; usar solo para comparar si dos nombres
+    son el mismo modelo.
+    """
+    return name_forms(raw_name).comparison
+
 
+def _stored_form(raw_name: str) -> str:
     name = raw_name.strip().lower()
 
     # 0. Eliminar tokens de ruido envueltos en paréntesis: "(pala)", "(padel)", etc.
-    for noise in sorted(_NOISE_TOKENS, key=len, reverse=True):
-        name = re.sub(rf'\s*\({re.escape(noise)}\)\s*', ' ', name).strip()
+    #    Secuencial a propósito: quitar uno puede dejar pegado otro más corto.
+    if _ANY_PAREN_NOISE_RE.search(name):
+        for pattern in _PAREN_NOISE_RES:
+            name = pattern.sub(" ", name).strip()
 
     # 1. Eliminar prefijos/sufijos de tienda (orden importa: más largos primero)
-    for noise in sorted(_NOISE_TOKENS, key=len, reverse=True):
+    for noise in _NOISE_BY_LENGTH:
         # Al principio
         if name.startswith(noise):
             name = name[len(noise):].strip()
@@ -74,63 +205,67 @@ def normalize_paddle_name(raw_name: str) -> str:
         if name.endswith(noise):
             name = name[: -len(noise)].strip()
 
-    # 2. Eliminar palabras de relleno que queden sueltas al principio
+    # 2. Eliminar palabras de relleno que queden sueltas al principio/final.
+    #    split() + join() ya colapsa los espacios múltiples y hace el strip.
     tokens = name.split()
     while tokens and tokens[0] in _FILLER_WORDS:
         tokens.pop(0)
     while tokens and tokens[-1] in _FILLER_WORDS:
         tokens.pop()
-    name = " ".join(tokens)
+    return " ".join(tokens)
 
-    # 3. Colapsar espacios múltiples y strip final
-    name = re.sub(r"\s+", " ", name).strip()
 
-    return name
+def _comparison_form(stored: str) -> str:
+    # Eliminar años
+    name = _YEAR_RE.sub("", stored)
 
+    # Eliminar nombres de jugadores (ruido de marketing)
+    if _ANY_PLAYER_RE.search(name):
+        for player in _PLAYER_NAMES:
+            name = name.replace(player, "")
 
-def normalize_for_comparison(raw_name: str) -> str:
-    """
-    Versión más agresiva para deduplicación/comparación fuzzy.
+    # Normalizar versiones decimales ("1.0" → "1") y eliminar la puntuación,
+    # guiones internos incluidos: "carb-on" → "carbon". Solo para comparación.
+    name = _DECIMAL_OR_PUNCT_RE.sub("", name)
 
-    Sobre normalize_paddle_name añade:
-      - Elimina años (2020-2029)
-      - Elimina puntuación (excepto guiones internos)
-      - Elimina nombres de jugadores conocidos
-      - Normaliza versiones decimales ("1.0" → "1")
+    # Colapsar y strip
+    return " ".join(name.split())
 
-    NO usar para almacenamiento; usar solo para comparar si dos nombres
-    son el mismo modelo.
-    """
-    name = normalize_paddle_name(raw_name)
 
-    # Eliminar años
-    name = re.sub(r"\b202\d\b", "", name)
+def _strip_accents(s: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
 
-    # Eliminar nombres de jugadores (ruido de marketing)
-    _PLAYER_NAMES = [
-        "jon sanz", "paquito", "navarro", "lebron", "galan", "tapia",
-        "coello", "chingotto", "stupa", "di nenno", "sanyo", "bela",
-        "belasteguin", "momo", "alex ruiz", "tello", "yanguas", "garrido",
-        "ari sanchez", "paulita", "josemaria", "triay", "salazar",
-        "bea gonzalez", "martita", "ortega",
-    ]
-    for player in _PLAYER_NAMES:
-        name = name.replace(player, "")
 
-    # Normalizar versiones decimales: "1.0" → "1"
-    name = re.sub(r"\.0\b", "", name)
+def _dedup_base_form(raw_name: str) -> str:
+    """Racket name WITHOUT stripping year: the dedup grouping key."""
+    s = raw_name.lower().strip()
+    s = _strip_accents(s)
+    s = _DEDUP_PARENS_RE.sub(" ", s)
+    s = _DEDUP_PALA_RE.sub("", s)
+    s = _INTERNAL_HYPHEN_RE.sub("", s)
+    s = _DEDUP_BY_PLAYER_RE.sub("", s)
+    # Strip material descriptors added inconsistently by stores
+    s = _DEDUP_MATERIAL_RE.sub("", s)
+    s = _COUNTRY_RE.sub(lambda m: _COUNTRY_MAP[_strip_accents(m.group(0).lower())], s)
+    return " ".join(s.split())
 
-    # Colapsar guiones internos entre letras/números: "carb-on" → "carbon"
-    # Solo para comparación, nunca para almacenamiento
-    name = re.sub(r"(?<=\w)-(?=\w)", "", name)
 
-    # Eliminar puntuación restante (guiones no internos ya no existen)
-    name = re.sub(r"[^\w\s]", "", name)
+def _text_form(raw_name: str) -> str:
+    text = raw_name.lower().strip()
+    for accented, plain in _TEXT_ACCENTS:
+        text = text.replace(accented, plain)
+    return text
 
-    # Colapsar y strip
-    name = re.sub(r"\s+", " ", name).strip()
 
-    return name
+def _search_form(raw_name: str) -> str:
+    # Prefijos de otros deportes, códigos SKU ("221043", "pb3ca0u16"),
+    # corchetes/paréntesis y palabras de relleno, para los buscadores de reseñas.
+    cleaned = _SEARCH_SPORT_PREFIX_RE.sub("", raw_name)
+    cleaned = _SEARCH_SKU_RE.sub("", cleaned)
+    cleaned = _SEARCH_LONG_NUMBER_RE.sub("", cleaned)
+    cleaned = _SEARCH_BRACKETS_RE.sub(" ", cleaned)
+    cleaned = _SEARCH_NOISE_RE.sub("", cleaned)
+    return " ".join(cleaned.split())
 
 
 def slugify_paddle(brand: str, model: str) -> str:
@@ -143,8 +278,8 @@ def slugify_paddle(brand: str, model: str) -> str:
     text = f"{brand}-{model}"
     text = text.lower()
     text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("utf-8")
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[-\s]+", "-", text).strip("-")
+    text = _SLUG_STRIP_RE.sub("", text)
+    text = _SLUG_SEP_RE.sub("-", text).strip("-")
     return text
 
 
@@ -1,15 +1,11 @@
 import html as _html
-import json
 import re
-import time
-import random
-import urllib.request
-import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from .base_scraper import (
-    BaseScraper, Product, normalize_specs, is_junior_racket,
-    FetchOutcome, FetchResult, ScraperGone, sync_fetch_with_retry, ssl_ctx,
-    browser_headers,
+    BaseScraper, Product, normalize_specs, is_junior_racket, clean_price,
+    FetchOutcome, FetchResult, NotModified, ScraperGone, browser_headers,
+    ListingPrice, listing_results, max_page_number, ordered_pages, shopify_price_result, shopify_variant_prices,
 )
 
 
@@ -123,39 +119,43 @@ class PadelMarketScraper(BaseScraper):
 
         return specs
 
-    def _fetch_product_json(self, handle: str) -> dict:
-        """Fetch a single product's full data from the Shopify JSON API (sync)."""
-        time.sleep(random.uniform(0.8, 1.5))
-        api_url = f"https://padelmarket.com/es-eu/products/{handle}.json"
-        req = urllib.request.Request(api_url, headers=browser_headers(
-            origin="https://padelmarket.com/", accept="application/json",
-        ))
-
-        def _once():
-            with urllib.request.urlopen(req, timeout=30, context=ssl_ctx()) as resp:
-                return json.loads(resp.read().decode('utf-8'))
-
-        data = sync_fetch_with_retry(_once, label=f"PadelMarket:{handle}", max_retries=4, base_delay=8.0)
-        return data.get('product', {})
-
-    async def scrape_product(self, url: str) -> FetchResult:
-        """Scrape product data using the Shopify JSON API."""
+    async def _fetch_product_json(self, handle: str) -> dict:
+        """Fetch a single product's full data from the Shopify JSON API."""
+        resp = await self._fetch(
+            f"https://padelmarket.com/es-eu/products/{handle}.json",
+            headers=browser_headers(origin="https://padelmarket.com/", accept="application/json"),
+            label=f"PadelMarket:{handle}", max_retries=4, base_delay=8.0, conditional=True,
+        )
+        return resp.json().get('product', {})
 
+    async def _product_json(self, url: str) -> Tuple[Optional[dict], Optional[FetchResult]]:
+        """The product's Shopify JSON, or the FetchResult that ends the scrape (bad URL, gone, error)."""
         # Extract handle: /products/pala-xyz -> pala-xyz
-        handle = url.rstrip('/').split('/products/')[-1].split('?')[0]
+        handle = self._handle(url)
         if not handle:
-            return FetchResult(FetchOutcome.FAILED, error="could not extract handle from URL")
+            return None, FetchResult(FetchOutcome.FAILED, error="could not extract handle from URL")
 
         try:
-            loop = asyncio.get_running_loop()
-            product_data = await loop.run_in_executor(
-                None, self._fetch_product_json, handle
-            )
+            return await self._fetch_product_json(handle), None
+        except NotModified:
+            raise  # fetch_product/fetch_price answer from the validator cache
         except ScraperGone:
-            return FetchResult(FetchOutcome.GONE)
+            return None, FetchResult(FetchOutcome.GONE)
         except Exception as e:
             print(f"[PadelMarket] API error for {handle}: {e}")
-            return FetchResult(FetchOutcome.FAILED, error=str(e))
+            return None, FetchResult(FetchOutcome.FAILED, error=str(e))
+
+    async def scrape_price(self, url: str) -> FetchResult:
+        """Price-only scrape for refresh: the same product JSON, no specs and no HTML fallback."""
+        product_data, ended = await self._product_json(url)
+        return ended or shopify_price_result(product_data, url)
+
+    async def scrape_product(self, url: str) -> FetchResult:
+        """Scrape product data using the Shopify JSON API."""
+        product_data, ended = await self._product_json(url)
+        if ended:
+            return ended
+        handle = self._handle(url)
 
         if not product_data or not isinstance(product_data, dict):
             return FetchResult(FetchOutcome.FAILED, error="empty or invalid API response")
@@ -168,28 +168,8 @@ class PadelMarketScraper(BaseScraper):
             print(f"[PadelMarket] Skipping junior racket: {name}")
             return FetchResult(FetchOutcome.FAILED, error="junior racket, excluded from catalog")
 
-        variants = product_data.get('variants') if isinstance(product_data.get('variants'), list) else []
-        first_variant = variants[0] if variants and isinstance(variants[0], dict) else {}
-
-        # Price parsing
-        price: Optional[float] = None
-        if first_variant:
-            try:
-                raw_price = first_variant.get('price')
-                if raw_price is not None:
-                    price = float(raw_price)
-            except (ValueError, TypeError):
-                pass
-
-        # Original Price
-        original_price = None
-        if first_variant:
-            try:
-                op = first_variant.get('compare_at_price')
-                if op:
-                    original_price = float(op)
-            except (ValueError, TypeError, AttributeError):
-                pass
+        # Price / original price (first variant)
+        price, original_price = shopify_variant_prices(product_data)
 
         # Brand
         brand = product_data.get('vendor') or 'Unknown'
@@ -208,23 +188,17 @@ class PadelMarketScraper(BaseScraper):
         # Specs from body_html
         specs = self._parse_specs_from_html(product_data.get('body_html', ''))
 
-        # Fallback to full HTML if Forma or other key specs are missing
+        # Fallback to full HTML if Forma is missing — once per product version
+        # (spec cache keyed by handle + updated_at)
         if 'Forma' not in specs:
-            try:
-                req = urllib.request.Request(url, headers=browser_headers(
+            specs.update(await self._page_specs(
+                url, handle, product_data.get('updated_at'), self._parse_specs_from_html,
+                headers=browser_headers(
                     origin="https://padelmarket.com/",
                     accept="text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                ))
-
-                def _fetch_full_html():
-                    with urllib.request.urlopen(req, timeout=15, context=ssl_ctx()) as resp:
-                        return resp.read().decode('utf-8')
-
-                full_html = await loop.run_in_executor(None, _fetch_full_html)
-                more_specs = self._parse_specs_from_html(full_html)
-                specs.update(more_specs)
-            except Exception as e:
-                print(f"[PadelMarket] HTML fallback error for {handle}: {e}")
+                ),
+                label=f"PadelMarket:{handle}:html",
+            ))
 
         # Final shape inference from cumulative text if still missing
         if 'Forma' not in specs:
@@ -250,62 +224,124 @@ class PadelMarketScraper(BaseScraper):
             return FetchResult(FetchOutcome.NO_PRICE, product=product)
         return FetchResult(FetchOutcome.OK, product=product)
 
-    def _fetch_category_page(self, collection_path: str, page_num: int) -> List[str]:
-        """Fetch one collection HTML page and return canonical product URLs (sync).
+    async def _fetch_category_html(self, collection_path: str, page_num: int) -> str:
+        """Fetch one collection HTML page.
 
         The store's Cloudflare setup hard-blocks the Shopify `products.json`
         collection endpoint (`local_rate_limited`) for every client, but serves
         the collection HTML fine — so we paginate the HTML instead.
         """
-        time.sleep(random.uniform(1.0, 2.0))
-        page_url = f"https://padelmarket.com{collection_path}?page={page_num}"
-        req = urllib.request.Request(page_url, headers=browser_headers(
-            origin="https://padelmarket.com/",
-            accept="text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        ))
-
-        def _once():
-            with urllib.request.urlopen(req, timeout=30, context=ssl_ctx()) as resp:
-                return resp.read().decode('utf-8')
-
-        html = sync_fetch_with_retry(
-            _once, label=f"PadelMarket:page{page_num}", max_retries=2, base_delay=6.0,
+        resp = await self._fetch(
+            f"https://padelmarket.com{collection_path}?page={page_num}",
+            headers=browser_headers(
+                origin="https://padelmarket.com/",
+                accept="text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            ),
+            label=f"PadelMarket:page{page_num}", max_retries=2, base_delay=6.0,
         )
-        # Product card links look like /es-eu/collections/palas/products/{handle}.
-        # Grab the handle from any /products/{handle} path and canonicalize.
-        handles = re.findall(r'/products/([a-z0-9][a-z0-9-]*)', html)
+        return resp.text()
+
+    # Product card links look like /es-eu/collections/palas/products/{handle}.
+    _PRODUCT_HANDLE_RE = re.compile(r'/products/([a-z0-9][a-z0-9-]*)')
+
+    @classmethod
+    def _listing_links(cls, html: str) -> List[str]:
+        """Canonical product URLs on a collection page, in order."""
+        handles = cls._PRODUCT_HANDLE_RE.findall(html)
         return [f"https://padelmarket.com/es-eu/products/{h}" for h in dict.fromkeys(handles)]
 
-    async def scrape_category(self, url: str) -> List[str]:
-        """Scrape product URLs by paginating the collection HTML pages."""
-        if '/collections/' in url:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            collection_path = parsed.path.rstrip('/')
-        else:
-            collection_path = '/es-eu/collections/palas'
+    @staticmethod
+    def _handle(url: str) -> str:
+        return url.rstrip('/').split('/products/')[-1].split('?')[0]
 
-        product_urls: List[str] = []
-        seen: set = set()
-        page_num = 1
-        max_pages = 40
+    # Texto directo de un elemento cuyo class lleva un token price*/money
+    # (price-item--sale, price-item--regular, money...). Los badges de
+    # "Ahorra X €" también llevan price__badge-*: se descartan aparte.
+    _PRICE_NODE_RE = re.compile(
+        r'<\w+[^>]*\bclass="([^"]*\b(?:price|money)[^"]*)"[^>]*>([^<]*)', re.IGNORECASE,
+    )
+    _MONEY_RE = re.compile(r'€\s*(\d[\d.,]*\d)|(\d[\d.,]*\d)\s*(?:€|EUR)')
 
-        print("[PadelMarket] Scraping category via HTML pagination...")
+    @classmethod
+    def _parse_listing_prices(cls, html: str) -> List[ListingPrice]:
+        """
+        (url, price, original_price) per product card. A card runs from its
+        handle's first link to the next handle's. One amount = price; two =
+        sale price + struck-through original, only if the card marks a sale.
+        Anything else (no amount, "Desde" ranges, 3+ amounts) gives
+        price None so the product gets deep-fetched.
+        """
+        starts: List[Tuple[int, str]] = []
+        seen = set()
+        for m in cls._PRODUCT_HANDLE_RE.finditer(html):
+            if m.group(1) not in seen:
+                seen.add(m.group(1))
+                starts.append((m.start(), m.group(1)))
+
+        cards: List[ListingPrice] = []
+        for i, (pos, handle) in enumerate(starts):
+            end = starts[i + 1][0] if i + 1 < len(starts) else len(html)
+            card = html[pos:end]
+            url = f"https://padelmarket.com/es-eu/products/{handle}"
+
+            amounts = []
+            ambiguous = False
+            for css, text in cls._PRICE_NODE_RE.findall(card):
+                if 'badge' in css.lower() or not text.strip():
+                    continue
+                if re.search(r'\b(?:desde|from)\b', text, re.IGNORECASE):
+                    ambiguous = True
+                for a, b in cls._MONEY_RE.findall(text):
+                    amount = clean_price(a or b)
+                    if amount > 0 and amount not in amounts:
+                        amounts.append(amount)
+
+            on_sale = bool(re.search(r'<(?:s|del)\b|price--on-sale|price-item--sale|compare', card))
+            price: Optional[float] = None
+            original: Optional[float] = None
+            if not ambiguous and len(amounts) == 1:
+                price = amounts[0]
+            elif not ambiguous and len(amounts) == 2 and on_sale:
+                price, original = min(amounts), max(amounts)
+            cards.append(ListingPrice(url, price, original))
+        return cards
+
+    @staticmethod
+    def _collection_path(url: str) -> str:
+        if '/collections/' in url:
+            return urlparse(url).path.rstrip('/')
+        return '/es-eu/collections/palas'
+
+    async def _category_pages(self, collection_path: str, max_pages: int = 40) -> AsyncIterator[Tuple[int, str, List[str]]]:
+        """
+        Yield (page_num, html, product URLs) in page order until a page lists
+        no products. Pages are prefetched concurrently (`ordered_pages`); the
+        pager links on page 1 (`...?page=N`) tell how many there are.
+        """
+        pager_re = re.compile(re.escape(collection_path) + r'\?(?:[^"\'\s>]*&(?:amp;)?)?page=(\d+)')
 
-        loop = asyncio.get_running_loop()
-        while page_num <= max_pages:
+        async def fetch(page_num: int) -> Optional[Tuple[str, List[str]]]:
             try:
-                links = await loop.run_in_executor(
-                    None, self._fetch_category_page, collection_path, page_num
-                )
+                html = await self._fetch_category_html(collection_path, page_num)
             except Exception as e:
                 print(f"[PadelMarket] API error on page {page_num}: {e}")
-                break
+                return None
+            return html, self._listing_links(html)
+
+        async for page_num, (html, links) in ordered_pages(
+            fetch, is_empty=lambda page: not page[1], max_pages=max_pages,
+            page_count=lambda page: max_page_number(page[0], pager_re),
+        ):
+            yield page_num, html, links
+
+    async def scrape_category(self, url: str) -> List[str]:
+        """Scrape product URLs by paginating the collection HTML pages."""
+        product_urls: List[str] = []
+        seen: set = set()
 
-            if not links:
-                print(f"[PadelMarket] Page {page_num}: no products. Done.")
-                break
+        print("[PadelMarket] Scraping category via HTML pagination...")
 
+        async for page_num, _, links in self._category_pages(self._collection_path(url)):
             added = 0
             for link in links:
                 if link not in seen:
@@ -314,7 +350,13 @@ class PadelMarketScraper(BaseScraper):
                     added += 1
 
             print(f"[PadelMarket] Page {page_num}: {len(links)} found, {added} added. Total: {len(product_urls)}")
-            page_num += 1
 
         print(f"[PadelMarket] Final count: {len(product_urls)} products from HTML")
         return product_urls
+
+    async def prefetch_listing(self, category_url: str, urls: List[str]) -> Dict[str, FetchResult]:
+        """Prices straight from the collection cards; see `_parse_listing_prices`."""
+        cards: List[ListingPrice] = []
+        async for _, html, _ in self._category_pages(self._collection_path(category_url)):
+            cards.extend(self._parse_listing_prices(html))
+        return listing_results(urls, cards, key=self._handle)
@@ -1,12 +1,11 @@
 import html as _html
 import json
 import re
-import urllib.request
-import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from .base_scraper import (
     BaseScraper, Product, normalize_specs, is_junior_racket,
-    FetchOutcome, FetchResult, ScraperGone, sync_fetch_with_retry, ssl_ctx,
+    FetchOutcome, FetchResult, NotModified, ScraperGone, HttpResponse,
+    ListingPrice, listing_results, max_page_number, ordered_pages,
 )
 
 
@@ -156,41 +155,77 @@ class PadelNuestroScraper(BaseScraper):
         "Softee", "Akkeron", "Eme", "Cartri",
     ]
 
-    def _fetch_html(self, url: str) -> str:
-        """Fetch page HTML via plain HTTP (sync).
+    async def _fetch_html(self, url: str) -> str:
+        """Fetch page HTML via plain HTTP.
 
         Raises ScraperGone if the store redirects to another page (product
         retired). Raises the underlying exception on network failure once
         retries are exhausted — callers must NOT treat that as "no price".
         """
-        req = urllib.request.Request(
-            url,
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/122.0.0.0 Safari/537.36"
-                ),
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "es-ES,es;q=0.9",
-            },
-        )
+        headers = {
+            "User-Agent": (
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/122.0.0.0 Safari/537.36"
+            ),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "es-ES,es;q=0.9",
+        }
 
-        def _once():
-            with urllib.request.urlopen(req, timeout=20, context=ssl_ctx()) as resp:
-                # Detect redirect to category page (discontinued product)
-                final_url = resp.url.split("?")[0].rstrip("/")
-                req_url = url.split("?")[0].rstrip("/")
-                if final_url != req_url:
-                    raise ScraperGone(f"redirected: {url} -> {resp.url}")
-                raw = resp.read()
-                enc = resp.headers.get("Content-Encoding", "")
-                if enc == "gzip":
-                    import gzip
-                    raw = gzip.decompress(raw)
-                return raw.decode("utf-8", errors="replace")
-
-        return sync_fetch_with_retry(_once, label=f"PadelNuestro:{url}", max_retries=4, base_delay=6.0)
+        def _check_redirect(resp: HttpResponse) -> None:
+            # The pool follows redirects and already decodes gzip bodies.
+            # Detect redirect to category page (discontinued product)
+            final_url = resp.url.split("?")[0].rstrip("/")
+            req_url = url.split("?")[0].rstrip("/")
+            if final_url != req_url:
+                raise ScraperGone(f"redirected: {url} -> {resp.url}")
+
+        resp = await self._fetch(
+            url, headers=headers, timeout=20, check=_check_redirect,
+            label=f"PadelNuestro:{url}", max_retries=4, base_delay=6.0, conditional=True,
+        )
+        return resp.text()
+
+    _LD_JSON_RE = re.compile(
+        r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE,
+    )
+    _OLD_PRICE_RES = (
+        re.compile(r'data-price-type=["\']oldPrice["\'][^>]*data-price-amount=["\']([0-9]+(?:[.,][0-9]+)?)["\']'),
+        re.compile(r'data-price-amount=["\']([0-9]+(?:[.,][0-9]+)?)["\'][^>]*data-price-type=["\']oldPrice["\']'),
+    )
+
+    @classmethod
+    def _ld_product(cls, html: str) -> Tuple[Optional[dict], float]:
+        """The page's JSON-LD Product object and its offer price (0.0 if none)."""
+        for m in cls._LD_JSON_RE.finditer(html):
+            try:
+                data = json.loads(m.group(1))
+            except Exception:
+                continue
+            if not isinstance(data, dict) or data.get("@type") != "Product":
+                continue
+            price = 0.0
+            try:
+                offers = data.get("offers", {})
+                if isinstance(offers, list):
+                    offers = offers[0]
+                raw_price = offers.get("price")
+                if raw_price is not None:
+                    price = float(str(raw_price).replace(",", "."))
+            except (ValueError, TypeError, AttributeError, IndexError):
+                pass  # sin precio legible: NO_PRICE, como antes
+            return data, price
+        return None, 0.0
+
+    @classmethod
+    def _old_price(cls, html: str, price: float) -> Optional[float]:
+        """Original price from the Magento price box (data-price-type=oldPrice), if above `price`."""
+        for pattern in cls._OLD_PRICE_RES:
+            old_prices = pattern.findall(html)
+            if old_prices:
+                old_val = float(old_prices[0].replace(",", "."))
+                return old_val if old_val > price else None
+        return None
 
     def _extract_product_from_html(self, html: str, url: str) -> Optional[Product]:
         """Extract product data from page HTML using JSON-LD + data attributes."""
@@ -199,34 +234,17 @@ class PadelNuestroScraper(BaseScraper):
         brand: str = "Unknown"
         description_html: str = ""
         image: str = ""
-        price: float = 0.0
-        original_price: Optional[float] = None
 
-        for m in re.finditer(
-            r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
-            html,
-            re.DOTALL | re.IGNORECASE,
-        ):
-            try:
-                data = json.loads(m.group(1))
-                if data.get("@type") == "Product":
-                    name = data.get("name")
-                    brand_obj = data.get("brand", {})
-                    if isinstance(brand_obj, dict):
-                        brand = brand_obj.get("name", "Unknown")
-                    elif isinstance(brand_obj, str):
-                        brand = brand_obj
-                    description_html = data.get("description", "")
-                    image = data.get("image", "")
-                    offers = data.get("offers", {})
-                    if isinstance(offers, list):
-                        offers = offers[0]
-                    raw_price = offers.get("price")
-                    if raw_price is not None:
-                        price = float(str(raw_price).replace(",", "."))
-                    break
-            except Exception:
-                continue
+        data, price = self._ld_product(html)
+        if data is not None:
+            name = data.get("name")
+            brand_obj = data.get("brand", {})
+            if isinstance(brand_obj, dict):
+                brand = brand_obj.get("name", "Unknown")
+            elif isinstance(brand_obj, str):
+                brand = brand_obj
+            description_html = data.get("description", "")
+            image = data.get("image", "")
 
         if not name:
             return None
@@ -235,19 +253,7 @@ class PadelNuestroScraper(BaseScraper):
             return None
 
         # ── Original price from data-price-type=oldPrice ──────────────
-        old_prices = re.findall(
-            r'data-price-type=["\']oldPrice["\'][^>]*data-price-amount=["\']([0-9]+(?:[.,][0-9]+)?)["\']',
-            html,
-        )
-        if not old_prices:
-            old_prices = re.findall(
-                r'data-price-amount=["\']([0-9]+(?:[.,][0-9]+)?)["\'][^>]*data-price-type=["\']oldPrice["\']',
-                html,
-            )
-        if old_prices:
-            old_val = float(old_prices[0].replace(",", "."))
-            if old_val > price:
-                original_price = old_val
+        original_price = self._old_price(html, price)
 
         # ── Images: media_gallery from inline JS ──────────────────────
         # Magento serializes URLs with escaped slashes (https:\/\/...) inside JS strings.
@@ -304,9 +310,10 @@ class PadelNuestroScraper(BaseScraper):
         if url.endswith(".html"):
             url = url[:-5]
 
-        loop = asyncio.get_running_loop()
         try:
-            html = await loop.run_in_executor(None, self._fetch_html, url)
+            html = await self._fetch_html(url)
+        except NotModified:
+            raise  # fetch_product answers from the validator cache
         except ScraperGone:
             return FetchResult(FetchOutcome.GONE)
         except Exception as e:
@@ -326,19 +333,115 @@ class PadelNuestroScraper(BaseScraper):
             return FetchResult(FetchOutcome.NO_PRICE, product=product)
         return FetchResult(FetchOutcome.OK, product=product)
 
-    def _fetch_category_page(self, page_num: int) -> List[str]:
-        """Fetch one category page and return product URLs (sync)."""
-        page_url = f"https://www.padelnuestro.com/palas-padel?p={page_num}"
+    async def scrape_price(self, url: str) -> FetchResult:
+        """
+        Price-only scrape for refresh: the same page request, but only the
+        JSON-LD offer and the oldPrice box are read — no attribute table,
+        description specs or image gallery.
+        """
+        if url.endswith(".html"):
+            url = url[:-5]
+
         try:
-            html = self._fetch_html(page_url)
+            html = await self._fetch_html(url)
+        except NotModified:
+            raise  # fetch_price answers from the validator cache
+        except ScraperGone:
+            return FetchResult(FetchOutcome.GONE)
         except Exception as e:
-            print(f"[PadelNuestro] Category page {page_num} fetch failed: {e}")
-            return []
-        # product-item-link hrefs appear in initial HTML (server-rendered)
-        links = re.findall(r'class="product-item-link"[^>]*href="([^"]+)"', html)
-        links += re.findall(r'href="([^"]+)"[^>]*class="product-item-link"', html)
+            print(f"[PadelNuestro] HTTP error for {url}: {e}")
+            return FetchResult(FetchOutcome.FAILED, error=str(e))
+
+        data, price = self._ld_product(html)
+        name = data.get("name") if data else None
+        if not name or is_junior_racket(name):
+            return FetchResult(FetchOutcome.FAILED, error="could not extract product from HTML (page loaded, parse failed)")
+
+        product = Product(url=url, name=name, price=price, brand="", image="", specs={},
+                          original_price=self._old_price(html, price))
+        if price <= 0:
+            return FetchResult(FetchOutcome.NO_PRICE, product=product)
+        return FetchResult(FetchOutcome.OK, product=product)
+
+    async def _fetch_category_html(self, page_num: int) -> str:
+        """Fetch one category page's HTML."""
+        return await self._fetch_html(f"https://www.padelnuestro.com/palas-padel?p={page_num}")
+
+    # product-item-link hrefs appear in initial HTML (server-rendered)
+    _ITEM_LINK_RE = re.compile(
+        r'class="product-item-link"[^>]*href="([^"]+)"|href="([^"]+)"[^>]*class="product-item-link"'
+    )
+
+    @classmethod
+    def _listing_links(cls, html: str) -> List[str]:
+        links = [a or b for a, b in cls._ITEM_LINK_RE.findall(html)]
         return list(dict.fromkeys(links))  # dedupe, preserve order
 
+    @staticmethod
+    def _url_key(url: str) -> str:
+        """Listing hrefs and stored links differ in `.html`, query and trailing slash."""
+        key = url.split("?")[0].rstrip("/").lower()
+        return key[:-5] if key.endswith(".html") else key
+
+    _PRICE_TAG_RE = re.compile(r'<[^>]*\bdata-price-amount=["\']([0-9]+(?:[.,][0-9]+)?)["\'][^>]*>')
+    _PRICE_TYPE_RE = re.compile(r'data-price-type=["\'](\w+)["\']')
+
+    @classmethod
+    def _parse_listing_prices(cls, html: str) -> List[ListingPrice]:
+        """
+        (url, price, original_price) per product card, from the same
+        Magento price-box attributes the product page uses (finalPrice /
+        oldPrice). A card runs from its product-item-link to the next one.
+        No finalPrice, several different ones, or a min/max range (configurable
+        products) gives price None so the product gets deep-fetched.
+        """
+        matches = list(cls._ITEM_LINK_RE.finditer(html))
+        cards: List[ListingPrice] = []
+        for i, m in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(html)
+            card = html[m.start():end]
+
+            finals, olds = set(), set()
+            ranged = False
+            for tag in cls._PRICE_TAG_RE.finditer(card):
+                amount = float(tag.group(1).replace(",", "."))
+                kind = cls._PRICE_TYPE_RE.search(tag.group(0))
+                kind = kind.group(1) if kind else ""
+                if kind == "finalPrice":
+                    finals.add(amount)
+                elif kind == "oldPrice":
+                    olds.add(amount)
+                elif kind in ("minPrice", "maxPrice"):
+                    ranged = True
+
+            price = next(iter(finals)) if len(finals) == 1 and not ranged else None
+            original = max(olds) if price is not None and olds and max(olds) > price else None
+            cards.append(ListingPrice(m.group(1) or m.group(2), price, original))
+        return cards
+
+    # Magento pager: <a class="page" href="https://www.padelnuestro.com/palas-padel?p=12">
+    _PAGER_RE = re.compile(r'/palas-padel\?(?:[^"\'\s>]*&(?:amp;)?)?p=(\d+)')
+
+    async def _category_pages(self, max_pages: int = 40) -> AsyncIterator[Tuple[int, str, List[str]]]:
+        """
+        Yield (page_num, html, product URLs) in page order until a page lists
+        no products. Pages are prefetched concurrently (`ordered_pages`); the
+        pager on page 1 tells how many there are.
+        """
+        async def fetch(page_num: int) -> Optional[Tuple[str, List[str]]]:
+            try:
+                html = await self._fetch_category_html(page_num)
+            except Exception as e:
+                print(f"[PadelNuestro] Category page {page_num} fetch failed: {e}")
+                return None
+            return html, self._listing_links(html)
+
+        async for page_num, (html, links) in ordered_pages(
+            fetch, is_empty=lambda page: not page[1], max_pages=max_pages,
+            page_count=lambda page: max_page_number(page[0], self._PAGER_RE),
+        ):
+            yield page_num, html, links
+
     async def scrape_category(self, url: str) -> List[str]:
         """Scrape product URLs by paginating the category HTML pages."""
         _EXCLUDE = {
@@ -348,20 +451,10 @@ class PadelNuestroScraper(BaseScraper):
 
         product_urls: List[str] = []
         seen: set = set()
-        page_num = 1
-        max_pages = 40
 
         print("[PadelNuestro] Scraping category via HTML pagination...")
 
-        loop = asyncio.get_running_loop()
-        while page_num <= max_pages:
-            links = await loop.run_in_executor(
-                None, self._fetch_category_page, page_num
-            )
-            if not links:
-                print(f"[PadelNuestro] Page {page_num}: no products. Done.")
-                break
-
+        async for page_num, _, links in self._category_pages():
             added = 0
             for link in links:
                 slug = link.rstrip("/").split("/")[-1].lower()
@@ -376,6 +469,12 @@ class PadelNuestroScraper(BaseScraper):
                 f"[PadelNuestro] Page {page_num}: {len(links)} found, "
                 f"{added} added. Total: {len(product_urls)}"
             )
-            page_num += 1
 
         return product_urls
+
+    async def prefetch_listing(self, category_url: str, urls: List[str]) -> Dict[str, FetchResult]:
+        """Prices straight from the category cards; see `_parse_listing_prices`."""
+        cards: List[ListingPrice] = []
+        async for _, html, _ in self._category_pages():
+            cards.extend(self._parse_listing_prices(html))
+        return listing_results(urls, cards, key=self._url_key)
@@ -1,15 +1,12 @@
 import html as _html
-import json
 import re
-import time
-import random
-import urllib.request
-import asyncio
-from typing import Dict, List, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from .base_scraper import (
     BaseScraper, Product, normalize_specs, normalize_spec_name, is_junior_racket,
-    FetchOutcome, FetchResult, ScraperGone, sync_fetch_with_retry, ssl_ctx,
-    browser_headers,
+    FetchOutcome, FetchResult, NotModified, ScraperGone, browser_headers, ordered_pages,
+    CategoryScan, shopify_price_result, shopify_variant_prices,
 )
 
 
@@ -20,38 +17,27 @@ class PadelProShopScraper(BaseScraper):
     eliminating the need for Playwright browser automation entirely.
     """
 
-    def _fetch_api_page(self, collection_path: str, page_num: int) -> list:
-        """Fetch a single page of products from the Shopify JSON API (sync)."""
-        time.sleep(random.uniform(2.0, 4.0))
+    async def _fetch_api_page(self, collection_path: str, page_num: int) -> list:
+        """Fetch a single page of products from the Shopify JSON API."""
         api_url = f"https://padelproshop.com{collection_path}/products.json?limit=250&page={page_num}"
-        req = urllib.request.Request(api_url, headers=browser_headers(
-            origin="https://padelproshop.com/", accept="application/json",
-        ))
-
-        def _once():
-            with urllib.request.urlopen(req, timeout=30, context=ssl_ctx()) as resp:
-                return json.loads(resp.read().decode('utf-8'))
-
         try:
-            data = sync_fetch_with_retry(_once, label=f"PadelProShop:page{page_num}", max_retries=4, base_delay=10.0)
+            resp = await self._fetch(
+                api_url,
+                headers=browser_headers(origin="https://padelproshop.com/", accept="application/json"),
+                label=f"PadelProShop:page{page_num}", max_retries=4, base_delay=10.0,
+            )
         except ScraperGone:
             return []
-        return data.get('products', [])
-
-    def _fetch_product_json(self, handle: str) -> dict:
-        """Fetch a single product's full data from the Shopify JSON API (sync)."""
-        time.sleep(random.uniform(3.0, 5.0))
-        api_url = f"https://padelproshop.com/products/{handle}.json"
-        req = urllib.request.Request(api_url, headers=browser_headers(
-            origin="https://padelproshop.com/", accept="application/json",
-        ))
-
-        def _once():
-            with urllib.request.urlopen(req, timeout=30, context=ssl_ctx()) as resp:
-                return json.loads(resp.read().decode('utf-8'))
-
-        data = sync_fetch_with_retry(_once, label=f"PadelProShop:{handle}", max_retries=4, base_delay=10.0)
-        return data.get('product', {})
+        return resp.json().get('products', [])
+
+    async def _fetch_product_json(self, handle: str) -> dict:
+        """Fetch a single product's full data from the Shopify JSON API."""
+        resp = await self._fetch(
+            f"https://padelproshop.com/products/{handle}.json",
+            headers=browser_headers(origin="https://padelproshop.com/", accept="application/json"),
+            label=f"PadelProShop:{handle}", max_retries=4, base_delay=10.0, conditional=True,
+        )
+        return resp.json().get('product', {})
 
     # Palabras clave de forma y su valor normalizado
     _SHAPE_KEYWORDS = [
@@ -183,25 +169,47 @@ class PadelProShopScraper(BaseScraper):
 
         return specs
 
-    async def scrape_product(self, url: str) -> FetchResult:
-        """Scrape product data from PadelProShop using Shopify JSON API only."""
+    @staticmethod
+    def _handle(url: str) -> str:
+        # /products/pala-xyz -> pala-xyz
+        return url.rstrip('/').split('/products/')[-1].split('?')[0]
 
-        # Extract handle from URL: /products/pala-xyz -> pala-xyz
-        handle = url.rstrip('/').split('/products/')[-1].split('?')[0]
+    async def _product_json(self, url: str) -> Tuple[Optional[dict], Optional[FetchResult]]:
+        """The product's Shopify JSON, or the FetchResult that ends the scrape (bad URL, gone, error)."""
+        handle = self._handle(url)
         if not handle:
-            return FetchResult(FetchOutcome.FAILED, error="could not extract handle from URL")
+            return None, FetchResult(FetchOutcome.FAILED, error="could not extract handle from URL")
 
         try:
-            loop = asyncio.get_running_loop()
-            product_data = await loop.run_in_executor(
-                None, self._fetch_product_json, handle
-            )
+            return await self._fetch_product_json(handle), None
+        except NotModified:
+            raise  # fetch_product/fetch_price answer from the validator cache
         except ScraperGone:
-            return FetchResult(FetchOutcome.GONE)
+            return None, FetchResult(FetchOutcome.GONE)
         except Exception as e:
             print(f"[PadelProShop] API error for {handle}: {e}")
-            return FetchResult(FetchOutcome.FAILED, error=str(e))
+            return None, FetchResult(FetchOutcome.FAILED, error=str(e))
+
+    async def scrape_product(self, url: str) -> FetchResult:
+        """Scrape product data from PadelProShop using Shopify JSON API only."""
+        product_data, ended = await self._product_json(url)
+        return ended or await self._product_result(product_data, url, enrich=True)
+
+    async def scrape_price(self, url: str) -> FetchResult:
+        """Price-only scrape for refresh: the same product JSON, no specs and no HTML fallback."""
+        product_data, ended = await self._product_json(url)
+        return ended or shopify_price_result(product_data, url)
 
+    async def _product_result(self, product_data: dict, url: str, *, enrich: bool,
+                              body_specs: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        FetchResult from one Shopify product object — the `/products/{handle}.json`
+        payload or an entry of the collection feed, which carry the same
+        fields. `enrich` allows the extra full-page request for specs; the
+        price refresh doesn't need them. `body_specs`: body_html already
+        parsed by the caller, so it isn't parsed twice.
+        """
+        handle = self._handle(url)
         if not product_data or not isinstance(product_data, dict):
             return FetchResult(FetchOutcome.FAILED, error="empty or invalid API response")
 
@@ -213,28 +221,8 @@ class PadelProShopScraper(BaseScraper):
             print(f"[PadelProShop] Skipping junior racket: {name}")
             return FetchResult(FetchOutcome.FAILED, error="junior racket, excluded from catalog")
 
-        # Price
-        variants = product_data.get('variants') if isinstance(product_data.get('variants'), list) else []
-        first_variant = variants[0] if variants and isinstance(variants[0], dict) else {}
-
-        price: Optional[float] = None
-        if first_variant:
-            try:
-                raw_price = first_variant.get('price')
-                if raw_price is not None:
-                    price = float(raw_price)
-            except (ValueError, TypeError):
-                pass
-
-        # Original Price
-        original_price = None
-        if first_variant:
-            try:
-                op = first_variant.get('compare_at_price')
-                if op:
-                    original_price = float(op)
-            except (ValueError, TypeError, AttributeError):
-                pass
+        # Price / original price (first variant)
+        price, original_price = shopify_variant_prices(product_data)
 
         # Brand
         brand = product_data.get('vendor') or 'Unknown'
@@ -251,25 +239,21 @@ class PadelProShopScraper(BaseScraper):
         image = images[0] if images else ''
 
         # Specs from body_html
-        specs = self._parse_specs_from_html(product_data.get('body_html', ''))
-
-        # Si no se encontró Forma en el JSON (body_html), intentamos descargar el HTML completo
-        if 'Forma' not in specs:
-            try:
-                req = urllib.request.Request(url, headers=browser_headers(
+        if body_specs is None:
+            body_specs = self._parse_specs_from_html(product_data.get('body_html', ''))
+        specs = dict(body_specs)
+
+        # Si no se encontró Forma en el JSON (body_html), miramos el HTML completo
+        # (una vez por versión del producto: caché de specs por handle + updated_at)
+        if enrich and 'Forma' not in specs:
+            specs.update(await self._page_specs(
+                url, handle, product_data.get('updated_at'), self._parse_specs_from_html,
+                headers=browser_headers(
                     origin="https://padelproshop.com/",
                     accept="text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                ))
-
-                def _fetch_full_html():
-                    with urllib.request.urlopen(req, timeout=15, context=ssl_ctx()) as resp:
-                        return resp.read().decode('utf-8')
-
-                full_html = await loop.run_in_executor(None, _fetch_full_html)
-                more_specs = self._parse_specs_from_html(full_html)
-                specs.update(more_specs)
-            except Exception as e:
-                print(f"[PadelProShop] Error fetching HTML fallback for {handle}: {e}")
+                ),
+                label=f"PadelProShop:{handle}:html",
+            ))
 
         # Si aún no hay Forma, intentar desde los tags
         if 'Forma' not in specs:
@@ -300,55 +284,100 @@ class PadelProShopScraper(BaseScraper):
             return FetchResult(FetchOutcome.NO_PRICE, product=product)
         return FetchResult(FetchOutcome.OK, product=product)
 
+    @staticmethod
+    def _collection_path(url: str) -> str:
+        if '/collections/' in url:
+            return urlparse(url).path.rstrip('/')
+        return '/collections/palas-padel'
+
+    async def _collection_pages(self, collection_path: str, max_pages: int = 20) -> AsyncIterator[list]:
+        """
+        Yield each non-empty page of the collection's products.json feed, in
+        order. The feed doesn't say how many pages there are, so
+        `ordered_pages` probes a small window of pages ahead concurrently.
+        """
+        async def fetch(page_num: int) -> Optional[list]:
+            print(f"[PadelProShop] Fetching API page {page_num}...")
+            try:
+                return await self._fetch_api_page(collection_path, page_num)
+            except Exception as e:
+                print(f"[PadelProShop] API error on page {page_num}: {e}")
+                return None
+
+        async for _, products in ordered_pages(fetch, is_empty=lambda products: not products, max_pages=max_pages):
+            yield products
+
     async def scrape_category(self, url: str) -> List[str]:
         """Scrape product URLs using the Shopify products.json API.
 
         Uses the public Shopify JSON API instead of Playwright-based
         infinite scroll, which was unreliable.
         """
+        return (await self.scan_category(url)).urls
 
-        # Determine the collection path from the URL
-        if '/collections/' in url:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            collection_path = parsed.path.rstrip('/')
-        else:
-            collection_path = '/collections/palas-padel'
-
+    async def scan_category(self, url: str) -> CategoryScan:
+        """
+        Category URLs plus the products the feed already answers. Each feed
+        entry is a full product object; it is taken as-is only when its
+        body_html already has `Forma` — then `scrape_product` would not make
+        the HTML fallback request either, so the result is identical and
+        discover needs no request for that product. The rest are fetched.
+        """
+        collection_path = self._collection_path(url)
         product_urls = []
-        page_num = 1
+        products: Dict[str, FetchResult] = {}
+        page_num = 0
 
         print(f"[PadelProShop] Using Shopify API for product discovery...")
 
-        while True:
-            if page_num > 20:
-                print(f"[PadelProShop] Reached page limit (20). Stopping.")
-                break
-
-            print(f"[PadelProShop] Fetching API page {page_num}...")
-
-            try:
-                loop = asyncio.get_event_loop()
-                products = await loop.run_in_executor(
-                    None, self._fetch_api_page, collection_path, page_num
-                )
-            except Exception as e:
-                print(f"[PadelProShop] API error on page {page_num}: {e}")
-                break
-
-            if not products:
-                print(f"[PadelProShop] No more products on page {page_num}. Done.")
-                break
-
-            for product in products:
+        async for page in self._collection_pages(collection_path):
+            page_num += 1
+            for product in page:
                 handle = product.get('handle')
                 if handle:
                     product_url = f"https://padelproshop.com/products/{handle}"
                     if product_url not in product_urls:
                         product_urls.append(product_url)
-
-            print(f"[PadelProShop] Page {page_num}: {len(products)} products fetched. Total: {len(product_urls)}")
-            page_num += 1
-
-        print(f"[PadelProShop] Final count: {len(product_urls)} products from API")
-        return product_urls
+                        # Forma de body_html, no de los tags: con Forma solo por tags
+                        # scrape_product sí pediría la página HTML.
+                        body_specs = self._parse_specs_from_html(product.get('body_html') or '')
+                        if 'Forma' in body_specs:
+                            result = await self._product_result(
+                                product, product_url, enrich=False, body_specs=body_specs)
+                            if result.outcome in (FetchOutcome.OK, FetchOutcome.NO_PRICE):
+                                products[product_url] = result
+
+            print(f"[PadelProShop] Page {page_num}: {len(page)} products fetched. Total: {len(product_urls)}")
+
+        print(f"[PadelProShop] Final count: {len(product_urls)} products from API "
+              f"({len(products)} complete in the feed)")
+        return CategoryScan(product_urls, products)
+
+    async def prefetch_listing(self, category_url: str, urls: List[str]) -> Dict[str, FetchResult]:
+        """
+        Price refresh from the collection feed: each products.json page
+        already carries up to 250 full product objects (variants and prices
+        included), so a handful of requests replaces one per known handle.
+        Handles missing from the feed — or a feed that stops early — are
+        left out and refreshed one by one by the caller.
+        """
+        wanted: Dict[str, List[str]] = {}
+        for url in urls:
+            handle = self._handle(url)
+            if handle:
+                wanted.setdefault(handle, []).append(url)
+
+        results: Dict[str, FetchResult] = {}
+        # aclosing: stopping early must cancel the pages still prefetching.
+        async with aclosing(self._collection_pages(self._collection_path(category_url))) as pages:
+            async for products in pages:
+                for product_data in products:
+                    if not isinstance(product_data, dict):
+                        continue
+                    for url in wanted.pop(product_data.get('handle'), []):
+                        result = await self._product_result(product_data, url, enrich=False)
+                        if result.outcome in (FetchOutcome.OK, FetchOutcome.NO_PRICE):
+                            results[url] = result
+                if not wanted:
+                    break
+        return results
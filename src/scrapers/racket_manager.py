@@ -1,15 +1,22 @@
 import re
+import bisect
 import unicodedata
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from typing import Dict, List, Optional, Any, Set
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Any, Set, Tuple
 
 from supabase import Client
-from thefuzz import fuzz
+from thefuzz import fuzz, utils as fuzz_utils
 
+from . import db
 from .paddle_normalizer import normalize_paddle_name, normalize_for_comparison, slugify_paddle
 from .pricing import STORES
 
+if TYPE_CHECKING:
+    from .catalog_snapshot import CatalogSnapshot
+
 
 def _now_utc() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -49,12 +56,72 @@ SPECS_TO_CHARACTERISTICS = {
 }
 
 
+# Umbral del fuzzy match en merge_product: una candidata solo gana si su
+# score (token_sort_ratio + 5 de bonus por año coincidente) supera esto.
+FUZZY_MATCH_THRESHOLD = 88
+SAME_YEAR_BONUS = 5
+
+
 def _normalize_spec_key(key: str) -> str:
     """minúsculas + sin acentos, para que 'Tipo de Juego' y 'Tipo de juego' mapeen igual."""
     ascii_key = unicodedata.normalize("NFKD", key).encode("ascii", "ignore").decode("ascii")
     return ascii_key.strip().lower()
 
 
+# Sufijos que distinguen variantes: dos nombres solo pueden ser la misma pala
+# si tienen exactamente el mismo conjunto (ver RacketManager._are_compatible).
+CRITICAL_SUFFIXES = (
+    "woman", "w", "light", "lite", "air", "junior", "jr",
+    "hybrid", "ctrl", "control", "attack", "comfort", "cmf", "master",
+    "limited", "ltd", "pro", "team", "elite", "flow", "fdb",
+    "12k", "18k", "24k", "3k", "carbon",
+)
+
+
+@dataclass(frozen=True)
+class RacketFeatures:
+    """
+    What merge_product compares between two model names, computed once.
+
+    For a catalog entry `brand` is the resolved brand ("Unknown" rescued
+    from the model name); for a bare name it's empty. `sort_len` is the
+    length of the string token_sort_ratio really compares — only used to
+    bound the fuzzy score before calling it.
+    """
+
+    clean_name: str
+    year: Optional[str]
+    suffixes: FrozenSet[str]
+    sort_len: int
+    brand: str = ""
+
+
+@lru_cache(maxsize=8192)
+def _name_features(name: str) -> RacketFeatures:
+    name_lower = name.lower()
+    # Collapse internal hyphens for suffix/feature detection: "carb-on" → "carbon"
+    name_norm = re.sub(r"(?<=\w)-(?=\w)", "", name_lower)
+
+    # Year
+    year_match = re.search(r'\b(202[3-7])\b', name_norm)
+    year = year_match.group(1) if year_match else None
+
+    # Suffixes
+    padded = f" {name_norm} "
+    found_suffixes = frozenset(s for s in CRITICAL_SUFFIXES if f" {s} " in padded or f"-{s}" in name_norm)
+
+    # Clean Name
+    clean_name = normalize_for_comparison(name)
+    processed = fuzz_utils.full_process(clean_name, force_ascii=True)
+
+    return RacketFeatures(
+        clean_name=clean_name,
+        year=year,
+        suffixes=found_suffixes,
+        sort_len=len(" ".join(sorted(processed.split()))),
+    )
+
+
 class RacketManager:
     """
     Manages the catalog with rigorous cross-store deduplication.
@@ -77,6 +144,7 @@ class RacketManager:
         self._sanitize_loaded_data()
         self.url_map: Dict[str, str] = self._build_url_map()
         self._touched: Set[str] = set()
+        self._build_candidate_index()
 
     # =========================================================================
     # Row <-> in-memory entry conversion
@@ -150,26 +218,38 @@ class RacketManager:
             row["id"] = entry["id"]
         return row
 
-    def save(self, dry_run: bool = False) -> int:
-        """Persist every touched slug. Existing rackets update by id; brand-new ones insert."""
-        written = 0
+    def save(self, dry_run: bool = False, snapshot: Optional["CatalogSnapshot"] = None) -> int:
+        """
+        Persist every touched slug. Existing rackets go out as grouped upserts
+        by id (one request per column set and chunk, not one per racket);
+        brand-new ones as a bulk insert whose returned ids are attached to
+        their entries. `url_map` is already kept current by merge_product.
+        What was written is mirrored into the run's `snapshot`, if any.
+        """
+        updates: List[Dict[str, Any]] = []
+        new_slugs: List[str] = []
+        inserts: List[Dict[str, Any]] = []
         for slug in self._touched:
             entry = self.data[slug]
             row = self._entry_to_row(slug, entry)
-            if dry_run:
-                written += 1
-                continue
             if entry.get("id"):
-                row_id = row.pop("id")
-                self.client.table("rackets").update(row).eq("id", row_id).execute()
+                updates.append(row)
             else:
                 row["created_at"] = _now_utc()
-                result = self.client.table("rackets").insert(row).execute()
-                if result.data:
-                    entry["id"] = result.data[0]["id"]
-            written += 1
-        self.url_map = self._build_url_map()
-        return written
+                new_slugs.append(slug)
+                inserts.append(row)
+        if dry_run:
+            return len(updates) + len(inserts)
+
+        db.batch_upsert_grouped(self.client, "rackets", updates, snapshot=snapshot)
+        inserted = db.batch_insert(self.client, "rackets", inserts)
+        if snapshot is not None:
+            snapshot.apply(inserted)
+        ids_by_slug = {r["slug"]: r["id"] for r in inserted}
+        for slug in new_slugs:
+            if slug in ids_by_slug:
+                self.data[slug]["id"] = ids_by_slug[slug]
+        return len(updates) + len(inserts)
 
     # =========================================================================
     # Sanitation / URL map
@@ -285,43 +365,131 @@ class RacketManager:
         return normalize_for_comparison(name)
 
     # =========================================================================
-    # CORE DEDUPLICATION LOGIC
+    # Feature records + candidate index (blocking for merge_product)
     # =========================================================================
+    #
+    # merge_product used to re-run _extract_features + fuzz over EVERY entry
+    # of the catalog for each new product — quadratic over a discover run.
+    # Each entry now gets a RacketFeatures record computed once (here, at
+    # load) and recomputed only when its model or brand changes. Two of the
+    # match filters are exact, so they work as blocking keys without
+    # changing a single decision:
+    #   - the (resolved) brand must match,
+    #   - the suffix sets must be identical (_are_compatible).
+    # Entries are bucketed by (brand, suffixes) and kept in sync on every
+    # insert / model / brand change. Inside a bucket, a length bound on
+    # token_sort_ratio discards candidates that can't reach the threshold.
+    # A pure token-overlap block would NOT be lossless ("noxat10" vs
+    # "nox at10" share no token and still score > 88), so it isn't used.
+
+    def _build_candidate_index(self) -> None:
+        self._ordinal: Dict[str, int] = {}
+        self._features: Dict[str, RacketFeatures] = {}
+        self._feature_source: Dict[str, Tuple[str, str]] = {}
+        self._blocks: Dict[Tuple[str, FrozenSet[str]], List[Tuple[int, str]]] = {}
+        for slug in self.data:
+            self._ordinal[slug] = len(self._ordinal)
+            self._refresh_features(slug)
 
-    def _extract_features(self, name: str) -> dict:
-        name_lower = name.lower()
-        # Collapse internal hyphens for suffix/feature detection: "carb-on" → "carbon"
-        name_norm = re.sub(r"(?<=\w)-(?=\w)", "", name_lower)
-
-        # Year
-        year_match = re.search(r'\b(202[3-7])\b', name_norm)
-        year = year_match.group(1) if year_match else None
-
-        # Suffixes
-        critical_suffixes = [
-            "woman", "w", "light", "lite", "air", "junior", "jr",
-            "hybrid", "ctrl", "control", "attack", "comfort", "cmf", "master",
-            "limited", "ltd", "pro", "team", "elite", "flow", "fdb",
-            "12k", "18k", "24k", "3k", "carbon",
-        ]
-        found_suffixes = {s for s in critical_suffixes if f" {s} " in f" {name_norm} " or f"-{s}" in name_norm}
+    @staticmethod
+    def _block_key(features: RacketFeatures) -> Tuple[str, FrozenSet[str]]:
+        return ((features.brand or "").lower(), features.suffixes)
+
+    def _refresh_features(self, slug: str) -> None:
+        """Recompute the record of `slug` if its model/brand changed, and re-file it."""
+        entry = self.data.get(slug)
+        model = entry.get('model', '') if isinstance(entry, dict) else None
+        brand = entry.get('brand', 'Unknown') if isinstance(entry, dict) else None
+        if slug in self._features and self._feature_source.get(slug) == (model, brand):
+            return
+
+        old = self._features.pop(slug, None)
+        self._feature_source.pop(slug, None)
+        if old is not None:
+            bucket = self._blocks.get(self._block_key(old), [])
+            pos = bisect.bisect_left(bucket, (self._ordinal[slug], slug))
+            if pos < len(bucket) and bucket[pos][1] == slug:
+                bucket.pop(pos)
+
+        if not isinstance(model, str) or not model:
+            return
+
+        # Fix for existing bad data in DB (e.g. "Unknown" in DB but real brand now)
+        resolved = brand if brand != "Unknown" else self._detect_brand_from_name(model)
+        features = replace(self._extract_features(model), brand=resolved)
+        self._features[slug] = features
+        self._feature_source[slug] = (model, brand)
+        if slug not in self._ordinal:
+            self._ordinal[slug] = len(self._ordinal)
+        bisect.insort(self._blocks.setdefault(self._block_key(features), []), (self._ordinal[slug], slug))
+
+    def features(self, slug: str) -> Optional[RacketFeatures]:
+        """
+        Cached matching features of a catalog entry (None if it has no
+        usable model). Safe to call after mutating an entry in place — a
+        changed model/brand is detected and the record recomputed.
+        """
+        if slug not in self.data:
+            return None
+        self._refresh_features(slug)
+        return self._features.get(slug)
+
+    def _find_best_match(self, input_features: RacketFeatures, brand: str) -> Optional[str]:
+        """
+        Best fuzzy candidate for a product, or None. Same decision the old
+        full scan made: highest score above FUZZY_MATCH_THRESHOLD, ties going
+        to the entry that comes first in `self.data`.
+        """
+        block = ((brand or "").lower(), input_features.suffixes)
+        best_score = 0
+        best_match_slug = None
+
+        for _, existing_slug in self._blocks.get(block, []):
+            existing_features = self._features[existing_slug]
+
+            # Filter B: Hard Compatibility
+            if not self._are_compatible(input_features, existing_features):
+                continue
 
-        # Clean Name
-        clean_name = self._normalize_name_for_comparison(name)
+            bonus = 0
+            if input_features.year and input_features.year == existing_features.year:
+                bonus = SAME_YEAR_BONUS
+
+            # Upper bound of token_sort_ratio from lengths alone — skip the
+            # fuzzy call when even a perfect alignment couldn't win. The
+            # epsilon keeps float noise on a .5 from flipping the rounding.
+            total_len = input_features.sort_len + existing_features.sort_len
+            if total_len:
+                ratio_bound = 200 * min(input_features.sort_len, existing_features.sort_len) / total_len
+                max_score = int(ratio_bound + 0.5 + 1e-9) + bonus
+                if max_score <= FUZZY_MATCH_THRESHOLD or max_score <= best_score:
+                    continue
 
-        return {
-            "year": year,
-            "suffixes": found_suffixes,
-            "clean_name": clean_name
-        }
+            # Filter C: Fuzzy Match
+            score = fuzz.token_sort_ratio(input_features.clean_name, existing_features.clean_name) + bonus
+
+            # Threshold
+            if score > FUZZY_MATCH_THRESHOLD and score > best_score:
+                best_score = score
+                best_match_slug = existing_slug
+
+        return best_match_slug
+
+    # =========================================================================
+    # CORE DEDUPLICATION LOGIC
+    # =========================================================================
 
-    def _are_compatible(self, f_a: dict, f_b: dict) -> bool:
+    def _extract_features(self, name: str) -> RacketFeatures:
+        """Memoized per name string — the same model names recur across stores and runs."""
+        return _name_features(name)
+
+    def _are_compatible(self, f_a: RacketFeatures, f_b: RacketFeatures) -> bool:
         # Conflict 1: Years
-        if f_a['year'] and f_b['year'] and f_a['year'] != f_b['year']:
+        if f_a.year and f_b.year and f_a.year != f_b.year:
             return False
 
         # Conflict 2: Suffixes (Must match exactly if present)
-        if f_a['suffixes'] != f_b['suffixes']:
+        if f_a.suffixes != f_b.suffixes:
             return False
 
         return True
@@ -362,52 +530,17 @@ class RacketManager:
         # 3. Hybrid Fingerprint Match
         if not slug:
             input_features = self._extract_features(p_name)
-            best_score = 0
-            best_match_slug = None
-
-            for existing_slug, data in self.data.items():
-                if not isinstance(data, dict):
-                    continue
-                # Filter A: Brand must match (normalized)
-                existing_brand = data.get('brand', 'Unknown')
-
-                # Fix for existing bad data in DB (e.g. "Unknown" in DB but real brand now)
-                if existing_brand == "Unknown":
-                    existing_brand = self._detect_brand_from_name(data['model'])
-
-                if existing_brand.lower() != p_brand.lower():
-                    continue
-
-                existing_model = data.get('model', '')
-                if not isinstance(existing_model, str) or not existing_model:
-                    continue
-
-                existing_features = self._extract_features(existing_model)
-
-                # Filter B: Hard Compatibility
-                if not self._are_compatible(input_features, existing_features):
-                    continue
-
-                # Filter C: Fuzzy Match
-                score = fuzz.token_sort_ratio(input_features['clean_name'], existing_features['clean_name'])
-
-                if input_features['year'] and input_features['year'] == existing_features['year']:
-                    score += 5
-
-                # Threshold
-                if score > 88:
-                    if score > best_score:
-                        best_score = score
-                        best_match_slug = existing_slug
+            best_match_slug = self._find_best_match(input_features, p_brand)
 
             if best_match_slug:
                 slug = best_match_slug
                 existing_entry = self.data[slug]
 
                 # Logic: If current has no year, but new one does, take new name.
-                existing_feats = self._extract_features(existing_entry['model'])
-                if not existing_feats['year'] and input_features['year']:
+                existing_feats = self._features[slug]
+                if not existing_feats.year and input_features.year:
                     existing_entry['model'] = p_name
+                    self._refresh_features(slug)
                 # Logic: If both have year (or neither), prefer the one WITHOUT player name (cleaner)
                 elif len(p_name) < len(existing_entry['model']):
                     pass  # Simple heuristic: shorter often means less marketing fluff
@@ -440,6 +573,7 @@ class RacketManager:
                     "images": [],
                     "prices": []
                 }
+                self._refresh_features(slug)
 
         racket_entry = self.data[slug]
         self.url_map[p_url] = slug
@@ -450,6 +584,7 @@ class RacketManager:
         # Force Brand update if it was Unknown before
         if racket_entry.get('brand') == "Unknown" and p_brand != "Unknown":
             racket_entry['brand'] = p_brand
+            self._refresh_features(slug)
 
         # 5. Merge Specs
         for key, value in p_dict.get('specs', {}).items():
@@ -481,6 +616,9 @@ class RacketManager:
 
         if store_entry:
             store_entry["price"] = p_dict.get('price')
+            old_url = store_entry.get("url")
+            if old_url != p_url and self.url_map.get(old_url) == slug:
+                del self.url_map[old_url]
             store_entry["url"] = p_url
             if p_dict.get('original_price'):
                 store_entry["original_price"] = p_dict.get('original_price')
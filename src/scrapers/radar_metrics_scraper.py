@@ -16,6 +16,8 @@ from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 from urllib.parse import quote_plus
 
+from .paddle_normalizer import name_forms
+
 logger = logging.getLogger(__name__)
 
 # ──────────────────────────────────────────────
@@ -50,44 +52,16 @@ class RadarMetrics:
 
 def normalize_text(text: str) -> str:
     """Normaliza texto para comparación."""
-    if not text:
-        return ''
-    return (text
-            .lower()
-            .strip()
-            .replace('á', 'a')
-            .replace('é', 'e')
-            .replace('í', 'i')
-            .replace('ó', 'o')
-            .replace('ú', 'u')
-            .replace('ñ', 'n')
-            .replace('  ', ' '))
+    return name_forms(text).text
 
 
 def clean_pala_name_for_search(name: str) -> str:
     """
     Limpia el nombre de la pala eliminado códigos SKU, etiquetas de categoría (Beach Tennis, Pickleball)
     y palabras ruído para maximizar aciertos en buscadores de reseñas.
+    Memoizado en paddle_normalizer.name_forms, compartido con merge y dedup.
     """
-    if not name:
-        return ''
-
-    cleaned = name
-
-    # Eliminar prefijos de otros deportes
-    cleaned = re.sub(r'^(beach\s+tennis|pickleball)\s+', '', cleaned, flags=re.IGNORECASE)
-    
-    # Eliminar códigos SKU numéricos largos o alfanuméricos al final (ej. "221043", "pb3ca0u16")
-    cleaned = re.sub(r'\b[a-z0-9]{7,}\b', '', cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r'\b\d{5,}\b', '', cleaned)
-
-    # Eliminar corchetes, paréntesis y palabras de relleno comunes
-    cleaned = re.sub(r'[\(\)\[\]]', ' ', cleaned)
-    cleaned = re.sub(r'\b(pala|palas|padel)\b', '', cleaned, flags=re.IGNORECASE)
-
-    # Normalizar espacios
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-    return cleaned
+    return name_forms(name).search
 
 
 def to_number(raw: str) -> Optional[float]:
@@ -0,0 +1,120 @@
+"""
+rate_limit.py — Limitador adaptativo (AIMD) por host de tienda.
+
+Antes cada scraper dormía un `random.uniform(2, 5)` fijo antes de CADA
+petición y `sync_catalog` capaba la concurrencia a 2: un refresh de ~700
+URLs de padelproshop tardaba casi una hora aunque la tienda no estuviera
+throttleando. Ahora el ritmo lo marca la propia tienda:
+
+  - Ritmo (peticiones/s) espaciado como un token bucket de ráfaga 1.
+  - Cada respuesta OK suma `RATE_INCREASE` req/s (aumento aditivo), hasta
+    `MAX_RATE`.
+  - Un 429/403 multiplica el ritmo por `RATE_DECREASE` (bajada
+    multiplicativa, como mucho una vez por `DECREASE_COOLDOWN_S` para que
+    N peticiones en vuelo que rebotan juntas no lo hundan N veces) y, si
+    trae `Retry-After`, pausa el host entero ese tiempo.
+
+Hay UN limitador por host y proceso (`host_limiter`), compartido por todas
+las peticiones a esa tienda — igual que `base_scraper.host_pool`.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+INITIAL_RATE = 1.0        # req/s al arrancar — algo por encima del antiguo sleep de 2-5 s × 2
+MIN_RATE = 0.1
+MAX_RATE = 10.0
+RATE_INCREASE = 0.05      # req/s por respuesta OK
+RATE_DECREASE = 0.5
+DECREASE_COOLDOWN_S = 2.0
+MAX_PAUSE_S = 60.0        # Cloudflare manda Retry-After: 60 a IPs de datacenter
+MAX_IN_FLIGHT = 4         # = base_scraper.MAX_CONNECTIONS_PER_HOST
+
+
+class HostRateLimiter:
+    """
+    AIMD limiter for one host. Use `async with limiter.slot():` around each
+    request and report the response with `on_success` / `on_throttle`.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        initial_rate: float = INITIAL_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ):
+        self.host = host
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_in_flight = max_in_flight
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _in_flight(self) -> asyncio.Semaphore:
+        # Same rule as HostPool's AsyncClient: asyncio primitives belong to
+        # the loop that first waits on them, and each CLI command is its own
+        # `asyncio.run`.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _wait_for_turn(self, now: float) -> float:
+        """Seconds until the next request may start; 0 claims the turn."""
+        start = max(self._next_slot, self._paused_until)
+        if start > now:
+            return start - now
+        self._next_slot = now + 1.0 / self.rate
+        return 0.0
+
+    async def acquire(self) -> None:
+        # Re-evaluated after every sleep: a 429 that lands while we wait
+        # (lower rate, Retry-After pause) applies to requests already queued.
+        while True:
+            wait = self._wait_for_turn(time.monotonic())
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._in_flight():
+            await self.acquire()
+            yield
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_COOLDOWN_S:
+            self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+            self._last_decrease = now
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + min(retry_after, MAX_PAUSE_S))
+
+
+_LIMITERS: Dict[str, HostRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def host_limiter(url: str) -> HostRateLimiter:
+    """The process-wide limiter for `url`'s host, created on first use."""
+    host = urlparse(url).netloc
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(host)
+        if limiter is None:
+            limiter = _LIMITERS[host] = HostRateLimiter(host)
+        return limiter
@@ -0,0 +1,136 @@
+"""
+refresh_writer.py — Escritor incremental del job `refresh`.
+
+Antes `refresh` acumulaba en memoria el resultado de TODAS las URLs de la
+tienda y solo al final llamaba a `db.batch_upsert` / `record_price_history`:
+un crash o el timeout de CI a los 50 minutos tiraba todo el trabajo. Ahora
+los resultados llegan por una cola acotada a un único `RefreshWriter`, que
+vuelca cada `REFRESH_FLUSH_SIZE` decisiones en batches con el mismo set de
+columnas (requisito de PostgREST para un upsert en bloque, ver db.py).
+
+Ventana de commit diferido: las decisiones GONE (limpian precio Y link) NO
+se escriben sobre la marcha. Se guardan hasta el final y solo se aplican si
+los GONE nuevos de este run no superan `gone_cap` — un cambio de esquema de
+URLs en la tienda no puede vaciar el catálogo a medias. OK/NO_PRICE son
+señales confirmadas por la tienda y sí se escriben según llegan.
+
+Con un `RefreshCheckpoint` (checkpoint.py), cada flush deja además en disco
+qué ids quedan resueltos, lo que sumó cada fila a las métricas y los GONE
+retenidos, para `refresh --resume`.
+"""
+
+import asyncio
+from dataclasses import asdict
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from . import db, report
+from .base_scraper import FetchOutcome, FetchResult
+from .checkpoint import RefreshCheckpoint
+from .pricing import PriceDecision
+
+REFRESH_FLUSH_SIZE = 50
+REFRESH_QUEUE_SIZE = 100
+
+
+class RefreshWriter:
+    """Accounts and writes one store's refresh decisions as they arrive."""
+
+    def __init__(self, client: Optional[Any], store: str, stats: report.StoreRunStats, now_iso: str, *,
+                 dry_run: bool, flush_size: int = REFRESH_FLUSH_SIZE,
+                 checkpoint: Optional[RefreshCheckpoint] = None):
+        self.client = client
+        self.store = store
+        self.stats = stats
+        self.now_iso = now_iso
+        self.dry_run = dry_run
+        self.flush_size = flush_size
+        self.rows_written = 0
+        self.history_written = 0
+        # GONE this run for a link that still had a price stored — a real transition,
+        # not one of the already-dead links every run reconfirms as GONE.
+        self.newly_gone = 0
+        self._rows: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+        self._history: List[Dict[str, Any]] = []
+        self._pending = 0
+        self._deferred_gone: List[Dict[str, Any]] = []
+        self.checkpoint = checkpoint
+        self._resolved: Dict[str, str] = {}
+        self._tallies: Dict[str, list] = {}
+        if checkpoint is not None:
+            # Reanudando: los GONE que el run anterior dejó retenidos siguen
+            # contando para gone_cap y se escriben (o no) al final de este.
+            self._deferred_gone = list(checkpoint.deferred_gone)
+            self.newly_gone = checkpoint.newly_gone
+
+    async def add(self, row: dict, result: FetchResult, decision: PriceDecision) -> None:
+        store = self.store
+        old_price = row.get(f"{store}_actual_price")
+        effective_price = old_price if result.outcome is FetchOutcome.FAILED else decision.new_price
+        tally = (result.outcome, old_price is not None, effective_price is not None, decision.price_changed)
+        self.stats.record_row(*tally)
+        # Todas las filas, FAILED incluidas: --resume rehace los contadores
+        # solo con las que salta (checkpoint.resumed_stats).
+        self._tallies[str(row["id"])] = [result.outcome.value, *tally[1:]]
+
+        if not decision.updates:
+            return
+
+        self._resolved[str(row["id"])] = result.outcome.value
+        update = {"id": row["id"], **decision.updates}
+        if result.outcome is FetchOutcome.GONE:
+            if decision.price_changed:
+                self.newly_gone += 1
+            self._deferred_gone.append(update)
+            return
+
+        self._rows.setdefault(frozenset(update), []).append(update)
+        if decision.price_changed and decision.new_price is not None:
+            self._history.append({
+                "racket_id": row["id"],
+                "store": store,
+                "price": decision.new_price,
+                "original_price": decision.updates.get(f"{store}_original_price"),
+                "discount_percentage": decision.updates.get(f"{store}_discount_percentage", 0),
+                "recorded_at": self.now_iso,
+            })
+        self._pending += 1
+        if self._pending >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write everything buffered except the deferred GONE rows."""
+        batches, history = list(self._rows.values()), self._history
+        self._rows, self._history, self._pending = {}, [], 0
+        await self._write(batches, history)
+        self._save_checkpoint()
+
+    def _save_checkpoint(self) -> None:
+        if self.checkpoint is None or self.dry_run:
+            return
+        cp = self.checkpoint
+        cp.processed.update(self._resolved)
+        cp.tallies.update(self._tallies)
+        self._resolved, self._tallies = {}, {}
+        cp.deferred_gone = list(self._deferred_gone)
+        cp.newly_gone = self.newly_gone
+        cp.stats = asdict(self.stats)
+        cp.save()
+
+    def gone_cap_exceeded(self, gone_cap: int) -> bool:
+        return self.newly_gone > gone_cap
+
+    async def commit_deferred(self) -> None:
+        """Apply the GONE rows held back for the gone_cap check."""
+        rows, self._deferred_gone = self._deferred_gone, []
+        await self._write([rows] if rows else [], [])
+
+    async def _write(self, batches: List[List[Dict[str, Any]]], history: List[Dict[str, Any]]) -> None:
+        n_rows = sum(len(b) for b in batches)
+        if not self.dry_run:
+            # Supabase's client is sync: keep the event loop free for the fetchers.
+            for batch in batches:
+                await asyncio.to_thread(db.batch_upsert, self.client, "rackets", batch)
+            if history:
+                await asyncio.to_thread(db.record_price_history, self.client, history)
+        self.rows_written += n_rows
+        self.history_written += len(history)
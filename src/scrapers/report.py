@@ -14,6 +14,10 @@ from .base_scraper import FetchOutcome
 FAILED_RATIO_THRESHOLD = 0.25
 COVERAGE_DROP_THRESHOLD_POINTS = 10.0
 
+# Contadores que suma cada fila (record_row): los que un `refresh --resume`
+# reconstruye desde el checkpoint en vez de heredarlos tal cual.
+ROW_COUNTERS = ("attempted", "ok", "no_price", "gone", "failed", "price_changed", "coverage_before", "coverage_after")
+
 
 @dataclass
 class StoreRunStats:
@@ -26,6 +30,20 @@ class StoreRunStats:
     price_changed: int = 0
     coverage_before: int = 0
     coverage_after: int = 0
+    requests: int = 0       # peticiones HTTP reales, reintentos incluidos
+    throttled: int = 0      # de ellas, cuántas volvieron 429/403
+    elapsed_s: float = 0.0  # duración de la fase de fetch
+    cache_lookups: int = 0  # fetch_product contra la caché de validadores (http_cache.py)
+    cache_hits: int = 0     # de ellos, 304 servidos desde caché
+    from_listing: int = 0   # resueltas desde el listado sin pedir la ficha (refresh --mode listing)
+
+    @property
+    def request_rate(self) -> float:
+        return self.requests / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
 
     @property
     def failed_ratio(self) -> float:
@@ -54,6 +72,22 @@ class StoreRunStats:
         elif outcome is FetchOutcome.FAILED:
             self.failed += 1
 
+    def record_row(self, outcome: FetchOutcome, priced_before: bool, priced_after: bool, price_changed: bool) -> None:
+        """One refreshed row: its outcome, whether it had a price before/after, and whether it changed."""
+        self.record_outcome(outcome)
+        self.coverage_before += priced_before
+        self.coverage_after += priced_after
+        self.price_changed += price_changed
+
+    def record_requests(self, requests: int, throttled: int, elapsed_s: float) -> None:
+        self.requests += requests
+        self.throttled += throttled
+        self.elapsed_s += elapsed_s
+
+    def record_cache(self, lookups: int, hits: int) -> None:
+        self.cache_lookups += lookups
+        self.cache_hits += hits
+
 
 def check_guardrails(stats: StoreRunStats) -> List[str]:
     """Violations for a single store's run. Empty list = all clear."""
@@ -91,6 +125,15 @@ def render_summary(stats: StoreRunStats, violations: List[str]) -> str:
         "",
         f"Precios que cambiaron: {stats.price_changed}",
         "",
+        (
+            f"Ritmo: {stats.request_rate:.2f} req/s ({stats.requests} peticiones en "
+            f"{stats.elapsed_s:.0f}s, {stats.throttled} throttled 429/403)"
+        ),
+        "",
+        f"Caché HTTP (304): {stats.cache_hits}/{stats.cache_lookups} ({stats.cache_hit_ratio:.0%})",
+        "",
+        f"Resueltas desde el listado: {stats.from_listing}/{stats.attempted}",
+        "",
     ]
     if violations:
         lines.append("### ⚠️ Guardrails violados")
@@ -0,0 +1,85 @@
+"""
+scheduler.py — Prioridad de refresco por (pala, tienda).
+
+Cada `refresh` re-chequeaba TODAS las URLs por igual: palas cuyo precio no
+se mueve desde hace meses gastaban tantas peticiones como una oferta que
+cambia cada dos días (y que se quedaba una semana sin actualizar). Con
+`refresh --budget N` solo se piden las N URLs con más prioridad, así que el
+refresh puede correr mucho más a menudo con el mismo presupuesto de
+peticiones que toleran las tiendas.
+
+    score = staleness × (1 + W_VOLATILITY·volatilidad + W_OFFER·on_offer + W_POPULARITY·popularidad)
+
+  - staleness: horas desde `{store}_price_checked_at` / STALE_AFTER_HOURS,
+    topado en MAX_STALENESS (nunca chequeada = tope). Es multiplicativa: lo
+    recién chequeado baja al fondo de la cola aunque sea volátil, así que
+    todo acaba rotando.
+  - volatilidad: cambios de precio registrados en `price_history` para esa
+    tienda en los últimos VOLATILITY_WINDOW_DAYS, más su rango relativo.
+  - popularidad: no hay visitas por pala en la BD; el proxy es el número de
+    alertas de precio activas (`price_watch`) — gente esperando justo a que
+    ese precio se mueva.
+
+Lógica pura: las lecturas de Supabase las hace db.py.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .checkpoint import parse_iso
+
+STALE_AFTER_HOURS = 168.0  # el ciclo semanal de siempre
+MAX_STALENESS = 2.0
+VOLATILITY_WINDOW_DAYS = 90
+W_VOLATILITY = 2.0
+W_OFFER = 1.0
+W_POPULARITY = 1.0
+
+
+def volatility(prices: Iterable[float]) -> float:
+    """
+    0..~2: price changes in the window (capped at 1 after 4 of them) plus
+    the relative min-max range (capped at 1). `price_history` only gets a
+    row when the price changed, so each row past the first is a move.
+    """
+    prices = [p for p in prices if p and p > 0]
+    if len(prices) < 2:
+        return 0.0
+    moves = min((len(prices) - 1) / 4.0, 1.0)
+    spread = min((max(prices) - min(prices)) / (sum(prices) / len(prices)), 1.0)
+    return moves + spread
+
+
+def staleness(checked_at: Optional[str], now: datetime) -> float:
+    checked = parse_iso(checked_at)
+    if checked is None:
+        return MAX_STALENESS
+    age_hours = max((now - checked).total_seconds() / 3600.0, 0.0)
+    return min(age_hours / STALE_AFTER_HOURS, MAX_STALENESS)
+
+
+def priority(row: dict, store: str, history: List[float], watchers: int, now: datetime) -> float:
+    boost = (
+        W_VOLATILITY * volatility(history)
+        + W_OFFER * (1.0 if row.get("on_offer") else 0.0)
+        + W_POPULARITY * math.log1p(watchers)
+    )
+    return staleness(row.get(f"{store}_price_checked_at"), now) * (1.0 + boost)
+
+
+def select_by_priority(
+    rows: List[dict],
+    store: str,
+    budget: int,
+    history: Dict[int, List[float]],
+    watchers: Dict[int, int],
+    now: datetime,
+) -> List[dict]:
+    """The `budget` highest-priority rows, best first. Ties keep the input order."""
+    scored = [
+        (priority(row, store, history.get(row["id"], []), watchers.get(row["id"], 0), now), i, row)
+        for i, row in enumerate(rows)
+    ]
+    scored.sort(key=lambda t: (-t[0], t[1]))
+    return [row for _, _, row in scored[:budget]]
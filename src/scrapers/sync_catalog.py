@@ -11,6 +11,16 @@ Dos subcomandos, pensados para correr como dos jobs de GitHub Actions:
                               Pensado para una matrix de 3 jobs en paralelo,
                               uno por tienda: un bloqueo en una tienda no
                               alarga ni contamina a las otras.
+                              `--mode listing` (por defecto) saca primero
+                              los precios que pueda del listado de la tienda
+                              (`BaseScraper.prefetch_listing`) y solo pide
+                              ficha a ficha lo que falte; `--mode product`
+                              pide siempre cada ficha. `--resume` retoma un
+                              run que murió a medias (checkpoint.py).
+                              `--budget N` solo pide ficha a ficha las N URLs
+                              más prioritarias (scheduler.py). Ficha a ficha
+                              solo se parsea el precio (`scrape_price`) y
+                              nunca se pide la página HTML solo por specs.
 
   discover                   Recorre las páginas de categoría de las 3
                               tiendas, descubre palas nuevas (fuzzy match
@@ -23,6 +33,9 @@ Dos subcomandos, pensados para correr como dos jobs de GitHub Actions:
 Uso:
   python -m src.scrapers.sync_catalog refresh --store padelnuestro
   python -m src.scrapers.sync_catalog refresh --store padelmarket --limit 20 --dry-run
+  python -m src.scrapers.sync_catalog refresh --store padelproshop --mode product
+  python -m src.scrapers.sync_catalog refresh --store padelnuestro --resume --fresh-hours 6
+  python -m src.scrapers.sync_catalog refresh --store padelmarket --budget 150
   python -m src.scrapers.sync_catalog discover
   python -m src.scrapers.sync_catalog discover --limit 5 --dry-run
 """
@@ -31,8 +44,10 @@ import argparse
 import asyncio
 import os
 import sys
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 # El parche global `ssl._create_default_https_context = _create_unverified_context`
 # que había aquí desactivaba la verificación TLS para TODO el proceso, no solo
@@ -48,12 +63,15 @@ if __name__ == "__main__" and __package__ is None:
     __package__ = "src.scrapers"
 
 from . import db, report
-from . import pricing
+from . import pricing, scheduler
 from .base_scraper import FetchOutcome, FetchResult
 from .padelmarket_scraper import PadelMarketScraper
 from .padelnuestro_scraper import PadelNuestroScraper
 from .padelproshop_scraper import PadelProShopScraper
+from .catalog_snapshot import CatalogSnapshot
+from .checkpoint import RefreshCheckpoint, parse_iso
 from .racket_manager import RacketManager
+from .refresh_writer import REFRESH_QUEUE_SIZE, RefreshWriter
 from .deduplicate_rackets import run as run_deduplication
 
 STORE_CONFIGS = {
@@ -65,11 +83,17 @@ STORE_CONFIGS = {
 # Días sin aparecer en el catálogo de TODAS las tiendas para marcar como descatalogada.
 DISCONTINUED_THRESHOLD_DAYS = 30
 
-# Concurrencia baja a propósito: padelmarket y padelproshop están detrás de
-# Cloudflare y throttlean a IPs de datacenter con 429 + Retry-After 60s.
-# Lanzar 5 peticiones a la vez disparaba el rate-limit y quemaba el timeout.
-MAX_CONCURRENT_REFRESH = 2
-MAX_CONCURRENT_DISCOVER = 2
+# El ritmo no se fija aquí: padelmarket y padelproshop están detrás de
+# Cloudflare y throttlean a IPs de datacenter con 429 + Retry-After 60s, y
+# eso ya lo absorbe el limitador AIMD por host (rate_limit.py) por el que pasa
+# cada petición — sube el ritmo mientras la tienda responde 200 y frena solo.
+# REFRESH_WORKERS solo tiene que ser >= a las peticiones en vuelo que el
+# limitador deja por host, para no dejarle huecos.
+REFRESH_WORKERS = 8
+
+# `refresh --resume`: ventana en la que una fila ya resuelta (checkpoint o
+# `{store}_price_checked_at`) no se vuelve a pedir.
+DEFAULT_FRESH_HOURS = 12.0
 
 
 def _now_utc() -> str:
@@ -85,7 +109,42 @@ def _require_env_or_die() -> None:
 
 # ── refresh ──────────────────────────────────────────────────────────────
 
-async def refresh(store: str, limit: int, dry_run: bool, gone_cap: int) -> None:
+def _skip_resolved(rows: list, store: str, checkpoint: Optional[RefreshCheckpoint], fresh_hours: float) -> list:
+    """Rows still to refresh: not resolved in the checkpoint nor price-checked within `fresh_hours`."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=fresh_hours)
+    done = checkpoint.processed if checkpoint else {}
+
+    def pending(row: dict) -> bool:
+        if str(row["id"]) in done:
+            return False
+        checked = parse_iso(row.get(f"{store}_price_checked_at"))
+        return checked is None or checked < cutoff
+
+    return [r for r in rows if pending(r)]
+
+
+def _apply_budget(client, store: str, rows: list, prefetched: Dict[str, FetchResult], budget: int) -> list:
+    """
+    Rows the listing already resolved (free) plus the `budget` highest-priority
+    ones that need a per-product fetch.
+    """
+    listed = [r for r in rows if r[f"{store}_link"] in prefetched]
+    unlisted = [r for r in rows if r[f"{store}_link"] not in prefetched]
+    now = datetime.now(timezone.utc)
+    since_iso = (now - timedelta(days=scheduler.VOLATILITY_WINDOW_DAYS)).isoformat()
+    chosen = scheduler.select_by_priority(
+        unlisted, store, budget,
+        history=db.get_price_history_by_racket(client, store, since_iso),
+        watchers=db.get_price_watch_counts(client),
+        now=now,
+    )
+    print(f"  🎯 --budget {budget}: {len(chosen)}/{len(unlisted)} fichas por prioridad (+{len(listed)} desde el listado).")
+    return listed + chosen
+
+
+async def refresh(store: str, limit: int, dry_run: bool, gone_cap: int, mode: str = "listing",
+                  resume: bool = False, fresh_hours: float = DEFAULT_FRESH_HOURS,
+                  budget: Optional[int] = None) -> None:
     _require_env_or_die()
     client = db.get_client()
 
@@ -94,81 +153,113 @@ async def refresh(store: str, limit: int, dry_run: bool, gone_cap: int) -> None:
         rows = rows[:limit]
     print(f"💸 REFRESH [{store}] — {len(rows)} URLs conocidas.")
 
-    cls, _ = STORE_CONFIGS[store]
+    checkpoint = RefreshCheckpoint.load(store, fresh_hours) if resume else None
+    skipped_ids: List[str] = []
+    if resume:
+        before = len(rows)
+        all_ids = [str(r["id"]) for r in rows]
+        rows = _skip_resolved(rows, store, checkpoint, fresh_hours)
+        pending_ids = {str(r["id"]) for r in rows}
+        skipped_ids = [rid for rid in all_ids if rid not in pending_ids]
+        print(
+            f"  ⏩ --resume: {before - len(rows)} ya resueltas en las últimas {fresh_hours:g} h "
+            f"({'checkpoint de ' + checkpoint.started_at if checkpoint else 'sin checkpoint'}), quedan {len(rows)}."
+        )
+
+    cls, category_url = STORE_CONFIGS[store]
     scraper = cls()
     await scraper.init()
 
-    stats = report.StoreRunStats(store=store)
     now_iso = _now_utc()
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REFRESH)
+    if checkpoint is not None:
+        stats = checkpoint.resumed_stats(skipped_ids)  # guardrails sobre el run completo
+    else:
+        stats = report.StoreRunStats(store=store)
+    if checkpoint is None:
+        checkpoint = RefreshCheckpoint(store=store, started_at=now_iso)
+    started = time.monotonic()
+
+    prefetched: Dict[str, FetchResult] = {}
+    if mode == "listing":
+        prefetched = await scraper.prefetch_listing(category_url, [r[f"{store}_link"] for r in rows])
+        stats.from_listing += len(prefetched)
+        print(f"  📋 {len(prefetched)}/{len(rows)} resueltas desde el listado; el resto, ficha a ficha.")
+
+    if budget is not None:
+        rows = _apply_budget(client, store, rows, prefetched, budget)
+
+    # Pipeline en streaming: REFRESH_WORKERS fetchers → cola acotada → un
+    # único writer que vuelca a Supabase en batches según llegan. La memoria
+    # no crece con el tamaño del catálogo y lo ya escrito sobrevive a un
+    # crash o al timeout del job.
+    writer = RefreshWriter(client, store, stats, now_iso, dry_run=dry_run, checkpoint=checkpoint)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=REFRESH_QUEUE_SIZE)
+    pending_rows = iter(rows)
 
     async def process(row: dict):
-        async with semaphore:
-            url = row[f"{store}_link"]
-            old_price = row.get(f"{store}_actual_price")
+        url = row[f"{store}_link"]
+        old_price = row.get(f"{store}_actual_price")
+        result = prefetched.get(url)
+        if result is None:
             try:
-                result: FetchResult = await scraper.scrape_product(url)
+                result = await scraper.fetch_price(url)  # solo precio: decide_price_update no mira más
             except Exception as e:
                 result = FetchResult(FetchOutcome.FAILED, error=str(e))
-            stats.record_outcome(result.outcome)
-            decision = pricing.decide_price_update(store, result, old_price, now_iso, url)
-            return row, result, decision
-
-    results = await asyncio.gather(*[process(r) for r in rows])
-    await scraper.close()
-
-    rows_to_upsert = []
-    price_history_entries = []
-    newly_gone = 0  # GONE this run for a link that still had a price stored — a real transition,
-                     # not one of the already-dead links every run reconfirms as GONE.
-
-    for row, result, decision in results:
-        if row.get(f"{store}_actual_price") is not None:
-            stats.coverage_before += 1
-
-        effective_price = row.get(f"{store}_actual_price") if result.outcome is FetchOutcome.FAILED else decision.new_price
-        if effective_price is not None:
-            stats.coverage_after += 1
-
-        if decision.price_changed:
-            stats.price_changed += 1
-
-        if result.outcome is FetchOutcome.GONE and decision.price_changed:
-            newly_gone += 1
-
-        if decision.updates:
-            rows_to_upsert.append({"id": row["id"], **decision.updates})
-
-        if decision.price_changed and decision.new_price is not None:
-            price_history_entries.append({
-                "racket_id": row["id"],
-                "store": store,
-                "price": decision.new_price,
-                "original_price": decision.updates.get(f"{store}_original_price"),
-                "discount_percentage": decision.updates.get(f"{store}_discount_percentage", 0),
-                "recorded_at": now_iso,
-            })
-
-    if newly_gone > gone_cap:
+        decision = pricing.decide_price_update(store, result, old_price, now_iso, url)
+        return row, result, decision
+
+    async def fetcher():
+        for row in pending_rows:  # iterador compartido: cada fila la coge un solo fetcher
+            await queue.put(await process(row))
+
+    async def consume():
+        while (item := await queue.get()) is not None:
+            await writer.add(*item)
+        await writer.flush()
+
+    consumer = asyncio.create_task(consume())
+    fetchers = asyncio.gather(*[fetcher() for _ in range(REFRESH_WORKERS)])
+    try:
+        # Si el writer muere (error de Supabase), los fetchers se quedarían
+        # bloqueados en la cola llena: se cancelan y el error sube.
+        await asyncio.wait({consumer, fetchers}, return_when=asyncio.FIRST_COMPLETED)
+        if consumer.done():
+            fetchers.cancel()
+            consumer.result()
+        await fetchers
+        await queue.put(None)
+        await consumer
+    finally:
+        if not consumer.done():
+            consumer.cancel()
+        stats.record_requests(scraper.requests, scraper.throttled, time.monotonic() - started)
+        stats.record_cache(scraper.cache_lookups, scraper.cache_hits)
+        await scraper.close()
+
+    if writer.gone_cap_exceeded(gone_cap):
         print(
-            f"  ❌ {newly_gone} URLs de {store} pasaron a 'gone' (301/404) en este run (de "
+            f"  ❌ {writer.newly_gone} URLs de {store} pasaron a 'gone' (301/404) en este run (de "
             f"{stats.gone} 'gone' totales, el resto ya lo eran), por encima del tope de "
             f"seguridad ({gone_cap}). Posible cambio de esquema de URLs en la tienda — "
-            f"abortando sin escribir nada para evitar vaciar el catálogo."
+            f"no se escribe ningún 'gone' para evitar vaciar el catálogo "
+            f"({writer.rows_written} precios OK/sin precio ya escritos)."
         )
         report.write_step_summary(
             f"## Catalog sync — {store}\n\n"
-            f"### ❌ gone_cap superado: {newly_gone} nuevos > {gone_cap} "
-            f"(gone totales: {stats.gone}). Nada escrito.\n"
+            f"### ❌ gone_cap superado: {writer.newly_gone} nuevos > {gone_cap} "
+            f"(gone totales: {stats.gone}). Ningún 'gone' escrito.\n"
         )
+        if not dry_run:
+            checkpoint.discard()
         sys.exit(1)
 
+    await writer.commit_deferred()
+    if not dry_run:
+        checkpoint.discard()
     if dry_run:
-        print(f"  [dry-run] {len(rows_to_upsert)} filas se actualizarían, {len(price_history_entries)} price_history.")
+        print(f"  [dry-run] {writer.rows_written} filas se actualizarían, {writer.history_written} price_history.")
     else:
-        db.batch_upsert(client, "rackets", rows_to_upsert)
-        db.record_price_history(client, price_history_entries)
-        print(f"  💾 {len(rows_to_upsert)} filas actualizadas, {len(price_history_entries)} price_history escritas.")
+        print(f"  💾 {writer.rows_written} filas actualizadas, {writer.history_written} price_history escritas.")
 
     violations = report.check_guardrails(stats)
     report.write_step_summary(report.render_summary(stats, violations))
@@ -181,58 +272,97 @@ async def refresh(store: str, limit: int, dry_run: bool, gone_cap: int) -> None:
 
 
 # ── discover ─────────────────────────────────────────────────────────────
-
-async def discover(limit: int, dry_run: bool, dedupe_cap: int) -> None:
-    _require_env_or_die()
-    client = db.get_client()
-
-    rows = db.get_all_rackets_for_manager(client)
-    manager = RacketManager(client, rows)
-    print(f"🔎 DISCOVER — {len(manager.data)} palas conocidas, {len(manager.url_map)} URLs mapeadas.")
-
-    seen_slugs_per_store: Dict[str, Set[str]] = {s: set() for s in STORE_CONFIGS}
-
-    for store_name, (cls, category_url) in STORE_CONFIGS.items():
-        print(f"\n{'─' * 50}\n🏪 {store_name}\n{'─' * 50}")
-        scraper = cls()
-        await scraper.init()
+#
+# Las tres tiendas se escanean a la vez (categoría + fichas nuevas): cada
+# host tiene su propio limitador (rate_limit.py), así que no compiten entre
+# sí y el discover tarda lo que la tienda más lenta, no la suma. Lo único
+# que NO puede ir en paralelo es RacketManager.merge_product (fuzzy match
+# cruzado contra el catálogo que va creciendo): es una barrera — se espera
+# a las tres y se fusiona en orden fijo (STORE_CONFIGS, y dentro de cada
+# tienda el orden del listado), el mismo que el recorrido secuencial de
+# antes, así que el resultado del matching es reproducible.
+
+
+@dataclass
+class StoreScan:
+    """What one store's scan hands to the merge barrier."""
+
+    store: str
+    urls: List[str] = field(default_factory=list)  # URLs del listado (tras --limit)
+    new_results: List[Tuple[str, FetchResult]] = field(default_factory=list)  # en orden del listado
+    error: Optional[str] = None
+
+
+async def _scan_store(store_name: str, cls, category_url: str, known_urls, limit: int) -> StoreScan:
+    """Category scan + fetch of every URL not in `known_urls`. Never merges — see the barrier above."""
+    scan = StoreScan(store_name)
+    scraper = cls()
+    await scraper.init()
+    try:
         try:
-            urls = await scraper.scrape_category(category_url)
+            listing = await scraper.scan_category(category_url)
         except Exception as e:
-            print(f"  ❌ Error escaneando categoría de {store_name}: {e}")
-            await scraper.close()
-            continue
-
-        if limit:
-            urls = urls[:limit]
-
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DISCOVER)
-        new_urls = [u for u in urls if u not in manager.url_map]
-        for u in urls:
-            existing_slug = manager.url_map.get(u)
-            if existing_slug:
-                seen_slugs_per_store[store_name].add(existing_slug)
+            scan.error = str(e)
+            print(f"  ❌ [{store_name}] Error escaneando categoría: {e}")
+            return scan
 
-        print(f"  {len(urls)} URLs en catálogo, {len(new_urls)} nuevas (resto ya conocidas → las refresca el job refresh).")
+        scan.urls = listing.urls[:limit] if limit else listing.urls
+        new_urls = [u for u in scan.urls if u not in known_urls]
+        from_listing = sum(1 for u in new_urls if u in listing.products)
+        print(f"  [{store_name}] {len(scan.urls)} URLs en catálogo, {len(new_urls)} nuevas "
+              f"({from_listing} ya completas en el listado; resto ya conocidas → las refresca el job refresh).")
 
         async def scrape_new(url: str):
-            async with semaphore:
-                try:
-                    return url, await scraper.scrape_product(url)
-                except Exception as e:
-                    return url, FetchResult(FetchOutcome.FAILED, error=str(e))
+            if url in listing.products:
+                return url, listing.products[url]  # el listado ya trae la ficha completa
+            try:
+                return url, await scraper.fetch_product(url)
+            except Exception as e:
+                return url, FetchResult(FetchOutcome.FAILED, error=str(e))
 
-        new_results = await asyncio.gather(*[scrape_new(u) for u in new_urls])
+        scan.new_results = list(await asyncio.gather(*[scrape_new(u) for u in new_urls]))
+        return scan
+    finally:
         await scraper.close()
 
-        for url, result in new_results:
+
+def _merge_scans(manager: RacketManager, scans: List[StoreScan]) -> Dict[str, Set[str]]:
+    """The serialized stage: merge every scan into the catalog in the given order. Returns slugs seen per store."""
+    seen_slugs_per_store: Dict[str, Set[str]] = {scan.store: set() for scan in scans}
+    for scan in scans:
+        seen = seen_slugs_per_store[scan.store]
+        for u in scan.urls:
+            existing_slug = manager.url_map.get(u)
+            if existing_slug:
+                seen.add(existing_slug)
+        for url, result in scan.new_results:
             if result.outcome is FetchOutcome.FAILED or result.product is None:
                 continue  # sin señal fiable — se reintenta la semana que viene
-            slug = manager.merge_product(result.product, store_name)
+            slug = manager.merge_product(result.product, scan.store)
             if slug:
-                seen_slugs_per_store[store_name].add(slug)
+                seen.add(slug)
+    return seen_slugs_per_store
+
 
-    written = manager.save(dry_run=dry_run)
+async def discover(limit: int, dry_run: bool, dedupe_cap: int) -> None:
+    _require_env_or_die()
+    client = db.get_client()
+
+    # Una sola lectura de `rackets` para todo el run (ver catalog_snapshot.py).
+    snapshot = CatalogSnapshot.load(client)
+    rows = db.get_all_rackets_for_manager(client, snapshot)
+    manager = RacketManager(client, rows)
+    print(f"🔎 DISCOVER — {len(manager.data)} palas conocidas, {len(manager.url_map)} URLs mapeadas.")
+    print(f"🏪 Escaneando en paralelo: {', '.join(STORE_CONFIGS)}")
+
+    known_urls = frozenset(manager.url_map)
+    scans = await asyncio.gather(*[
+        _scan_store(store_name, cls, category_url, known_urls, limit)
+        for store_name, (cls, category_url) in STORE_CONFIGS.items()
+    ])
+    seen_slugs_per_store = _merge_scans(manager, list(scans))
+
+    written = manager.save(dry_run=dry_run, snapshot=snapshot)
     print(f"\n{'[dry-run] se persistirían' if dry_run else '💾 Persistidas'} {written} palas tocadas.")
 
     if dry_run:
@@ -241,22 +371,22 @@ async def discover(limit: int, dry_run: bool, dedupe_cap: int) -> None:
 
     for store_name, slugs in seen_slugs_per_store.items():
         ids = [manager.data[s]["id"] for s in slugs if manager.data.get(s) and manager.data[s].get("id")]
-        db.update_last_seen(client, store_name, ids, _now_utc())
+        db.update_last_seen(client, store_name, ids, _now_utc(), snapshot)
 
     threshold_iso = (datetime.now(timezone.utc) - timedelta(days=DISCONTINUED_THRESHOLD_DAYS)).isoformat()
-    marked = db.mark_discontinued(client, threshold_iso)
+    marked = db.mark_discontinued(client, threshold_iso, snapshot)
     print(f"🗑️  {len(marked)} palas marcadas como descatalogadas.")
 
-    changed_flags = db.finalize_comparison_flags(client)
+    changed_flags = db.finalize_comparison_flags(client, snapshot)
     print(f"🏳️  {changed_flags} palas con comparison_only/on_offer recalculado.")
 
     print(f"\n{'─' * 50}\n🔁 Deduplicando catálogo...\n{'─' * 50}")
-    run_deduplication(dry_run=False, delete_cap=dedupe_cap)
+    run_deduplication(dry_run=False, delete_cap=dedupe_cap, snapshot=snapshot)
 
     print(f"\n{'─' * 50}\n📊 Sincronizando métricas radar de palas...\n{'─' * 50}")
     try:
         from .sync_radar_metrics import fetch_rackets_needing_metrics, process_racket
-        needing_radar = fetch_rackets_needing_metrics()
+        needing_radar = fetch_rackets_needing_metrics(snapshot=snapshot)
         if needing_radar:
             print(f"  Encontradas {len(needing_radar)} palas sin métricas radar. Sincronizando...")
             for racket in needing_radar:
@@ -283,6 +413,19 @@ if __name__ == "__main__":
     p_refresh.add_argument("--limit", type=int, default=None, help="Limitar nº de productos (testing).")
     p_refresh.add_argument("--dry-run", action="store_true")
     p_refresh.add_argument("--gone-cap", type=int, default=40, help="Máximo de 'gone' (301/404) antes de abortar sin escribir.")
+    p_refresh.add_argument(
+        "--mode", choices=["listing", "product"], default="listing",
+        help="listing: precios desde el listado de la tienda y ficha a ficha solo lo que falte; product: siempre ficha a ficha.",
+    )
+    p_refresh.add_argument("--resume", action="store_true", help="Retomar el checkpoint local y saltar filas ya resueltas.")
+    p_refresh.add_argument(
+        "--fresh-hours", type=float, default=DEFAULT_FRESH_HOURS,
+        help="Con --resume: no re-pedir filas resueltas/chequeadas en las últimas N horas.",
+    )
+    p_refresh.add_argument(
+        "--budget", type=int, default=None,
+        help="Pedir ficha a ficha solo las N URLs más prioritarias (volatilidad, oferta, antigüedad, alertas).",
+    )
 
     p_discover = sub.add_parser("discover", help="Descubre palas nuevas, marca descatalogadas y dedupea.")
     p_discover.add_argument("--limit", type=int, default=None, help="Limitar URLs de categoría por tienda (testing).")
@@ -292,6 +435,9 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     if args.command == "refresh":
-        asyncio.run(refresh(args.store, args.limit, args.dry_run, args.gone_cap))
+        asyncio.run(refresh(
+            args.store, args.limit, args.dry_run, args.gone_cap, args.mode,
+            resume=args.resume, fresh_hours=args.fresh_hours, budget=args.budget,
+        ))
     else:
         asyncio.run(discover(args.limit, args.dry_run, args.dedupe_cap))
@@ -50,8 +50,19 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
-def fetch_rackets_needing_metrics(limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    """Obtiene palas que NO tienen todas las métricas radar con sus atributos físicos."""
+RADAR_COLUMNS = ("radar_potencia", "radar_control", "radar_manejabilidad", "radar_salida_bola", "radar_punto_dulce")
+
+
+def fetch_rackets_needing_metrics(limit: Optional[int] = None, snapshot=None) -> List[Dict[str, Any]]:
+    """
+    Obtiene palas que NO tienen todas las métricas radar con sus atributos
+    físicos. Dentro de `discover` se filtran de la foto del catálogo del run
+    (catalog_snapshot.CatalogSnapshot) en vez de volver a leer la tabla.
+    """
+    if snapshot is not None:
+        cols = "id, name, brand, model, characteristics_shape, characteristics_balance, characteristics_hardness, specs"
+        rows = snapshot.select(cols, where=lambda r: any(r.get(c) is None for c in RADAR_COLUMNS))
+        return rows[:limit] if limit else rows
     try:
         query = (
             supabase.table("rackets")
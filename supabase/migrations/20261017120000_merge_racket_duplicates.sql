@@ -0,0 +1,170 @@
+-- ============================================================
+-- Dedup: merge_racket_duplicates(merges jsonb) RPC
+--
+-- Problem: src/scrapers/deduplicate_rackets.py folded duplicate rackets
+-- into their canonical row client-side — read every row, compute the
+-- merged store prices / images / radar in Python, upsert the canonical,
+-- delete the duplicates — across several round-trips and with no
+-- atomicity: a crash between the upsert and the delete (or halfway through
+-- the groups) left the catalog half-merged. Deleting a duplicate also
+-- cascaded away its price_history, so the merged racket lost the price
+-- curve of whichever row was not chosen as canonical.
+--
+-- This function takes the whole merge plan in ONE call and applies it in
+-- ONE transaction (any error rolls back every group):
+--
+--   merges = [{"canonical_id": 12, "duplicate_ids": [34, 56]}, ...]
+--
+-- For each group, mirroring deduplicate_rackets._canonical_update:
+--   1. Store columns: for every store where the canonical has no
+--      actual_price, copy actual/original price, discount, link and
+--      last_seen from the LAST duplicate (in duplicate_ids order) that has
+--      one.
+--   2. Images: canonical images first, then each duplicate's images not
+--      already present, in order (union, order preserved, empties skipped).
+--   3. Radar: if the entry with the most store prices (first one on ties,
+--      canonical first) is a duplicate, copy its non-null radar values.
+--   4. Name: strip "(pala)" noise from the canonical's name/model.
+--   5. Repoint price_history (and price_watch, where the user is not
+--      already watching the canonical) from the duplicates to the
+--      canonical, then delete the duplicates.
+--
+-- `images` is written back through jsonb_populate_record, so this works
+-- whether the column is jsonb or text[].
+--
+-- Where the function is not deployed, deduplicate_rackets falls back to its
+-- batched client-side merge (PostgREST answers PGRST202 for an unknown function).
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.merge_racket_duplicates(merges jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  stores CONSTANT text[] := ARRAY['padelnuestro', 'padelmarket', 'padelproshop'];
+  store_fields CONSTANT text[] := ARRAY['actual_price', 'original_price', 'discount_percentage', 'link', 'last_seen'];
+  radar_cols CONSTANT text[] := ARRAY['radar_potencia', 'radar_control', 'radar_manejabilidad', 'radar_punto_dulce', 'radar_salida_bola'];
+  item jsonb;
+  canonical_id int;
+  duplicate_ids int[];
+  canon jsonb;
+  dups jsonb[];
+  dup jsonb;
+  source jsonb;
+  patch jsonb;
+  images jsonb;
+  img jsonb;
+  store text;
+  col text;
+  name_clean text;
+  best_count int;
+  entry_count int;
+  set_list text;
+  merged int := 0;
+  deleted int := 0;
+  n int;
+BEGIN
+  FOR item IN SELECT * FROM jsonb_array_elements(merges)
+  LOOP
+    canonical_id := (item->>'canonical_id')::int;
+    duplicate_ids := ARRAY(SELECT jsonb_array_elements_text(item->'duplicate_ids')::int);
+
+    SELECT to_jsonb(r) INTO canon FROM rackets r WHERE r.id = canonical_id FOR UPDATE;
+    IF canon IS NULL THEN
+      RAISE EXCEPTION 'merge_racket_duplicates: canonical racket % not found', canonical_id;
+    END IF;
+    dups := ARRAY(
+      SELECT to_jsonb(r)
+      FROM unnest(duplicate_ids) WITH ORDINALITY AS d(id, pos)
+      JOIN rackets r ON r.id = d.id
+      ORDER BY d.pos
+      FOR UPDATE OF r
+    );
+    IF coalesce(array_length(dups, 1), 0) <> coalesce(array_length(duplicate_ids, 1), 0)
+       OR canonical_id = ANY(duplicate_ids) THEN
+      RAISE EXCEPTION 'merge_racket_duplicates: bad duplicate ids % for canonical %', duplicate_ids, canonical_id;
+    END IF;
+
+    patch := '{}'::jsonb;
+
+    -- 1. Store columns (last duplicate with a price wins, as in Python)
+    FOREACH store IN ARRAY stores LOOP
+      CONTINUE WHEN canon->>(store || '_actual_price') IS NOT NULL;
+      FOREACH dup IN ARRAY dups LOOP
+        IF dup->>(store || '_actual_price') IS NOT NULL THEN
+          FOREACH col IN ARRAY store_fields LOOP
+            patch := patch || jsonb_build_object(store || '_' || col, dup->(store || '_' || col));
+          END LOOP;
+        END IF;
+      END LOOP;
+    END LOOP;
+
+    -- 2. Images union, order preserved
+    images := CASE WHEN jsonb_typeof(canon->'images') = 'array' THEN canon->'images' ELSE '[]'::jsonb END;
+    FOREACH dup IN ARRAY dups LOOP
+      CONTINUE WHEN jsonb_typeof(dup->'images') IS DISTINCT FROM 'array';
+      FOR img IN SELECT * FROM jsonb_array_elements(dup->'images') LOOP
+        CONTINUE WHEN img = 'null'::jsonb OR img = '""'::jsonb OR images @> jsonb_build_array(img);
+        images := images || jsonb_build_array(img);
+      END LOOP;
+    END LOOP;
+    IF images IS DISTINCT FROM coalesce(canon->'images', '[]'::jsonb) THEN
+      patch := patch || jsonb_build_object('images', images);
+    END IF;
+
+    -- 3. Radar from the most-priced entry
+    source := canon;
+    best_count := (SELECT count(*) FROM unnest(stores) s WHERE canon->>(s || '_actual_price') IS NOT NULL);
+    FOREACH dup IN ARRAY dups LOOP
+      entry_count := (SELECT count(*) FROM unnest(stores) s WHERE dup->>(s || '_actual_price') IS NOT NULL);
+      IF entry_count > best_count THEN
+        source := dup;
+        best_count := entry_count;
+      END IF;
+    END LOOP;
+    IF source->>'id' <> canon->>'id' THEN
+      FOREACH col IN ARRAY radar_cols LOOP
+        IF source->col IS NOT NULL AND source->col <> 'null'::jsonb AND source->col IS DISTINCT FROM canon->col THEN
+          patch := patch || jsonb_build_object(col, source->col);
+        END IF;
+      END LOOP;
+    END IF;
+
+    -- 4. "(pala)" noise in the canonical name
+    name_clean := btrim(
+      regexp_replace(coalesce(nullif(canon->>'name', ''), canon->>'model', ''), '\s*\(pala\)\s*', ' ', 'gi'),
+      E' \t\n\r\f\v'
+    );
+    IF name_clean <> coalesce(nullif(canon->>'name', ''), canon->>'model', '') THEN
+      patch := patch || jsonb_build_object('name', name_clean, 'model', name_clean);
+    END IF;
+
+    IF patch <> '{}'::jsonb THEN
+      SELECT string_agg(format('%I = p.%I', k, k), ', ') INTO set_list FROM jsonb_object_keys(patch) AS k;
+      EXECUTE format('UPDATE rackets r SET %s FROM jsonb_populate_record(NULL::rackets, $1) p WHERE r.id = $2', set_list)
+        USING patch, canonical_id;
+      merged := merged + 1;
+    END IF;
+
+    -- 5. Keep the duplicates' history and alerts, then delete them
+    UPDATE price_history SET racket_id = canonical_id WHERE racket_id = ANY(duplicate_ids);
+    UPDATE price_watch w SET racket_id = canonical_id
+    WHERE w.racket_id = ANY(duplicate_ids)
+      AND NOT EXISTS (SELECT 1 FROM price_watch c WHERE c.user_id = w.user_id AND c.racket_id = canonical_id);
+    DELETE FROM rackets WHERE id = ANY(duplicate_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    deleted := deleted + n;
+  END LOOP;
+
+  RETURN jsonb_build_object('merged', merged, 'deleted', deleted);
+END;
+$$;
+
+COMMENT ON FUNCTION public.merge_racket_duplicates(jsonb) IS
+  'Atomically folds duplicate rackets into their canonical (store columns, images, radar, price_history, price_watch) and deletes them. Called once per run by src/scrapers/deduplicate_rackets.py with the whole merge plan.';
+
+-- Only the scrapers' service-role client merges rackets. PostgreSQL grants
+-- EXECUTE to PUBLIC by default, which includes anon.
+REVOKE ALL ON FUNCTION public.merge_racket_duplicates(jsonb) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.merge_racket_duplicates(jsonb) TO service_role;
@@ -0,0 +1,184 @@
+"""
+Shared fixtures for the scraper tests: store traffic answered in-process by
+an httpx.MockTransport, with the per-host rate limiter opened up so tests
+don't wait on pacing, and one in-memory stand-in for the Supabase client
+covering the PostgREST builder calls db.py makes.
+"""
+
+import threading
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from src.scrapers import base_scraper
+from src.scrapers.base_scraper import HostPool
+from src.scrapers.rate_limit import HostRateLimiter
+
+
+@pytest.fixture
+def unthrottled(monkeypatch):
+    """Every host shares one limiter fast enough never to delay a test."""
+    limiter = HostRateLimiter("test", initial_rate=1000.0)
+    monkeypatch.setattr(base_scraper, "host_limiter", lambda url: limiter)
+    return limiter
+
+
+@pytest.fixture
+def mock_pool():
+    """Factory: a HostPool whose sync and async clients answer with `handler`."""
+    def make(handler, host="store.example") -> HostPool:
+        pool = HostPool(host)
+        pool._client = httpx.Client(transport=httpx.MockTransport(handler), follow_redirects=True)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        pool._async_client = lambda: client
+        return pool
+
+    return make
+
+
+@pytest.fixture
+def serve(monkeypatch, unthrottled, mock_pool):
+    """Route every scraper request to `handler`; returns the list of requested URLs."""
+    requested = []
+
+    def install(handler):
+        def record(request):
+            requested.append(str(request.url))
+            return handler(request)
+
+        pool = mock_pool(record)
+        monkeypatch.setattr(base_scraper, "host_pool", lambda url: pool)
+        return requested
+
+    return install
+
+
+class _FakeQuery:
+    def __init__(self, client, table):
+        self.client, self.table = client, table
+        self.op, self.rows, self.columns, self.count = None, None, ["*"], None
+        self.filters, self.ids, self.key, self.desc, self.n = [], None, None, False, None
+
+    def select(self, columns, count=None):
+        if not self.client.readable:
+            raise AssertionError(f"unexpected read of {self.table}")
+        self.op, self.columns, self.count = "select", [c.strip() for c in columns.split(",")], count
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.op, self.rows = "upsert", rows
+        return self
+
+    def insert(self, rows):
+        self.op, self.rows = "insert", rows
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def _filter(self, fn):
+        self.filters.append(fn)
+        return self
+
+    def eq(self, col, value):
+        return self._filter(lambda r: r.get(col) == value)
+
+    def gt(self, col, value):
+        return self._filter(lambda r: r[col] > value)
+
+    def gte(self, col, value):
+        return self._filter(lambda r: r[col] >= value)
+
+    def lte(self, col, value):
+        return self._filter(lambda r: r[col] <= value)
+
+    def in_(self, col, values):
+        self.ids = list(values)
+        return self._filter(lambda r: r.get(col) in self.ids)
+
+    def order(self, col, desc=False):
+        self.key, self.desc = col, desc
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        client = self.client
+        with client.lock:
+            client.requests += 1
+            if client.on_request:
+                client.on_request(client)
+            table = client.tables.setdefault(self.table, [])
+            data, count = getattr(self, f"_{self.op}")(table)
+            client.calls.append((self.op, self.ids if self.op == "delete" else self.rows))
+        return type("Result", (), {"data": data, "count": count})()
+
+    def _select(self, table):
+        rows = [r for r in table if all(f(r) for f in self.filters)]
+        matched = len(rows)
+        if self.key:
+            rows = sorted(rows, key=lambda r: r[self.key], reverse=self.desc)
+        rows = rows[: self.n] if self.n is not None else rows
+        data = [dict(r) if "*" in self.columns else {c: r.get(c) for c in self.columns} for r in rows]
+        return data, matched if self.count == "exact" else None
+
+    def _upsert(self, table):
+        by_id = {r["id"]: r for r in table}
+        for row in self.rows:
+            if row["id"] in by_id:
+                by_id[row["id"]].update(row)
+            else:
+                table.append(dict(row))
+        return [dict(r) for r in self.rows], None
+
+    def _insert(self, table):
+        next_id = max((r["id"] for r in table if isinstance(r.get("id"), int)), default=0) + 1
+        data = [{**r, "id": next_id + i} for i, r in enumerate(self.rows)]
+        table.extend(dict(r) for r in data)
+        return data, None
+
+    def _delete(self, table):
+        table[:] = [r for r in table if not all(f(r) for f in self.filters)]
+        return [], None
+
+
+class _FakeRpc:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params
+
+    def execute(self):
+        handler = self.client.functions.get(self.name)
+        if handler is None:
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{self.name}"})
+        self.client.calls.append(("rpc", self.params))
+        return type("Result", (), {"data": handler(self.params)})()
+
+
+class FakeSupabase:
+    """
+    In-memory Supabase client: `tables` by name, every executed call recorded
+    in `calls` as (op, rows / deleted ids / rpc params). RPCs answer through
+    `functions`; an unknown one fails with PGRST202 like PostgREST. With
+    `readable=False` any select fails the test.
+    """
+
+    def __init__(self, *, functions=None, readable=True, **tables):
+        self.tables, self.functions, self.readable = tables, dict(functions or {}), readable
+        self.calls, self.requests, self.on_request = [], 0, None
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return _FakeRpc(self, name, params)
+
+
+@pytest.fixture
+def fake_supabase():
+    """The FakeSupabase class, to build a client per test: fake_supabase(rackets=rows)."""
+    return FakeSupabase
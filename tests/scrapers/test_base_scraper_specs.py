@@ -7,7 +7,18 @@ keys in the same specs dict — PadelNuestro's attribute-table parser now
 does, and the collision silently overwrote real shape/finish data.
 """
 
-from src.scrapers.base_scraper import normalize_specs
+import asyncio
+import urllib.error
+
+import httpx
+import pytest
+
+from src.scrapers import base_scraper, http_cache
+from src.scrapers.base_scraper import (
+    BaseScraper, FetchOutcome, FetchResult, Product, ScraperGone,
+    async_fetch_with_retry, normalize_specs, sync_fetch_with_retry,
+)
+from src.scrapers.http_cache import SpecCache, ValidatorCache
 
 
 class TestNormalizeSpecsKeyCollisions:
@@ -59,3 +70,220 @@ class TestSslContext:
         ctx = ssl_ctx()
         assert ctx.check_hostname is True
         assert ctx.verify_mode is _ssl.CERT_REQUIRED
+
+
+class TestHostPool:
+    def test_error_status_is_raised_as_urllib_http_error(self, mock_pool):
+        # sync_fetch_with_retry keys its retry/backoff and GONE mapping off
+        # urllib's HTTPError — the pool must keep raising that type.
+        pool = mock_pool(lambda request: httpx.Response(429, headers={"Retry-After": "7"}))
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            pool.request("https://store.example/products/x.json")
+        assert exc.value.code == 429
+        assert exc.value.headers.get("Retry-After") == "7"
+
+    def test_404_through_retry_helper_is_gone(self, mock_pool):
+        pool = mock_pool(lambda request: httpx.Response(404))
+        with pytest.raises(ScraperGone):
+            sync_fetch_with_retry(lambda: pool.request("https://store.example/p"), label="t")
+
+    def test_response_exposes_final_url_after_redirect(self, mock_pool):
+        def handler(request):
+            if request.url.path == "/old":
+                return httpx.Response(301, headers={"Location": "https://store.example/new"})
+            return httpx.Response(200, text="ok")
+
+        resp = mock_pool(handler).request("https://store.example/old")
+        assert resp.url == "https://store.example/new"
+        assert resp.text() == "ok"
+
+    def test_async_path_maps_404_to_gone(self, mock_pool):
+        pool = mock_pool(lambda request: httpx.Response(404))
+
+        with pytest.raises(ScraperGone):
+            asyncio.run(async_fetch_with_retry(lambda: pool.arequest("https://store.example/p"), label="t"))
+
+
+class _JsonScraper(BaseScraper):
+    """Minimal store: one conditional JSON request per product."""
+
+    def __init__(self, pool):
+        super().__init__()
+        self.parses = 0
+        self._mock = pool
+
+    def _pool(self, url):
+        return self._mock
+
+    async def scrape_product(self, url):
+        try:
+            resp = await self._fetch(url, label="t", conditional=True)
+        except ScraperGone:
+            return FetchResult(FetchOutcome.GONE)
+        self.parses += 1
+        data = resp.json()
+        product = Product(url=url, name=data["title"], price=data["price"], brand="X", image=None, specs={})
+        return FetchResult(FetchOutcome.OK, product=product)
+
+    async def scrape_category(self, url):
+        return []
+
+
+@pytest.mark.usefixtures("unthrottled")
+class TestValidatorCache:
+    URL = "https://store.example/products/pala.json"
+
+    def test_304_returns_cached_product_without_parsing(self, tmp_path, monkeypatch, mock_pool):
+        cache = ValidatorCache(str(tmp_path / "store.example.json"))
+        monkeypatch.setattr(base_scraper, "validator_cache", lambda url: cache)
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"title": "Pala", "price": 99.0}, headers={"ETag": '"v1"'})
+
+        async def run():
+            first = _JsonScraper(mock_pool(handler))
+            r1 = await first.fetch_product(self.URL)
+            await first.close()
+            # Fresh process: the entry must come back from disk.
+            monkeypatch.setattr(base_scraper, "validator_cache", lambda url: ValidatorCache(cache.path))
+            second = _JsonScraper(mock_pool(handler))
+            r2 = await second.fetch_product(self.URL)
+            return r1, r2, second
+
+        r1, r2, second = asyncio.run(run())
+        assert seen == [None, '"v1"']
+        assert r1.outcome is FetchOutcome.OK and r2.outcome is FetchOutcome.OK
+        assert r2.product.price == 99.0 and r2.product.name == "Pala"
+        assert second.parses == 0
+        assert (second.cache_lookups, second.cache_hits) == (1, 1)
+
+    def test_gone_drops_the_entry(self, tmp_path, monkeypatch, mock_pool):
+        cache = ValidatorCache(str(tmp_path / "store.example.json"))
+        monkeypatch.setattr(base_scraper, "validator_cache", lambda url: cache)
+        responses = iter([
+            httpx.Response(200, json={"title": "Pala", "price": 99.0}, headers={"ETag": '"v1"'}),
+            httpx.Response(404),
+        ])
+
+        async def run():
+            scraper = _JsonScraper(mock_pool(lambda request: next(responses)))
+            await scraper.fetch_product(self.URL)
+            assert cache.get(self.URL) is not None
+            return await scraper.fetch_product(self.URL)
+
+        assert asyncio.run(run()).outcome is FetchOutcome.GONE
+        assert cache.get(self.URL) is None
+
+    def test_price_only_entries_never_answer_fetch_product(self, tmp_path, monkeypatch, mock_pool):
+        cache = ValidatorCache(str(tmp_path / "store.example.json"))
+        monkeypatch.setattr(base_scraper, "validator_cache", lambda url: cache)
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"title": "Pala", "price": 99.0}, headers={"ETag": '"v1"'})
+
+        async def run():
+            scraper = _JsonScraper(mock_pool(handler))
+            await scraper.fetch_price(self.URL)
+            assert cache.get(self.URL).price_only
+            again = await scraper.fetch_price(self.URL)
+            full = await scraper.fetch_product(self.URL)
+            return again, full
+
+        again, full = asyncio.run(run())
+        # The second price fetch is a 304; the full fetch ignores the price-only entry.
+        assert seen == [None, '"v1"', None]
+        assert again.product.price == 99.0 and full.product.price == 99.0
+        assert not cache.get(self.URL).price_only
+
+
+def _vertex_04(state):
+    """Handler for a Shopify product whose JSON lacks specs (at `state['updated_at']`) and its HTML page."""
+    def handler(request):
+        if request.url.path.endswith(".json"):
+            return httpx.Response(200, json={"product": {
+                "title": "Pala Vertex 04", "vendor": "Bullpadel", "body_html": "<p>Sin specs</p>",
+                "updated_at": state["updated_at"], "variants": [{"price": "199.95"}],
+            }})
+        return httpx.Response(200, text="<ul><li><strong>Forma:</strong> Diamante</li></ul>")
+
+    return handler
+
+
+class TestShopifyPageSpecCache:
+    URL = "https://padelmarket.com/es-eu/products/vertex-04"
+
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch, serve):
+        """Serve the Vertex 04 JSON and page; scrape with a fresh scraper and spec cache each time."""
+        from src.scrapers.padelmarket_scraper import PadelMarketScraper
+
+        path = str(tmp_path / "padelmarket.com.specs.json")
+        state = {"updated_at": "2026-10-01T10:00:00+02:00"}
+
+        requested = serve(_vertex_04(state))
+
+        def scrape(enrich=True):
+            # A fresh scraper and cache each time: entries must survive via disk.
+            monkeypatch.setattr(base_scraper, "spec_cache", lambda url: SpecCache(path))
+
+            async def run():
+                scraper = PadelMarketScraper()
+                scraper.enrich_specs = enrich
+                result = await scraper.scrape_product(self.URL)
+                await scraper.close()
+                return result
+            requested.clear()
+            result = asyncio.run(run())
+            return result.product.specs.get("Forma"), [httpx.URL(u).path for u in requested]
+
+        return scrape, state
+
+    def test_page_is_read_once_per_product_version(self, store):
+        scrape, state = store
+        json_only = ["/es-eu/products/vertex-04.json"]
+
+        assert scrape() == ("Diamante", json_only + ["/es-eu/products/vertex-04"])
+        assert scrape() == ("Diamante", json_only)
+
+        state["updated_at"] = "2026-10-15T09:00:00+02:00"
+        assert scrape() == ("Diamante", json_only + ["/es-eu/products/vertex-04"])
+
+    def test_without_enrichment_only_the_cache_answers(self, store):
+        scrape, _ = store
+        json_only = ["/es-eu/products/vertex-04.json"]
+
+        assert scrape(enrich=False) == (None, json_only)
+        scrape()
+        assert scrape(enrich=False) == ("Diamante", json_only)
+
+    def test_next_run_reads_the_specs_back_from_disk(self, tmp_path, monkeypatch, serve):
+        """Through the process-wide `spec_cache`: a new run starts with an empty registry."""
+        from src.scrapers.padelmarket_scraper import PadelMarketScraper
+
+        monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path))
+
+        requested = serve(_vertex_04({"updated_at": "2026-10-01T10:00:00+02:00"}))
+
+        async def run():
+            scraper = PadelMarketScraper()
+            result = await scraper.scrape_product(self.URL)
+            await scraper.close()
+            return result.product.specs.get("Forma")
+
+        for _ in range(2):
+            monkeypatch.setattr(http_cache, "_SPEC_CACHES", {})
+            monkeypatch.setattr(http_cache, "_CACHES", {})
+            assert asyncio.run(run()) == "Diamante"
+
+        assert [httpx.URL(u).path for u in requested] == [
+            "/es-eu/products/vertex-04.json", "/es-eu/products/vertex-04", "/es-eu/products/vertex-04.json",
+        ]
+        assert (tmp_path / "padelmarket.com.specs.json").exists()
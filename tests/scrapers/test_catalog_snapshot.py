@@ -0,0 +1,85 @@
+"""
+Tests for the per-run catalog snapshot: stages read projected copies from
+it instead of re-reading `rackets`, and every write they make is mirrored
+back so the next stage sees the catalog as it was left.
+"""
+
+import pytest
+
+from src.scrapers import db
+from src.scrapers import deduplicate_rackets as dedup
+from src.scrapers.catalog_snapshot import CatalogSnapshot
+from src.scrapers.pricing import STORES
+
+
+def _row(i, **cols):
+    row = {"id": i, "slug": f"r-{i}", "name": f"Racket {i}", "brand": "Nox", "model": f"Racket {i}",
+           "comparison_only": False, "on_offer": False, "discontinued": False, "images": [], "specs": {}}
+    for s in STORES:
+        row.update({f"{s}_actual_price": None, f"{s}_discount_percentage": 0, f"{s}_last_seen": None})
+    row.update(cols)
+    return row
+
+
+class TestSnapshot:
+    def test_select_returns_projected_copies(self):
+        snap = CatalogSnapshot([_row(1, images=["a.jpg"])])
+
+        rows = snap.select("id, images")
+        rows[0]["images"].append("b.jpg")
+
+        assert rows == [{"id": 1, "images": ["a.jpg", "b.jpg"]}]
+        assert snap.select("images") == [{"images": ["a.jpg"]}]
+
+    def test_unknown_column_is_an_error(self):
+        with pytest.raises(KeyError):
+            CatalogSnapshot([_row(1)]).select("id, not_a_column")
+
+    def test_apply_patches_inserts_and_remove_drops(self):
+        snap = CatalogSnapshot([_row(1), _row(2)])
+
+        snap.apply([{"id": 1, "discontinued": True, "updated_at": "ignored"}, _row(3)])
+        snap.remove([2])
+
+        assert snap.select("id, discontinued") == [
+            {"id": 1, "discontinued": True}, {"id": 3, "discontinued": False},
+        ]
+
+    def test_where_filters_on_full_rows(self):
+        snap = CatalogSnapshot([_row(1, radar_control=5), _row(2)])
+
+        assert snap.select("id", where=lambda r: r.get("radar_control") is None) == [{"id": 2}]
+
+
+class TestStagesShareTheSnapshot:
+    def test_later_stages_see_earlier_writes_without_rereading(self, fake_supabase):
+        seen = "2026-10-01T00:00:00+00:00"
+        snap = CatalogSnapshot([
+            _row(1, padelnuestro_last_seen="2026-01-01T00:00:00+00:00"),
+            _row(2, padelnuestro_last_seen="2026-01-01T00:00:00+00:00", padelnuestro_actual_price=120.0),
+        ])
+        # Any read fails: with a snapshot, stages must not touch `rackets` to read.
+        client = fake_supabase(readable=False)
+
+        db.update_last_seen(client, "padelnuestro", [2], seen, snap)
+        marked = db.mark_discontinued(client, "2026-09-01T00:00:00+00:00", snap)
+        db.finalize_comparison_flags(client, snap)
+
+        assert marked == [1]  # racket 2 was just seen: the last_seen write is visible
+        assert snap.select("id, discontinued, comparison_only") == [
+            {"id": 1, "discontinued": True, "comparison_only": True},
+            {"id": 2, "discontinued": False, "comparison_only": False},
+        ]
+
+    def test_dedup_reads_from_and_writes_back_to_the_snapshot(self, fake_supabase, monkeypatch):
+        snap = CatalogSnapshot([
+            _row(1, name="Vertex 04 (pala)", model="Vertex 04 (pala)", images=["dup.jpg"]),
+            _row(2, name="Vertex 04 2025", model="Vertex 04 2025", padelnuestro_actual_price=99.0),
+            _row(3, name="Hack Junior", model="Hack Junior"),
+        ])
+        client = fake_supabase(readable=False, functions={dedup.MERGE_RPC: lambda params: {}})
+        monkeypatch.setattr(dedup, "_get_client", lambda: client)
+
+        dedup.run(dry_run=False, delete_cap=None, snapshot=snap)
+
+        assert snap.select("id, images") == [{"id": 2, "images": ["dup.jpg"]}]
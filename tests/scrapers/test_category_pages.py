@@ -0,0 +1,113 @@
+"""
+Tests for `ordered_pages`, the concurrent category paginator: same pages,
+same order and same stopping point as the old sequential walk, with pages
+fetched ahead under a concurrency bound.
+"""
+
+import asyncio
+
+import httpx
+
+from src.scrapers.base_scraper import ordered_pages
+from src.scrapers.padelnuestro_scraper import PadelNuestroScraper
+
+
+class _Site:
+    """`last` non-empty pages; records requests, how many were in flight as each started, and the peak."""
+
+    def __init__(self, last, fail_on=None, delay=0.01):
+        self.last, self.fail_on, self.delay = last, fail_on, delay
+        self.requested, self.in_flight, self.peak = [], 0, 0
+        self.in_flight_at = {}
+
+    async def fetch(self, n):
+        self.requested.append(n)
+        self.in_flight += 1
+        self.in_flight_at[n] = self.in_flight
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Later pages answer first: the output order must not depend on it.
+            await asyncio.sleep(self.delay / n)
+            if n == self.fail_on:
+                return None
+            return [f"p{n}-a", f"p{n}-b"] if n <= self.last else []
+        finally:
+            self.in_flight -= 1
+
+
+def _collect(site, **kwargs):
+    async def run():
+        return [(n, page) async for n, page in ordered_pages(site.fetch, is_empty=lambda p: not p, **kwargs)]
+    return asyncio.run(run())
+
+
+class TestOrderedPages:
+    def test_pages_in_order_until_the_first_empty_one(self):
+        site = _Site(last=9)
+
+        pages = _collect(site, max_pages=40, concurrency=4)
+
+        assert [n for n, _ in pages] == list(range(1, 10))
+        assert pages[2] == (3, ["p3-a", "p3-b"])
+        assert 1 < site.peak <= 4
+        # Unknown count: the window may overshoot the end by concurrency-1 pages at most.
+        assert max(site.requested) <= 10 + 3
+
+    def test_known_count_costs_exactly_the_sequential_requests(self):
+        site = _Site(last=12)
+
+        pages = _collect(site, max_pages=40, concurrency=4, page_count=lambda page: 12)
+
+        assert [n for n, _ in pages] == list(range(1, 13))
+        assert sorted(site.requested) == list(range(1, 14))  # 12 pages + the empty probe
+        assert site.peak <= 4
+
+    def test_underestimated_count_still_reaches_the_real_end(self):
+        site = _Site(last=30)
+
+        pages = _collect(site, max_pages=40, concurrency=4, page_count=lambda page: 5)
+
+        assert [n for n, _ in pages] == list(range(1, 31))
+        # One probe past the count, then the window again — not one page at a time.
+        assert max(site.in_flight_at[n] for n in range(7, 31)) > 1
+        assert max(site.requested) <= 31 + 3
+
+    def test_a_failed_page_stops_the_walk_like_before(self):
+        site = _Site(last=20, fail_on=4)
+
+        assert [n for n, _ in _collect(site, max_pages=40)] == [1, 2, 3]
+
+    def test_max_pages_caps_the_walk(self):
+        site = _Site(last=100)
+
+        assert [n for n, _ in _collect(site, max_pages=5, page_count=lambda page: 100)] == [1, 2, 3, 4, 5]
+        assert max(site.requested) == 5
+
+    def test_empty_first_page(self):
+        site = _Site(last=0)
+
+        assert _collect(site, max_pages=40) == []
+        assert site.requested == [1]
+
+
+class TestPadelNuestroPager:
+    def test_page_count_from_magento_pager(self, serve):
+        requested = []
+
+        def handler(request):
+            page = int(request.url.params.get("p", "1"))
+            requested.append(page)
+            pager = "".join(
+                f'<a class="page" href="https://www.padelnuestro.com/palas-padel?p={i}">{i}</a>' for i in (2, 3, 6)
+            )
+            items = (
+                f'<a class="product-item-link" href="https://www.padelnuestro.com/pala-{page}-{i}">x</a>'
+                for i in range(3)
+            ) if page <= 6 else ()
+            return httpx.Response(200, text=pager + "".join(items))
+
+        serve(handler)
+        urls = asyncio.run(PadelNuestroScraper().scrape_category("https://www.padelnuestro.com/palas-padel"))
+
+        assert urls == [f"https://www.padelnuestro.com/pala-{p}-{i}" for p in range(1, 7) for i in range(3)]
+        assert sorted(requested) == list(range(1, 8))
@@ -0,0 +1,77 @@
+"""
+Tests for db.paginate: exact count + min/max first, then id ranges fetched
+concurrently, each by keyset. Every row must come back exactly once, in id
+order, whatever the id distribution — including a range holding more than
+a page and rows inserted while the read is in flight.
+"""
+
+import uuid
+
+import pytest
+
+from src.scrapers import db
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(db, "PAGE_SIZE", 10)
+
+
+class TestPaginate:
+    @pytest.mark.parametrize("ids", [
+        list(range(1, 101)),                                  # dense
+        list(range(1, 40)) + list(range(5000, 5061)),         # one range holds > a page
+        [7, 10_000, 10_001, 99_999],                          # very sparse
+        [42],
+    ])
+    def test_every_row_once_in_id_order(self, fake_supabase, ids):
+        client = fake_supabase(rackets=[{"id": i, "name": f"r{i}"} for i in reversed(ids)])
+
+        rows = db.paginate(client, "rackets", "id, name")
+
+        assert [r["id"] for r in rows] == sorted(ids)
+
+    def test_dense_table_is_count_plus_one_request_per_page(self, fake_supabase):
+        client = fake_supabase(rackets=[{"id": i} for i in range(1, 101)])
+
+        db.paginate(client, "rackets", "id")
+
+        # min+count, max, then 10 ranges of exactly one page each.
+        assert client.requests == 2 + 10
+
+    def test_empty_table(self, fake_supabase):
+        assert db.paginate(fake_supabase(rackets=[]), "rackets", "id") == []
+
+    def test_where_applies_to_count_and_pages(self, fake_supabase):
+        client = fake_supabase(rackets=[{"id": i, "store": "a" if i % 3 else "b"} for i in range(1, 61)])
+
+        rows = db.paginate(client, "rackets", "id, store", where=lambda q: q.eq("store", "b"))
+
+        assert [r["id"] for r in rows] == list(range(3, 61, 3))
+
+    def test_key_is_fetched_but_not_returned_when_not_projected(self, fake_supabase):
+        client = fake_supabase(price_watch=[{"id": i, "racket_id": i * 2} for i in range(1, 26)])
+
+        rows = db.paginate(client, "price_watch", "racket_id")
+
+        assert rows == [{"racket_id": i * 2} for i in range(1, 26)]
+
+    def test_uuid_keys_fall_back_to_a_sequential_keyset_walk(self, fake_supabase):
+        ids = sorted(str(uuid.UUID(int=i * 7919)) for i in range(1, 36))
+        client = fake_supabase(price_watch=[{"id": i} for i in ids])
+
+        assert [r["id"] for r in db.paginate(client, "price_watch", "id")] == ids
+
+    def test_rows_inserted_mid_read_do_not_duplicate_or_skip_existing_ones(self, fake_supabase):
+        client = fake_supabase(rackets=[{"id": i} for i in range(1, 51)])
+
+        def insert_low_id(c):
+            # An offset paginator would see every later page shifted by one.
+            if c.requests == 3:
+                c.tables["rackets"].append({"id": 0})
+
+        client.on_request = insert_low_id
+        ids = [r["id"] for r in db.paginate(client, "rackets", "id", workers=1)]
+
+        assert sorted(set(ids) - {0}) == list(range(1, 51))
+        assert len(ids) == len(set(ids))
@@ -0,0 +1,283 @@
+"""
+Tests for the dedup engine in deduplicate_rackets:
+
+  - the player-edition / comparison-only pair rules (formerly
+    scripts/dedup_rackets.find_duplicates) must emit exactly the pair list of
+    the original all-pairs scan: same pairs, same order, same greedy claiming
+    of rows. The scan is frozen below as the oracle and both run over a
+    synthetic catalog dump;
+  - build_merge_plan combines every rule family into one plan;
+  - run() sends the whole plan as one merge_racket_duplicates RPC call and
+    falls back to batched client-side writes when the RPC is not deployed.
+"""
+
+import random
+import re
+
+import pytest
+from postgrest.exceptions import APIError
+
+from src.scrapers import deduplicate_rackets as dedup
+from src.scrapers.deduplicate_rackets import (
+    RULE_COMPARISON_ONLY,
+    RULE_JUNIOR,
+    RULE_PLAYER_EDITION,
+    RULE_SAME_MODEL,
+    build_merge_plan,
+    find_edition_pairs,
+)
+
+
+# ── Oracle: scripts/dedup_rackets.py before the engine, verbatim ────────────
+def _legacy_norm(s):
+    return (s or '').lower().strip()
+
+
+def _legacy_is_player_name(suffix):
+    suffix = suffix.strip().lstrip('- ').strip()
+    if not suffix:
+        return False
+    words = [w for w in re.split(r'[\s.]+', suffix) if w]
+    if len(words) < 2:
+        return False
+    if any(w in dedup.PRODUCT_KEYWORDS for w in words):
+        return False
+    if not all(w[0].isalpha() for w in words if w):
+        return False
+    return True
+
+
+def _legacy_is_same_base_model(comp_model, buyable_model):
+    ca = re.sub(r'\b(20\d{2})\b', '', _legacy_norm(comp_model)).strip()
+    cb = re.sub(r'\b(20\d{2})\b', '', _legacy_norm(buyable_model)).strip()
+    if not ca or not cb:
+        return False
+    return ca == cb
+
+
+def legacy_find_duplicates(rackets):
+    by_brand = {}
+    for r in rackets:
+        by_brand.setdefault(r['brand'] or '', []).append(r)
+    pairs = []
+    seen_ids = set()
+    for brand, group in by_brand.items():
+        for i, a in enumerate(group):
+            for j, b in enumerate(group):
+                if i >= j:
+                    continue
+                if a['id'] in seen_ids or b['id'] in seen_ids:
+                    continue
+                ma = _legacy_norm(a['model'])
+                mb = _legacy_norm(b['model'])
+                if a['comparison_only'] != b['comparison_only']:
+                    comp = a if a['comparison_only'] else b
+                    buyable = b if a['comparison_only'] else a
+                    if _legacy_is_same_base_model(comp['model'], buyable['model']):
+                        pairs.append((buyable, comp, 'delete_comp'))
+                        seen_ids.add(comp['id'])
+                        seen_ids.add(buyable['id'])
+                        continue
+                shorter, longer = (a, b) if len(ma) <= len(mb) else (b, a)
+                ms = _legacy_norm(shorter['model'])
+                ml = _legacy_norm(longer['model'])
+                if ml.startswith(ms + ' ') or ml.startswith(ms + ' - '):
+                    suffix = ml[len(ms):].lstrip(' -').strip()
+                    if _legacy_is_player_name(suffix):
+                        pairs.append((shorter, longer, 'merge_player'))
+                        seen_ids.add(shorter['id'])
+                        seen_ids.add(longer['id'])
+    return pairs
+
+
+_BASES = ["Vertex 04", "Hack 03", "AT10 Genius", "Metalbone", "Metalbone HRD", "Delta Pro", "Vertex", "Hack"]
+_SUFFIXES = ["", " 2024", " 2025", " Juan Lebron", " - Agustin Tapia", " Alex Ruiz 2024", " Light",
+             " Pro Team", " J. Sanz", " Comfort 2.0", "  Paquito Navarro", " ari sanchez"]
+
+
+def _dump(n, seed):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        model = rng.choice(_BASES) + rng.choice(_SUFFIXES)
+        if rng.random() < 0.1:
+            model = model.upper()
+        rows.append({
+            "id": i + 1,
+            "brand": rng.choice(["Bullpadel", "Nox", "Adidas", "", None]),
+            "model": model if rng.random() > 0.02 else None,
+            "comparison_only": rng.choice([True, False, False, None]),
+        })
+    rows.sort(key=lambda r: ((r["brand"] or ""), (r["model"] or "")))  # fetch_all_rackets: order=brand,model
+    return rows
+
+
+def _ids(pairs):
+    return [(a["id"], b["id"], action) for a, b, action in pairs]
+
+
+class TestEditionPairs:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_same_pair_list_as_the_all_pairs_scan(self, seed):
+        rows = _dump(400, seed)
+        assert _ids(find_edition_pairs(rows)) == _ids(legacy_find_duplicates(rows))
+
+    def test_rules(self):
+        rows = [
+            {"id": 1, "brand": "Nox", "model": "AT10 Genius", "comparison_only": False},
+            {"id": 2, "brand": "Nox", "model": "AT10 Genius 2024", "comparison_only": True},
+            {"id": 3, "brand": "Nox", "model": "AT10 Genius Agustin Tapia", "comparison_only": False},
+            {"id": 4, "brand": "Bullpadel", "model": "Hack 03", "comparison_only": False},
+            {"id": 5, "brand": "Bullpadel", "model": "Hack 03 Paquito Navarro", "comparison_only": False},
+            {"id": 6, "brand": "Bullpadel", "model": "Hack 03 Pro Team", "comparison_only": False},
+        ]
+        # Row 1 is claimed by the comparison-only pair first, so 3 stays unpaired.
+        assert _ids(find_edition_pairs(rows)) == [(1, 2, "delete_comp"), (4, 5, "merge_player")]
+
+
+def _row(id, model, brand="Nox", comparison_only=False, prices=0, **extra):
+    row = {"id": id, "slug": f"s{id}", "brand": brand, "model": model, "name": model,
+           "comparison_only": comparison_only, "images": []}
+    for store in dedup.STORES[:prices]:
+        row[f"{store}_actual_price"] = 100.0
+    row.update(extra)
+    return row
+
+
+class TestMergePlan:
+    def test_one_plan_from_every_rule_family(self):
+        rows = [
+            _row(1, "AT10 Genius (pala)", prices=1),
+            _row(2, "AT10 Genius 2024", prices=2),
+            _row(3, "ML10 Pro Cup", comparison_only=True),
+            _row(4, "ML10 Pro Cup 2023"),
+            _row(5, "Hack 03", brand="Bullpadel", prices=1),
+            _row(6, "Hack 03 Paquito Navarro", brand="Bullpadel"),
+            _row(7, "Vertex Junior", brand="Bullpadel"),
+        ]
+        plan = build_merge_plan(rows)
+
+        groups = [(g.rule, g.canonical["id"], [d["id"] for d in g.duplicates]) for g in plan.groups]
+        # 1+2: same model, canonical has more prices. 3+4 are also a same_model
+        # group (one year bucket), so the pair rules never see them.
+        assert (RULE_SAME_MODEL, 2, [1]) in groups
+        assert (RULE_SAME_MODEL, 4, [3]) in groups
+        assert (RULE_PLAYER_EDITION, 5, [6]) in groups
+        assert [r["id"] for r in plan.junior] == [7]
+        assert plan.planned_deletes == 4
+
+    def test_pair_rules_only_see_unclaimed_rows_and_honour_the_rule_filter(self):
+        rows = [
+            _row(1, "Vertex 04", brand="Bullpadel", comparison_only=True),
+            _row(2, "Vertex 04 2025", brand="Bullpadel"),
+            _row(3, "Vertex 04 2026", brand="Bullpadel"),
+        ]
+        # Two distinct years → no same_model group; 1 (comparison) vs 2 (buyable) is delete_comp.
+        plan = build_merge_plan(rows)
+        assert [(g.rule, g.canonical["id"], g.duplicates[0]["id"]) for g in plan.groups] == [(RULE_COMPARISON_ONLY, 2, 1)]
+        assert build_merge_plan(rows, rules={RULE_PLAYER_EDITION}).groups == []
+
+    def test_junior_deletion_is_its_own_rule_family(self):
+        rows = [
+            _row(1, "Hack 03", brand="Bullpadel", prices=1),
+            _row(2, "Hack 03 Paquito Navarro", brand="Bullpadel"),
+            _row(3, "Vertex Junior", brand="Bullpadel"),
+        ]
+        plan = build_merge_plan(rows, rules={RULE_PLAYER_EDITION})
+
+        assert plan.junior == [] and plan.planned_deletes == 1
+        assert [r["id"] for r in build_merge_plan(rows).junior] == [3]
+        junior_only = build_merge_plan(rows, rules={RULE_JUNIOR})
+        assert [r["id"] for r in junior_only.junior] == [3] and junior_only.groups == []
+
+
+def _merge_counts(params):
+    """What merge_racket_duplicates answers for `params`."""
+    merges = params["merges"]
+    return {"merged": len(merges), "deleted": sum(len(m["duplicate_ids"]) for m in merges)}
+
+
+def _writes(client):
+    """Calls after the catalog read, which must all come first."""
+    ops = [op for op, _ in client.calls]
+    reads = ops.index(next(op for op in ops if op != "select"))
+    assert "select" not in ops[reads:]
+    return client.calls[reads:]
+
+
+class TestBatchedExecution:
+    @staticmethod
+    def _catalog():
+        rows = [_row(i, f"Vertex {i:02d} (pala)", brand="Bullpadel", images=[f"dup{i}"]) for i in range(1, 21)]
+        rows += [_row(100 + i, f"Vertex {i:02d} 2025", brand="Bullpadel", prices=1) for i in range(1, 21)]
+        rows += [_row(200, "Hack Junior", brand="Bullpadel")]
+        return rows
+
+    def test_whole_plan_is_one_rpc_call(self, fake_supabase, monkeypatch):
+        client = fake_supabase(rackets=self._catalog(), functions={dedup.MERGE_RPC: _merge_counts})
+        monkeypatch.setattr(dedup, "_get_client", lambda: client)
+
+        result = dedup.run(dry_run=False, delete_cap=None)
+
+        # One catalog read, one upsert for the cleaned names, the junior delete, one merge RPC.
+        writes = _writes(client)
+        assert [op for op, _ in writes] == ["upsert", "delete", "rpc"]
+        cleaned = writes[0][1]
+        assert {r["id"] for r in cleaned} == set(range(1, 21))
+        assert all("(pala)" not in r["name"] for r in cleaned)
+        assert writes[1][1] == [200]
+        # The plan ran on the patched names: every "(pala)" row merged into its 2025 twin.
+        merges = writes[2][1]["merges"]
+        assert sorted((m["canonical_id"], tuple(m["duplicate_ids"])) for m in merges) == [
+            (100 + i, (i,)) for i in range(1, 21)
+        ]
+        assert result["deleted"] == 20 and result["merged"] == 20
+
+    def test_falls_back_to_client_side_merge_without_the_rpc(self, fake_supabase, monkeypatch):
+        client = fake_supabase(rackets=self._catalog())  # no merge function: PGRST202
+        monkeypatch.setattr(dedup, "_get_client", lambda: client)
+
+        result = dedup.run(dry_run=False, delete_cap=None)
+
+        writes = _writes(client)
+        assert [op for op, _ in writes] == ["upsert", "delete", "upsert", "delete"]
+        canonicals = writes[2][1]
+        assert {r["id"]: r["images"] for r in canonicals}[101] == ["dup1"]
+        assert all(r["name"] for r in canonicals)  # NOT NULL rides along from memory
+        assert sorted(writes[3][1]) == list(range(1, 21))
+        assert result["deleted"] == 20 and result["merged"] == 20
+
+    def test_cli_rule_set_leaves_juniors_and_names_alone(self, fake_supabase, monkeypatch):
+        client = fake_supabase(rackets=self._catalog(), functions={dedup.MERGE_RPC: _merge_counts})
+        monkeypatch.setattr(dedup, "_get_client", lambda: client)
+
+        dedup.run(dry_run=False, delete_cap=None, rules={RULE_PLAYER_EDITION, RULE_COMPARISON_ONLY})
+
+        # No name-cleaning upsert, no junior delete; the "(pala)" rows are not player editions.
+        assert [op for op, _ in client.calls if op != "select"] == []
+
+    def test_comparison_only_entries_are_plainly_deleted(self, fake_supabase, monkeypatch):
+        rows = [
+            _row(1, "Vertex 04", brand="Bullpadel", comparison_only=True, images=["comp.jpg"], radar_control=9),
+            _row(2, "Vertex 04 2025", brand="Bullpadel", prices=1, images=["buy.jpg"]),
+            _row(3, "Vertex 04 2026", brand="Bullpadel", prices=1),
+        ]
+        client = fake_supabase(rackets=rows, functions={dedup.MERGE_RPC: _merge_counts})
+        monkeypatch.setattr(dedup, "_get_client", lambda: client)
+
+        result = dedup.run(dry_run=False, delete_cap=None, rules={RULE_COMPARISON_ONLY})
+
+        # Deleted by id, nothing folded into the buyable row, nothing sent to the merge RPC.
+        assert ("delete", [1]) in client.calls
+        assert all(op != "upsert" for op, _ in client.calls)
+        assert all(params["merges"] == [] for op, params in client.calls if op == "rpc")
+        assert result["deleted"] == 1 and result["merged"] == 0
+
+    def test_other_rpc_errors_are_not_swallowed(self, fake_supabase, monkeypatch):
+        client = fake_supabase(rackets=self._catalog(), functions={dedup.MERGE_RPC: _merge_counts})
+        client.rpc = lambda name, params: (_ for _ in ()).throw(APIError({"code": "P0001", "message": "boom"}))
+        monkeypatch.setattr(dedup, "_get_client", lambda: client)
+
+        with pytest.raises(APIError):
+            dedup.run(dry_run=False, delete_cap=None)
+        assert [op for op, _ in _writes(client)] == ["upsert", "delete"]
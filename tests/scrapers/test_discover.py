@@ -0,0 +1,118 @@
+"""
+Tests for the discover fan-out: the three stores are scanned concurrently,
+but products reach RacketManager.merge_product in one fixed order (store
+order, then listing order) no matter which store finishes first. New
+products the category listing already answers are not fetched again.
+"""
+
+import asyncio
+import time
+
+from src.scrapers import sync_catalog
+from src.scrapers.base_scraper import CategoryScan, FetchOutcome, FetchResult
+
+
+def _store(delay, urls, fail_category=False, listed=()):
+    class FakeScraper:
+        closed = False
+        fetched = []
+
+        async def init(self):
+            pass
+
+        async def close(self):
+            FakeScraper.closed = True
+
+        async def scrape_category(self, category_url):
+            await asyncio.sleep(delay)
+            if fail_category:
+                raise RuntimeError("blocked")
+            return list(urls)
+
+        async def scan_category(self, category_url):
+            urls = await self.scrape_category(category_url)
+            return CategoryScan(urls, {u: FetchResult(FetchOutcome.OK, product={"url": u, "listed": True})
+                                       for u in listed})
+
+        async def fetch_product(self, url):
+            FakeScraper.fetched.append(url)
+            # Later URLs answer first: completion order must not leak into the merge.
+            await asyncio.sleep(delay / (1 + urls.index(url)))
+            if url.endswith("/broken"):
+                raise RuntimeError("timeout")
+            return FetchResult(FetchOutcome.OK, product={"url": url})
+
+    return FakeScraper
+
+
+class _RecordingManager:
+    def __init__(self, url_map):
+        self.url_map, self.merged = dict(url_map), []
+
+    def merge_product(self, product, store):
+        self.merged.append((store, product["url"]))
+        slug = f"slug:{product['url']}"
+        self.url_map[product["url"]] = slug
+        return slug
+
+
+async def _scan_all(configs, known, limit=None):
+    return await asyncio.gather(*[
+        sync_catalog._scan_store(name, cls, "cat", known, limit) for name, cls in configs
+    ])
+
+
+class TestDiscoverFanOut:
+    def test_stores_are_scanned_concurrently(self):
+        configs = [(name, _store(0.2, [f"https://{name}/a"])) for name in ("s1", "s2", "s3")]
+
+        start = time.perf_counter()
+        asyncio.run(_scan_all(configs, frozenset()))
+
+        assert time.perf_counter() - start < 0.5  # one store's time, not three
+
+    def test_merge_order_is_store_order_then_listing_order(self):
+        configs = [
+            ("padelmarket", _store(0.15, ["https://pm/1", "https://pm/2", "https://pm/3"])),
+            ("padelnuestro", _store(0.0, ["https://pn/1", "https://pn/known", "https://pn/2"])),
+            ("padelproshop", _store(0.05, ["https://pp/1", "https://pp/broken"])),
+        ]
+        manager = _RecordingManager({"https://pn/known": "existing"})
+
+        scans = asyncio.run(_scan_all(configs, frozenset(manager.url_map)))
+        seen = sync_catalog._merge_scans(manager, list(scans))
+
+        assert manager.merged == [
+            ("padelmarket", "https://pm/1"), ("padelmarket", "https://pm/2"), ("padelmarket", "https://pm/3"),
+            ("padelnuestro", "https://pn/1"), ("padelnuestro", "https://pn/2"),
+            ("padelproshop", "https://pp/1"),
+        ]
+        assert seen["padelnuestro"] == {"existing", "slug:https://pn/1", "slug:https://pn/2"}
+
+    def test_a_failing_store_does_not_stop_the_others(self):
+        broken = _store(0.0, [], fail_category=True)
+        configs = [("s1", broken), ("s2", _store(0.0, ["https://s2/a"]))]
+        manager = _RecordingManager({})
+
+        scans = asyncio.run(_scan_all(configs, frozenset()))
+        seen = sync_catalog._merge_scans(manager, list(scans))
+
+        assert scans[0].error == "blocked" and broken.closed
+        assert seen == {"s1": set(), "s2": {"slug:https://s2/a"}}
+
+    def test_limit_applies_per_store_before_fetching(self):
+        configs = [("s1", _store(0.0, [f"https://s1/{i}" for i in range(10)]))]
+
+        (scan,) = asyncio.run(_scan_all(configs, frozenset(), limit=3))
+
+        assert [u for u, _ in scan.new_results] == ["https://s1/0", "https://s1/1", "https://s1/2"]
+
+    def test_products_complete_in_the_listing_are_not_fetched(self):
+        store = _store(0.0, ["https://s1/a", "https://s1/b", "https://s1/c"], listed=["https://s1/a", "https://s1/c"])
+        manager = _RecordingManager({})
+
+        scans = asyncio.run(_scan_all([("s1", store)], frozenset()))
+        sync_catalog._merge_scans(manager, list(scans))
+
+        assert store.fetched == ["https://s1/b"]
+        assert manager.merged == [("s1", "https://s1/a"), ("s1", "https://s1/b"), ("s1", "https://s1/c")]
@@ -0,0 +1,164 @@
+"""
+Tests for `refresh --mode listing`: prices read in bulk from each store's
+category listing, with per-product fetches only for what the listing
+can't answer.
+"""
+
+import asyncio
+
+import httpx
+
+from src.scrapers.base_scraper import FetchOutcome, ListingPrice, listing_results
+from src.scrapers.padelmarket_scraper import PadelMarketScraper
+from src.scrapers.padelnuestro_scraper import PadelNuestroScraper
+from src.scrapers.padelproshop_scraper import PadelProShopScraper
+
+
+def _shopify_product(handle, price, compare_at=None):
+    return {
+        "handle": handle,
+        "title": f"Pala {handle}",
+        "vendor": "Bullpadel",
+        "body_html": "",
+        "images": [],
+        "variants": [{"price": price, "compare_at_price": compare_at}],
+    }
+
+
+class TestPadelProShopCollectionFeed:
+    CATEGORY = "https://padelproshop.com/collections/palas-padel"
+
+    def test_prices_come_from_the_feed_without_per_product_requests(self, serve):
+        feed = [_shopify_product("vertex-04", "199.95", "279.95"), _shopify_product("sin-precio", "0.00")]
+
+        def handler(request):
+            page = request.url.params.get("page")
+            return httpx.Response(200, json={"products": feed if page == "1" else []})
+
+        requested = serve(handler)
+        urls = [
+            "https://padelproshop.com/products/vertex-04",
+            "https://padelproshop.com/products/sin-precio?variant=1",
+            "https://padelproshop.com/products/not-in-feed",
+        ]
+        results = asyncio.run(PadelProShopScraper().prefetch_listing(self.CATEGORY, urls))
+
+        assert set(results) == set(urls[:2])
+        ok = results[urls[0]]
+        assert ok.outcome is FetchOutcome.OK
+        assert (ok.product.price, ok.product.original_price) == (199.95, 279.95)
+        assert results[urls[1]].outcome is FetchOutcome.NO_PRICE
+        # Two feed pages, no /products/{handle}.json and no HTML enrichment.
+        assert all("/collections/palas-padel/products.json" in u for u in requested)
+        assert len(requested) == 2
+
+    def test_feed_failure_leaves_everything_to_per_product_fetches(self, serve):
+        serve(lambda request: httpx.Response(404))
+        urls = ["https://padelproshop.com/products/vertex-04"]
+        assert asyncio.run(PadelProShopScraper().prefetch_listing(self.CATEGORY, urls)) == {}
+
+    def test_scan_hands_over_products_whose_feed_entry_is_complete(self, serve, monkeypatch):
+        complete = _shopify_product("vertex-04", "199.95")
+        complete["body_html"] = '<li class="product__details-item"><strong>Forma:</strong> Diamante</li>'
+        tagged = _shopify_product("hack-03", "179.95")
+        tagged["tags"] = "forma redonda"
+        feed = [complete, _shopify_product("sin-specs", "149.95"), tagged]
+
+        def handler(request):
+            page = request.url.params.get("page")
+            return httpx.Response(200, json={"products": feed if page == "1" else []})
+
+        parsed = []
+        parse = PadelProShopScraper._parse_specs_from_html
+        monkeypatch.setattr(PadelProShopScraper, "_parse_specs_from_html",
+                            lambda self, html: parsed.append(html) or parse(self, html))
+        requested = serve(handler)
+        scan = asyncio.run(PadelProShopScraper().scan_category(self.CATEGORY))
+
+        assert scan.urls == [
+            "https://padelproshop.com/products/vertex-04",
+            "https://padelproshop.com/products/sin-specs",
+            "https://padelproshop.com/products/hack-03",
+        ]
+        # Without Forma in body_html (tags only count after the fallback) scrape_product
+        # would add the HTML request: left to discover.
+        assert list(scan.products) == ["https://padelproshop.com/products/vertex-04"]
+        assert len(parsed) == len(feed)  # each body_html parsed once
+        product = scan.products["https://padelproshop.com/products/vertex-04"].product
+        assert (product.price, product.specs.get("Forma")) == (199.95, "Diamante")
+        assert all("/collections/palas-padel/products.json" in u for u in requested)
+
+
+class TestListingResults:
+    def test_conflicting_cards_and_missing_prices_are_deep_fetched(self):
+        cards = [
+            ListingPrice("https://s/products/a", 100.0, 150.0),
+            ListingPrice("https://s/products/b", 90.0),
+            ListingPrice("https://s/products/b", 95.0),
+            ListingPrice("https://s/products/c", None),
+        ]
+        urls = ["https://s/products/a?x=1", "https://s/products/b", "https://s/products/c", "https://s/products/d"]
+        results = listing_results(urls, cards, key=PadelMarketScraper._handle)
+        assert list(results) == ["https://s/products/a?x=1"]
+        assert results["https://s/products/a?x=1"].product.original_price == 150.0
+
+    def test_original_price_not_above_price_is_dropped(self):
+        results = listing_results(["u"], [ListingPrice("u", 100.0, 100.0)], key=str)
+        assert results["u"].product.original_price is None
+
+
+PADELMARKET_PAGE = """
+<div class="card"><a href="/es-eu/collections/palas/products/vertex-04">img</a>
+  <h3><a href="/es-eu/collections/palas/products/vertex-04">Vertex 04</a></h3>
+  <div class="price price--on-sale">
+    <s class="price-item price-item--regular">€279,95 EUR</s>
+    <span class="price-item price-item--sale price-item--last">€199,95 EUR</span>
+    <span class="badge price__badge-sale">Ahorra 80,00 €</span>
+  </div>
+</div>
+<div class="card"><a href="/es-eu/collections/palas/products/metalbone">Metalbone</a>
+  <div class="price"><span class="price-item price-item--regular">1.299,00 €</span></div>
+</div>
+<div class="card"><a href="/es-eu/collections/palas/products/pack-2">Pack</a>
+  <div class="price"><span class="price-item price-item--regular">Desde 99,95 €</span></div>
+</div>
+<footer><p class="footer-note">Envío gratis desde 60 €</p></footer>
+"""
+
+PADELNUESTRO_PAGE = """
+<li class="product-item"><a class="product photo product-item-photo" href="https://www.padelnuestro.com/pala-a.html"></a>
+  <a class="product-item-link" href="https://www.padelnuestro.com/pala-a.html">Pala A</a>
+  <span data-price-amount="149.95" data-price-type="finalPrice"></span>
+  <span data-price-type="oldPrice" data-price-amount="199.95"></span>
+</li>
+<li class="product-item">
+  <a class="product-item-link" href="https://www.padelnuestro.com/pala-b.html">Pala B</a>
+  <span data-price-amount="89.95" data-price-type="minPrice"></span>
+  <span data-price-amount="109.95" data-price-type="finalPrice"></span>
+</li>
+<li class="product-item">
+  <a href="https://www.padelnuestro.com/pala-c.html" class="product-item-link">Pala C</a>
+  <span data-price-amount="59,90" data-price-type="finalPrice"></span>
+</li>
+"""
+
+
+class TestListingParsers:
+    def test_padelmarket_cards(self):
+        cards = {c.url: c for c in PadelMarketScraper._parse_listing_prices(PADELMARKET_PAGE)}
+        base = "https://padelmarket.com/es-eu/products/"
+        assert cards[base + "vertex-04"][1:] == (199.95, 279.95)
+        assert cards[base + "metalbone"][1:] == (1299.0, None)
+        assert cards[base + "pack-2"].price is None
+
+    def test_padelnuestro_cards(self):
+        cards = PadelNuestroScraper._parse_listing_prices(PADELNUESTRO_PAGE)
+        assert [c[1:] for c in cards] == [(149.95, 199.95), (None, None), (59.9, None)]
+
+    def test_padelnuestro_matches_stored_links_without_html_suffix(self):
+        cards = PadelNuestroScraper._parse_listing_prices(PADELNUESTRO_PAGE)
+        results = listing_results(
+            ["https://www.padelnuestro.com/pala-a", "https://www.padelnuestro.com/pala-b"],
+            cards, key=PadelNuestroScraper._url_key,
+        )
+        assert list(results) == ["https://www.padelnuestro.com/pala-a"]
@@ -0,0 +1,126 @@
+"""
+Tests for the compiled paddle_normalizer and its shared `name_forms` memo:
+every form must stay byte-for-byte what the original per-module
+implementations produced (paddle_normalizer, deduplicate_rackets,
+radar_metrics_scraper), because normalized names are stored and compared
+against the catalog already in Supabase. The originals are frozen in
+scripts/paddle_normalizer_legacy.py as the oracle.
+"""
+
+import random
+
+import pytest
+
+from scripts.paddle_normalizer_legacy import (
+    LEGACY_FILLER_WORDS,
+    LEGACY_NOISE_TOKENS,
+    legacy_clean_pala_name_for_search,
+    legacy_normalize_for_comparison,
+    legacy_normalize_name_base,
+    legacy_normalize_paddle_name,
+    legacy_normalize_text,
+    legacy_slugify_paddle,
+)
+from src.scrapers import paddle_normalizer
+from src.scrapers.deduplicate_rackets import normalize_name_base
+from src.scrapers.paddle_normalizer import (
+    name_forms,
+    names_are_equivalent,
+    normalize_for_comparison,
+    normalize_paddle_name,
+    slugify_paddle,
+)
+from src.scrapers.radar_metrics_scraper import clean_pala_name_for_search, normalize_text
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+KNOWN_NAMES = [
+    "Noxat10", "NOXAT10", "pala Noxat10", "PALA NOXAT10", "pala de padel Noxat10",
+    "pala pádel Noxat10", "Noxat10 pala", "HEAD Delta Pro Woman 2024",
+    "  pala   Bullpadel  Hack 03  ", "VIBOR-A Black Mamba", "pala padel nox x-one evo",
+    "Bullpadel Vertex 04 (pala) 2025", "Nox AT10 Genius 18K Agustín Tapia 2024",
+    "Adidas Metalbone 3.0 Alex Ruiz", "Babolat Technical Viper Juan Lebron 2.0",
+    "Siux Diablo Revolution Pro 4.0 Sanyo Gutierrez", "Head Extreme Pro (Pádel)",
+    "Pala de la Bullpadel Hack del", "Star Vie Triton Pro 2023 - Belasteguin",
+    "Wilson Bela Pro V2.5", "Pala (pala (padel) padel) Carb-on", "Drop Shot Conqueror 10.0",
+    "Black Crown Piton Attack 12K.0", "Raqueta Kuikma PR 990 Hybrid Hard",
+    "(raqueta)(racket) Varlion LW Carbon", "PALA PÁDEL İstanbul Edición",
+    "Joma Tournament\tSlam Pro", "", "   ", "pala", "de la pala del",
+]
+
+_ATOMS = (
+    LEGACY_NOISE_TOKENS
+    + sorted(LEGACY_FILLER_WORDS)
+    + ["jon sanz", "paquito", "bela", "belasteguin", "di nenno", "galan", "tapia", "ta", "pia"]
+    + ["2020", "2024", "2031", "1.0", "3.0", "2.5", "10.0", ".0", "v2"]
+    + ["nox", "at10", "bullpadel", "vibor-a", "x-one", "carb-on", "Ñ", "Ü", "İ", "ß"]
+    + ["(", ")", "-", ".", ",", "/", "'", "’", "+", "&", "(pala)", "(padel)", "(pala de padel)"]
+    + ["España", "BÉLGICA", "eeuu", "by", "by agustin tapia", "alum", "aluminio", "Víbora", "[", "]"]
+    + ["beach tennis", "Pickleball", "221043", "pb3ca0u16", "palas", "á", "ñ", "é"]
+)
+_SEPARATORS = [" ", "  ", "", "\t", "-", " "]
+
+
+def _fuzz_names(n, seed=1234):
+    rng = random.Random(seed)
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            atom = rng.choice(_ATOMS)
+            parts.append(atom.upper() if rng.random() < 0.2 else atom)
+            parts.append(rng.choice(_SEPARATORS))
+        yield "".join(parts)
+
+
+CORPUS = KNOWN_NAMES + list(_fuzz_names(5000))
+
+
+class TestByteIdenticalToLegacy:
+    def test_normalize_paddle_name(self):
+        mismatches = [n for n in CORPUS if normalize_paddle_name(n) != legacy_normalize_paddle_name(n)]
+        assert mismatches == []
+
+    def test_normalize_for_comparison(self):
+        mismatches = [n for n in CORPUS if normalize_for_comparison(n) != legacy_normalize_for_comparison(n)]
+        assert mismatches == []
+
+    def test_slugify(self):
+        pairs = list(zip(CORPUS[::2], CORPUS[1::2]))
+        assert [slugify_paddle(b, m) for b, m in pairs] == [legacy_slugify_paddle(b, m) for b, m in pairs]
+
+    def test_dedup_base(self):
+        mismatches = [n for n in CORPUS if normalize_name_base(n) != legacy_normalize_name_base(n)]
+        assert mismatches == []
+
+    def test_radar_forms(self):
+        assert [n for n in CORPUS if normalize_text(n) != legacy_normalize_text(n)] == []
+        assert [n for n in CORPUS if clean_pala_name_for_search(n) != legacy_clean_pala_name_for_search(n)] == []
+
+    @pytest.mark.parametrize("raw", [None, 0, 12, [], ["pala"], {"a": 1}])
+    def test_non_string_input_still_returns_empty(self, raw):
+        # The memo is keyed on the raw name: unhashable input must not reach it.
+        assert normalize_paddle_name(raw) == legacy_normalize_paddle_name(raw) == ""
+        assert normalize_for_comparison(raw) == ""
+
+
+class TestSharedMemo:
+    def test_merge_dedup_and_radar_share_one_computation_per_name(self):
+        paddle_normalizer._name_forms.cache_clear()
+        raw = "Pala Nox AT10 Genius 2024 (pala)"
+        normalize_for_comparison(raw)
+        normalize_name_base(raw)
+        clean_pala_name_for_search(raw)
+        normalize_paddle_name(raw)
+        info = paddle_normalizer._name_forms.cache_info()
+        assert (info.misses, info.hits) == (1, 3)
+
+    def test_forms_are_bundled(self):
+        forms = name_forms("Pala Bullpadel Vertex 04 España Carb-on 2025")
+        assert forms.stored == "bullpadel vertex 04 españa carb-on 2025"
+        assert forms.comparison == "bullpadel vertex 04 españa carbon"
+        assert forms.dedup_base == "bullpadel vertex 04 spain carbon 2025"
+        assert forms.plain == "pala bullpadel vertex 04 españa carb-on 2025"
+
+    def test_equivalence_helper(self):
+        assert names_are_equivalent("pala Noxat10", "NOXAT10")
+        assert not names_are_equivalent("Nox AT10", "Nox AT12")
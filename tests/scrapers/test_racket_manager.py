@@ -5,8 +5,13 @@ Tests for the specs -> characteristics_* column mapping in racket_manager.
 until this mapping existed, none of it ever reached the `characteristics_*`
 columns that `search_document` (a generated column) and the UI filters
 actually read from — so palas found by discover were unsearchable.
+
+Also covers the merge candidate index and the batched `save()`.
 """
 
+from thefuzz import fuzz
+
+from src.scrapers.paddle_normalizer import normalize_paddle_name
 from src.scrapers.racket_manager import RacketManager
 
 
@@ -95,3 +100,159 @@ class TestSpecsToCharacteristics:
         row = _manager()._entry_to_row("test-slug", entry)
 
         assert "characteristics_shape" not in row
+
+
+class _FakeProduct:
+    def __init__(self, name, brand, url):
+        self._d = {"name": name, "brand": brand, "url": url, "price": 100.0, "specs": {}, "images": []}
+
+    def to_dict(self):
+        return dict(self._d)
+
+
+def _row(i, brand, model, store_link=None):
+    return {"id": i, "slug": f"slug-{i}", "brand": brand, "model": model, "padelnuestro_link": store_link}
+
+
+def _full_scan_match(manager: RacketManager, name: str, brand: str):
+    """The pre-index merge_product scan, kept verbatim as the reference."""
+    input_features = manager._extract_features(name)
+    best_score = 0
+    best_match_slug = None
+    for existing_slug, data in manager.data.items():
+        existing_brand = data.get('brand', 'Unknown')
+        if existing_brand == "Unknown":
+            existing_brand = manager._detect_brand_from_name(data['model'])
+        if existing_brand.lower() != brand.lower():
+            continue
+        existing_model = data.get('model', '')
+        if not isinstance(existing_model, str) or not existing_model:
+            continue
+        existing_features = manager._extract_features(existing_model)
+        if not manager._are_compatible(input_features, existing_features):
+            continue
+        score = fuzz.token_sort_ratio(input_features.clean_name, existing_features.clean_name)
+        if input_features.year and input_features.year == existing_features.year:
+            score += 5
+        if score > 88 and score > best_score:
+            best_score = score
+            best_match_slug = existing_slug
+    return best_match_slug
+
+
+CATALOG = [
+    ("Nox", "nox at10 genius 18k 2024"),
+    ("Nox", "nox at10 genius 12k 2024"),
+    ("Nox", "nox at10 genius"),
+    ("Nox", "nox ml10 pro cup"),
+    ("Bullpadel", "bullpadel vertex 04 2025"),
+    ("Bullpadel", "bullpadel vertex 04 woman 2025"),
+    ("Bullpadel", "bullpadel hack 03 2024"),
+    ("Unknown", "head delta pro 2024"),
+    ("Head", "head speed motion"),
+    ("Adidas", "adidas metalbone 3.3"),
+    ("Adidas", "adidas metalbone ctrl 3.3"),
+]
+
+
+class TestMergeCandidateIndex:
+    def test_index_matches_full_scan_decisions(self):
+        manager = RacketManager(client=None, rows=[_row(i, b, m) for i, (b, m) in enumerate(CATALOG)])
+        probes = [
+            ("Nox", "Nox AT10 Genius 18K 2024 Agustin Tapia"),
+            ("Nox", "noxat10 genius 18k"),
+            ("Nox", "Nox AT10 Genius 2025"),
+            ("Bullpadel", "Bullpadel Vertex 04 W 2025"),
+            ("Bullpadel", "Bullpadel Vertex 04 Woman 2025"),
+            ("Head", "Head Delta Pro"),
+            ("Head", "Head Speed Motion 2025"),
+            ("Adidas", "Adidas Metalbone CTRL 3.3 2024"),
+            ("Adidas", "Adidas Metalbone"),
+            ("Siux", "Siux Diablo"),
+        ]
+        for brand, raw in probes:
+            name = normalize_paddle_name(raw)
+            expected = _full_scan_match(manager, name, brand)
+            assert manager._find_best_match(manager._extract_features(name), brand) == expected, raw
+
+    def test_year_upgrade_reindexes_the_matched_entry(self):
+        manager = RacketManager(client=None, rows=[_row(1, "Nox", "nox at10 genius")])
+        slug = manager.merge_product(_FakeProduct("Nox AT10 Genius 2024", "Nox", "https://s/a"), "padelnuestro")
+
+        assert slug == "slug-1"
+        assert manager.data[slug]["model"] == "nox at10 genius 2024"
+        # A 2025 edition must no longer fold into the now-2024 entry.
+        other = manager.merge_product(_FakeProduct("Nox AT10 Genius 2025", "Nox", "https://s/b"), "padelnuestro")
+        assert other != slug
+
+    def test_new_entries_are_candidates_for_later_products(self):
+        manager = RacketManager(client=None, rows=[])
+        first = manager.merge_product(_FakeProduct("Siux Diablo Revolution 2024", "Siux", "https://s/a"), "padelmarket")
+        second = manager.merge_product(_FakeProduct("Pala Siux Diablo Revolution 2024", "Siux", "https://s/b"), "padelproshop")
+
+        assert first == second
+
+
+class TestFeatureRecords:
+    def test_unknown_brand_is_resolved_once_at_load(self):
+        manager = RacketManager(client=None, rows=[_row(1, "Unknown", "head delta pro 2024")])
+        features = manager.features("slug-1")
+
+        assert features.brand == "Head"
+        assert features.year == "2024"
+        assert features.suffixes == frozenset({"pro"})
+
+    def test_record_is_recomputed_when_the_model_changes(self):
+        manager = RacketManager(client=None, rows=[_row(1, "Nox", "nox at10 genius")])
+        before = manager.features("slug-1")
+        manager.data["slug-1"]["model"] = "nox at10 genius light 2025"
+        after = manager.features("slug-1")
+
+        assert before.year is None
+        assert after.year == "2025"
+        assert after.suffixes == frozenset({"light"})
+
+    def test_record_is_reused_while_model_and_brand_are_unchanged(self):
+        manager = RacketManager(client=None, rows=[_row(1, "Nox", "nox at10 genius")])
+
+        assert manager.features("slug-1") is manager.features("slug-1")
+
+    def test_entry_without_model_has_no_record(self):
+        manager = RacketManager(client=None, rows=[_row(1, "Nox", "")])
+
+        assert manager.features("slug-1") is None
+
+
+class TestBatchedSave:
+    def test_updates_and_inserts_are_batched_and_new_ids_attached(self, fake_supabase):
+        rows = [_row(i, "Nox", f"nox model {i}", f"https://pn/{i}") for i in range(1, 41)]
+        client = fake_supabase(rackets=[dict(r) for r in rows])
+        manager = RacketManager(client=client, rows=rows)
+        for i in range(1, 41):
+            manager.merge_product(_FakeProduct(f"nox model {i}", "Nox", f"https://pn/{i}"), "padelnuestro")
+        for name in ["Bullpadel Vertex 04 2025", "Head Delta Pro 2024", "Siux Diablo Revolution"]:
+            manager.merge_product(_FakeProduct(name, "", f"https://pn/{name}"), "padelnuestro")
+
+        assert manager.save() == 43
+
+        assert [op for op, _ in client.calls] == ["upsert", "insert"]
+        assert sorted(r["id"] for r in client.calls[0][1]) == list(range(1, 41))
+        inserted = client.calls[1][1]
+        assert len(inserted) == 3 and all("id" not in r and r["created_at"] for r in inserted)
+        assert sorted(manager.data[row["slug"]]["id"] for row in inserted) == [41, 42, 43]
+
+    def test_dry_run_writes_nothing(self, fake_supabase):
+        client = fake_supabase()
+        manager = RacketManager(client=client, rows=[])
+        manager.merge_product(_FakeProduct("Nox AT10 Genius 2024", "Nox", "https://pn/at10"), "padelnuestro")
+
+        assert manager.save(dry_run=True) == 1
+        assert client.calls == []
+
+    def test_url_map_follows_a_changed_store_url(self, fake_supabase):
+        manager = RacketManager(client=fake_supabase(), rows=[_row(1, "Nox", "nox at10 genius", "https://pn/old")])
+        manager.merge_product(_FakeProduct("nox at10 genius", "Nox", "https://pn/new"), "padelnuestro")
+
+        assert manager.url_map == {"https://pn/new": "slug-1"}
+        manager.save()
+        assert manager.url_map == manager._build_url_map()
@@ -0,0 +1,78 @@
+"""
+Tests for the per-host AIMD limiter that replaced the fixed random sleeps
+and MAX_CONCURRENT_REFRESH.
+"""
+
+import asyncio
+import time
+
+from src.scrapers.rate_limit import MAX_PAUSE_S, RATE_DECREASE, RATE_INCREASE, HostRateLimiter, host_limiter
+from src.scrapers.report import StoreRunStats, render_summary
+
+
+class TestHostRateLimiter:
+    def test_success_ramps_rate_up_to_max(self):
+        limiter = HostRateLimiter("store.example", initial_rate=1.0, max_rate=1.2)
+        limiter.on_success()
+        assert limiter.rate == 1.0 + RATE_INCREASE
+        for _ in range(100):
+            limiter.on_success()
+        assert limiter.rate == 1.2
+
+    def test_burst_of_throttles_only_halves_once(self):
+        # N in-flight requests that bounce together are one congestion signal.
+        limiter = HostRateLimiter("store.example", initial_rate=4.0)
+        for _ in range(4):
+            limiter.on_throttle()
+        assert limiter.rate == 4.0 * RATE_DECREASE
+
+    def test_rate_never_drops_below_min(self):
+        limiter = HostRateLimiter("store.example", initial_rate=0.2, min_rate=0.15)
+        limiter.on_throttle()
+        assert limiter.rate == 0.15
+
+    def test_retry_after_pauses_the_host_capped(self):
+        limiter = HostRateLimiter("store.example")
+        before = time.monotonic()
+        limiter.on_throttle(retry_after=3600)
+        assert limiter._wait_for_turn(before) <= MAX_PAUSE_S + 1
+        assert limiter._wait_for_turn(before) > MAX_PAUSE_S - 1
+
+    def test_turns_are_spaced_by_the_current_rate(self):
+        limiter = HostRateLimiter("store.example", initial_rate=2.0)
+        assert limiter._wait_for_turn(100.0) == 0.0
+        assert limiter._wait_for_turn(100.0) == 0.5
+
+    def test_in_flight_cap_holds_across_event_loops(self):
+        limiter = HostRateLimiter("store.example", initial_rate=1000.0, max_in_flight=2)
+
+        async def run():
+            peak = active = 0
+
+            async def one():
+                nonlocal peak, active
+                async with limiter.slot():
+                    active += 1
+                    peak = max(peak, active)
+                    await asyncio.sleep(0.01)
+                    active -= 1
+
+            await asyncio.gather(*[one() for _ in range(6)])
+            return peak
+
+        # Each CLI command is its own asyncio.run — the limiter must not
+        # keep a semaphore bound to a closed loop.
+        assert asyncio.run(run()) == 2
+        assert asyncio.run(run()) == 2
+
+    def test_one_limiter_per_host(self):
+        assert host_limiter("https://a.example/x") is host_limiter("https://a.example/y")
+        assert host_limiter("https://a.example/x") is not host_limiter("https://b.example/x")
+
+
+class TestRateInSummary:
+    def test_summary_reports_achieved_rate(self):
+        stats = StoreRunStats(store="padelproshop", attempted=10, ok=10)
+        stats.record_requests(120, 3, 60.0)
+        assert stats.request_rate == 2.0
+        assert "2.00 req/s (120 peticiones en 60s, 3 throttled 429/403)" in render_summary(stats, [])
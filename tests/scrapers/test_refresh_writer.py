@@ -0,0 +1,150 @@
+"""
+Tests for the streaming refresh writer: incremental same-column batches,
+the deferred-commit window that keeps gone_cap enforceable, and the
+checkpoints behind `refresh --resume`.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.scrapers import checkpoint, refresh_writer
+from src.scrapers.base_scraper import FetchOutcome, FetchResult, Product
+from src.scrapers.checkpoint import RefreshCheckpoint
+from src.scrapers.pricing import decide_price_update
+from src.scrapers.refresh_writer import RefreshWriter
+from src.scrapers.report import StoreRunStats
+from src.scrapers.sync_catalog import _skip_resolved
+
+STORE = "padelmarket"
+NOW = "2026-01-01T00:00:00+00:00"
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    log = []
+    monkeypatch.setattr(refresh_writer.db, "batch_upsert", lambda client, table, rows: log.append(("upsert", list(rows))))
+    monkeypatch.setattr(refresh_writer.db, "record_price_history", lambda client, entries: log.append(("history", list(entries))))
+    return log
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _row(i, price=100.0):
+    return {"id": i, f"{STORE}_link": f"https://s/products/{i}", f"{STORE}_actual_price": price}
+
+
+def _ok(price):
+    return FetchResult(FetchOutcome.OK, product=Product(url="u", name="n", price=price, brand="b", image="", specs={}))
+
+
+async def _feed(writer, items):
+    for row, result in items:
+        decision = decide_price_update(STORE, result, row[f"{STORE}_actual_price"], NOW, row[f"{STORE}_link"])
+        await writer.add(row, result, decision)
+    await writer.flush()
+
+
+class TestRefreshWriter:
+    def test_flushes_incrementally_with_history(self, writes):
+        writer = RefreshWriter(None, STORE, StoreRunStats(store=STORE), NOW, dry_run=False, flush_size=2)
+        asyncio.run(_feed(writer, [(_row(1), _ok(90.0)), (_row(2), _ok(100.0)), (_row(3), _ok(80.0))]))
+
+        upserts = [rows for kind, rows in writes if kind == "upsert"]
+        assert [len(b) for b in upserts] == [2, 1]
+        history = [e for kind, entries in writes if kind == "history" for e in entries]
+        assert sorted(e["racket_id"] for e in history) == [1, 3]
+        assert writer.rows_written == 3 and writer.history_written == 2
+
+    def test_gone_rows_wait_for_the_cap_check(self, writes):
+        stats = StoreRunStats(store=STORE)
+        writer = RefreshWriter(None, STORE, stats, NOW, dry_run=False)
+        gone = FetchResult(FetchOutcome.GONE)
+        asyncio.run(_feed(writer, [(_row(1), gone), (_row(2, price=None), gone), (_row(3), _ok(100.0))]))
+
+        # Only the OK row went out; both GONE rows are held back.
+        assert [r["id"] for kind, rows in writes for r in rows if kind == "upsert"] == [3]
+        assert writer.newly_gone == 1 and stats.gone == 2
+        assert writer.gone_cap_exceeded(0) and not writer.gone_cap_exceeded(1)
+
+        asyncio.run(writer.commit_deferred())
+        assert sorted(r["id"] for r in writes[-1][1]) == [1, 2]
+        assert all(r[f"{STORE}_link"] is None for r in writes[-1][1])
+
+    def test_failed_writes_nothing_and_keeps_coverage(self, writes):
+        stats = StoreRunStats(store=STORE)
+        writer = RefreshWriter(None, STORE, stats, NOW, dry_run=False)
+        asyncio.run(_feed(writer, [(_row(1), FetchResult(FetchOutcome.FAILED, error="429"))]))
+        assert writes == []
+        assert (stats.failed, stats.coverage_before, stats.coverage_after) == (1, 1, 1)
+
+    def test_dry_run_counts_without_writing(self, writes):
+        writer = RefreshWriter(None, STORE, StoreRunStats(store=STORE), NOW, dry_run=True)
+        asyncio.run(_feed(writer, [(_row(1), _ok(90.0))]))
+        assert writes == [] and writer.rows_written == 1
+
+
+class TestCheckpoint:
+    @pytest.fixture(autouse=True)
+    def _tmp_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(checkpoint, "CACHE_DIR", str(tmp_path))
+
+    def test_flush_records_resolved_ids_and_held_back_gone(self, writes):
+        cp = RefreshCheckpoint(store=STORE, started_at=_now())
+        writer = RefreshWriter(None, STORE, StoreRunStats(store=STORE), NOW, dry_run=False, checkpoint=cp)
+        asyncio.run(_feed(writer, [
+            (_row(1), _ok(90.0)),
+            (_row(2), FetchResult(FetchOutcome.GONE)),
+            (_row(3), FetchResult(FetchOutcome.FAILED, error="timeout")),
+        ]))
+
+        loaded = RefreshCheckpoint.load(STORE, max_age_hours=1)
+        assert loaded.processed == {"1": "ok", "2": "gone"}  # FAILED is never resolved
+        assert set(loaded.tallies) == {"1", "2", "3"}  # ...but its stats are tallied
+        assert [r["id"] for r in loaded.deferred_gone] == [2] and loaded.newly_gone == 1
+
+        # The resumed writer still owes the GONE row to the gone_cap commit.
+        resumed = RefreshWriter(None, STORE, loaded.resumed_stats(["1", "2"]), NOW, dry_run=False, checkpoint=loaded)
+        assert resumed.newly_gone == 1
+        asyncio.run(resumed.commit_deferred())
+        assert writes[-1] == ("upsert", loaded.deferred_gone)
+
+    def test_resume_counts_retried_failed_rows_once(self, writes):
+        first = RefreshWriter(None, STORE, StoreRunStats(store=STORE, requests=7), NOW, dry_run=False,
+                              checkpoint=RefreshCheckpoint(store=STORE, started_at=_now()))
+        asyncio.run(_feed(first, [
+            (_row(1), _ok(90.0)),
+            (_row(2), FetchResult(FetchOutcome.FAILED, error="timeout")),
+        ]))
+
+        loaded = RefreshCheckpoint.load(STORE, max_age_hours=1)
+        stats = loaded.resumed_stats(["1"])  # row 2 is fetched again
+        resumed = RefreshWriter(None, STORE, stats, NOW, dry_run=False, checkpoint=loaded)
+        asyncio.run(_feed(resumed, [(_row(2), _ok(80.0))]))
+
+        assert (stats.attempted, stats.ok, stats.failed) == (2, 2, 0)
+        assert (stats.coverage_before, stats.coverage_after) == (2, 2)
+        assert stats.requests == 7  # run-level counters carry over as saved
+
+    def test_unknown_saved_stats_fields_are_dropped(self):
+        cp = RefreshCheckpoint(store=STORE, started_at=_now(), stats={"store": STORE, "requests": 3, "renamed": 1})
+        assert cp.resumed_stats([]).requests == 3
+
+    def test_stale_checkpoint_is_ignored(self):
+        RefreshCheckpoint(store=STORE, started_at="2020-01-01T00:00:00+00:00").save()
+        assert RefreshCheckpoint.load(STORE, max_age_hours=12) is None
+
+    def test_resume_skips_checkpointed_and_recently_checked_rows(self):
+        recent = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat().replace("+00:00", "Z")
+        old = "2020-01-01T00:00:00.12345+00:00"
+        rows = [
+            {"id": 1, f"{STORE}_price_checked_at": None},
+            {"id": 2, f"{STORE}_price_checked_at": recent},
+            {"id": 3, f"{STORE}_price_checked_at": old},
+            {"id": 4, f"{STORE}_price_checked_at": None},
+        ]
+        cp = RefreshCheckpoint(store=STORE, started_at=_now(), processed={"4": "ok"})
+        assert [r["id"] for r in _skip_resolved(rows, STORE, cp, 12)] == [1, 3]
@@ -0,0 +1,44 @@
+"""
+Tests for the refresh scheduler's priority score (`refresh --budget N`).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from src.scrapers.scheduler import MAX_STALENESS, priority, select_by_priority, staleness, volatility
+
+STORE = "padelproshop"
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _row(i, checked_days_ago=7.0, on_offer=False):
+    checked = None if checked_days_ago is None else (NOW - timedelta(days=checked_days_ago)).isoformat()
+    return {"id": i, "on_offer": on_offer, f"{STORE}_price_checked_at": checked}
+
+
+class TestScores:
+    def test_volatility_grows_with_moves_and_spread(self):
+        assert volatility([]) == 0.0
+        assert volatility([100.0]) == 0.0
+        assert 0 < volatility([100.0, 99.0]) < volatility([100.0, 80.0, 100.0, 70.0, 100.0])
+
+    def test_never_checked_is_maximally_stale(self):
+        assert staleness(None, NOW) == MAX_STALENESS
+        assert staleness(NOW.isoformat(), NOW) == 0.0
+
+    def test_just_checked_sinks_even_if_volatile(self):
+        fresh_volatile = priority(_row(1, checked_days_ago=0.1, on_offer=True), STORE, [100.0, 60.0, 100.0], 5, NOW)
+        stale_flat = priority(_row(2, checked_days_ago=7), STORE, [], 0, NOW)
+        assert fresh_volatile < stale_flat
+
+
+class TestSelectByPriority:
+    def test_budget_picks_volatile_offers_and_watched_first(self):
+        rows = [_row(1), _row(2, on_offer=True), _row(3), _row(4)]
+        history = {3: [100.0, 90.0, 110.0, 85.0]}
+        watchers = {4: 3}
+        chosen = select_by_priority(rows, STORE, 3, history, watchers, NOW)
+        assert [r["id"] for r in chosen] == [3, 4, 2]
+
+    def test_ties_keep_input_order(self):
+        rows = [_row(i) for i in range(5)]
+        assert [r["id"] for r in select_by_priority(rows, STORE, 2, {}, {}, NOW)] == [0, 1]
@@ -0,0 +1,95 @@
+"""
+Tests for `scrape_price`, the refresh's price-only scrape: for every store
+it gives the same outcome, price and original price as `scrape_product`
+on the same page, with one request and none of the spec parsing.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.scrapers import base_scraper
+from src.scrapers.base_scraper import FetchOutcome
+from src.scrapers.padelmarket_scraper import PadelMarketScraper
+from src.scrapers.padelnuestro_scraper import PadelNuestroScraper
+from src.scrapers.padelproshop_scraper import PadelProShopScraper
+
+
+def _both(scraper, url, requested):
+    """(scrape_price result, its request count, scrape_product result)."""
+    price = asyncio.run(scraper.scrape_price(url))
+    price_requests = len(requested)
+    full = asyncio.run(scraper.scrape_product(url))
+    return price, price_requests, full
+
+
+def _prices(result):
+    return result.outcome, result.product.price, result.product.original_price
+
+
+def _padelnuestro_page(price, old_price=None):
+    ld = {"@context": "https://schema.org", "@type": "Product", "name": "Pala Nox AT10 Genius 18K",
+          "brand": {"@type": "Brand", "name": "Nox"}, "description": "<p>Forma lágrima, balance alto</p>",
+          "offers": {"@type": "Offer", "price": price, "priceCurrency": "EUR"}}
+    old = (f'<span data-price-type="oldPrice" data-price-amount="{old_price}"></span>' if old_price else "")
+    return (f'<script type="application/ld+json">{json.dumps(ld)}</script>{old}'
+            '<table class="description-attributes"><tr><th>Forma</th><td>Lágrima</td></tr></table>')
+
+
+class TestPadelNuestro:
+    URL = "https://www.padelnuestro.com/pala-nox-at10-genius-18k"
+
+    @pytest.mark.parametrize("price, old_price", [("249,95", "319.95"), ("249.95", "200"), ("0", None)])
+    def test_same_prices_as_the_full_scrape(self, serve, price, old_price):
+        requested = serve(lambda request: httpx.Response(200, text=_padelnuestro_page(price, old_price)))
+
+        fast, n, full = _both(PadelNuestroScraper(), self.URL, requested)
+
+        assert _prices(fast) == _prices(full)
+        assert n == 1
+        assert fast.product.specs == {} and full.product.specs
+
+    def test_unparseable_page_fails_like_the_full_scrape(self, serve):
+        requested = serve(lambda request: httpx.Response(200, text="<html>mantenimiento</html>"))
+
+        fast, _, full = _both(PadelNuestroScraper(), self.URL, requested)
+
+        assert fast.outcome is full.outcome is FetchOutcome.FAILED
+
+
+def _shopify(price, compare_at=None, body_html="<p>Sin specs</p>"):
+    return {"product": {"title": "Pala Vertex 04", "vendor": "Bullpadel", "body_html": body_html,
+                        "images": [{"src": "https://cdn.example/v04.jpg"}], "tags": "diamante",
+                        "variants": [{"price": price, "compare_at_price": compare_at}]}}
+
+
+class TestShopify:
+    @pytest.mark.parametrize("cls, url", [
+        (PadelMarketScraper, "https://padelmarket.com/es-eu/products/vertex-04"),
+        (PadelProShopScraper, "https://padelproshop.com/products/vertex-04"),
+    ])
+    @pytest.mark.parametrize("price, compare_at", [("199.95", "279.95"), ("0.00", None), ("n/a", "1")])
+    def test_same_prices_without_the_html_fallback(self, serve, cls, url, price, compare_at, monkeypatch):
+        monkeypatch.setattr(base_scraper, "CACHE_ENABLED", False)  # no spec cache on disk
+
+        def handler(request):
+            if request.url.path.endswith(".json"):
+                return httpx.Response(200, json=_shopify(price, compare_at))
+            return httpx.Response(200, text="<p>Forma diamante</p>")
+
+        requested = serve(handler)
+
+        fast, n, full = _both(cls(), url, requested)
+
+        assert _prices(fast) == _prices(full)
+        assert n == 1  # the full scrape also fetches the HTML page: no Forma in body_html
+        assert len(requested) == 3
+
+    def test_gone_product(self, serve):
+        requested = serve(lambda request: httpx.Response(404))
+
+        fast, _, _ = _both(PadelProShopScraper(), "https://padelproshop.com/products/retirada", requested)
+
+        assert fast.outcome is FetchOutcome.GONE